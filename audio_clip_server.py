@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Audio Clip Server for Satyug Universe
+Serves synthesized speech from memory as short-lived HTTP URLs that
+Lavalink's HTTP source can load
+"""
+
+import os
+import time
+import secrets
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Optional
+import logging
+
+from aiohttp import web
+
+logger = logging.getLogger('AudioClipServer')
+
+DEFAULT_PORT = 8790
+
+@dataclass
+class AudioClip:
+    """One clip held in memory"""
+    data: bytes
+    content_type: str
+    expires: float
+
+    @property
+    def view(self) -> memoryview:
+        return memoryview(self.data)
+
+class AudioClipServer:
+    """
+    In-memory HTTP server for audio clips
+
+    Clips are registered as bytes and handed out as unguessable URLs that
+    expire after `ttl` seconds. Responses (including Range requests, which
+    Lavaplayer uses when probing and seeking) are written straight from
+    memoryview slices of the original buffer, so serving never copies the
+    audio or touches the disk.
+    """
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 base_url: Optional[str] = None, ttl: float = 120,
+                 chunk_size: int = 64 * 1024):
+        """
+        Args:
+            host: Interface to bind (default: AUDIO_CLIP_BIND env or 0.0.0.0)
+            port: Port to bind (default: AUDIO_CLIP_PORT env or 8790)
+            base_url: URL Lavalink uses to reach this server
+                (default: AUDIO_CLIP_BASE_URL env or http://localhost:<port>)
+            ttl: Seconds a clip stays available
+            chunk_size: Bytes per write when streaming a clip
+        """
+        self.host = host or os.getenv('AUDIO_CLIP_BIND', '0.0.0.0')
+        self.port = port or int(os.getenv('AUDIO_CLIP_PORT', DEFAULT_PORT))
+        self.base_url = (base_url or os.getenv('AUDIO_CLIP_BASE_URL')
+                         or f"http://localhost:{self.port}").rstrip('/')
+        self.ttl = ttl
+        self.chunk_size = chunk_size
+
+        self.clips: Dict[str, AudioClip] = {}
+        self.served = 0
+        self.bytes_served = 0
+
+        self.app = web.Application()
+        self.app.router.add_get('/clips/{token}', self._handle_clip)
+        self.runner: Optional[web.AppRunner] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start serving"""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.host, self.port)
+        await site.start()
+        self._reaper_task = asyncio.create_task(self._reap_expired())
+        logger.info(f"🔈 Audio clips served on {self.host}:{self.port} as {self.base_url}")
+
+    async def stop(self):
+        """Stop serving and drop all clips"""
+        if self._reaper_task:
+            self._reaper_task.cancel()
+        if self.runner:
+            await self.runner.cleanup()
+        self.clips.clear()
+
+    def add(self, data: bytes, content_type: str = "audio/wav", ttl: Optional[float] = None) -> str:
+        """
+        Register a clip
+
+        Args:
+            data: Encoded audio (kept by reference, not copied)
+            content_type: MIME type sent to the client
+            ttl: Seconds the clip stays available (default: server ttl)
+
+        Returns:
+            URL of the clip
+        """
+        token = secrets.token_urlsafe(16)
+        self.clips[token] = AudioClip(data, content_type, time.monotonic() + (ttl or self.ttl))
+        return f"{self.base_url}/clips/{token}"
+
+    def discard(self, url: str):
+        """Drop a clip before it expires"""
+        self.clips.pop(url.rsplit('/', 1)[-1], None)
+
+    async def _reap_expired(self, interval: float = 10):
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for token in [t for t, clip in self.clips.items() if clip.expires <= now]:
+                del self.clips[token]
+
+    @staticmethod
+    def _parse_range(header: str, size: int) -> Optional[tuple]:
+        """(start, end) inclusive for a single "bytes=" range, or None if invalid"""
+        if not header.startswith("bytes=") or "," in header:
+            return None
+        first, _, last = header[6:].strip().partition('-')
+        try:
+            if first:
+                start = int(first)
+                end = int(last) if last else size - 1
+            else:
+                # Suffix range: the last N bytes
+                start = max(0, size - int(last))
+                end = size - 1
+        except ValueError:
+            return None
+        end = min(end, size - 1)
+        if start > end:
+            return None
+        return start, end
+
+    async def _handle_clip(self, request: web.Request) -> web.StreamResponse:
+        clip = self.clips.get(request.match_info['token'])
+        if clip is None or clip.expires <= time.monotonic():
+            raise web.HTTPNotFound()
+
+        size = len(clip.data)
+        start, end = 0, size - 1
+        status = 200
+
+        range_header = request.headers.get('Range')
+        if range_header:
+            parsed = self._parse_range(range_header, size)
+            if parsed is None:
+                raise web.HTTPRequestRangeNotSatisfiable(headers={"Content-Range": f"bytes */{size}"})
+            start, end = parsed
+            status = 206
+
+        response = web.StreamResponse(status=status, headers={
+            "Content-Type": clip.content_type,
+            "Accept-Ranges": "bytes",
+            "Cache-Control": "no-store"
+        })
+        response.content_length = end - start + 1
+        if status == 206:
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        await response.prepare(request)
+
+        if request.method != "HEAD":
+            view = clip.view
+            for offset in range(start, end + 1, self.chunk_size):
+                await response.write(view[offset:min(offset + self.chunk_size, end + 1)])
+            self.served += 1
+            self.bytes_served += end - start + 1
+
+        await response.write_eof()
+        return response
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Docker Engine API client for Satyug Universe
+Starts, stops and watches the Satyug containers over the local Docker
+socket, without forking the docker-compose CLI
+"""
+
+import os
+import json
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+import aiohttp
+
+logger = logging.getLogger('DockerEngine')
+
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+# Label set on every service in docker-compose.yml
+SERVICE_LABEL = "satyug.service"
+
+class DockerEngineError(Exception):
+    """Raised when the Docker Engine rejects a request"""
+
+class DockerEngine:
+    """
+    Async Docker Engine API client over the Unix socket
+
+    Containers are addressed by their `satyug.service` label, so the
+    compose file stays the single source of truth for what exists. One
+    pooled connection is reused for every request; the events stream
+    gets its own long-lived connection.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, api_version: str = "v1.41"):
+        """
+        Args:
+            socket_path: Docker socket (default: DOCKER_SOCKET env or /var/run/docker.sock)
+            api_version: Engine API version prefix
+        """
+        self.socket_path = socket_path or os.getenv('DOCKER_SOCKET', DEFAULT_SOCKET_PATH)
+        self.base_url = f"http://docker/{api_version}"
+        self.requests = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+
+    @staticmethod
+    def available(socket_path: Optional[str] = None) -> bool:
+        """Whether a Docker socket exists to talk to"""
+        return os.path.exists(socket_path or os.getenv('DOCKER_SOCKET', DEFAULT_SOCKET_PATH))
+
+    async def session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            self._session_loop = loop
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.UnixConnector(path=self.socket_path, limit=10)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed and self._session_loop is asyncio.get_running_loop():
+            await self._session.close()
+
+    async def _request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                       ok: tuple = (200,)) -> Any:
+        session = await self.session()
+        self.requests += 1
+        async with session.request(method, f"{self.base_url}{path}", params=params) as resp:
+            if resp.status not in ok:
+                try:
+                    message = (await resp.json()).get('message', '')
+                except Exception:
+                    message = await resp.text()
+                raise DockerEngineError(f"{method} {path}: HTTP {resp.status} {message}".strip())
+            if resp.content_type == 'application/json':
+                return await resp.json()
+            return None
+
+    async def ping(self) -> bool:
+        try:
+            await self._request("GET", "/_ping")
+            return True
+        except Exception:
+            return False
+
+    async def containers(self, services: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Satyug containers, running or not
+
+        Args:
+            services: Only these `satyug.service` values (all if None)
+        """
+        # Docker ANDs repeated label filters, so select on the label key
+        # and pick the services out here
+        filters = json.dumps({"label": [SERVICE_LABEL]})
+        containers = await self._request("GET", "/containers/json", {"all": "true", "filters": filters})
+        if services is None:
+            return containers
+        wanted = set(services)
+        return [c for c in containers if c.get("Labels", {}).get(SERVICE_LABEL) in wanted]
+
+    async def inspect(self, container_id: str) -> Dict[str, Any]:
+        return await self._request("GET", f"/containers/{container_id}/json")
+
+    async def start(self, container_id: str):
+        # 304: already running
+        await self._request("POST", f"/containers/{container_id}/start", ok=(204, 304))
+
+    async def stop(self, container_id: str, timeout: int = 10):
+        # 304: already stopped
+        await self._request("POST", f"/containers/{container_id}/stop", {"t": str(timeout)}, ok=(204, 304))
+
+    async def start_services(self, services: List[str]) -> List[str]:
+        """
+        Start the containers of some services
+
+        Returns:
+            Services without a container (never created; compose must
+            create them)
+        """
+        containers = await self.containers(services)
+        await asyncio.gather(*(self.start(c["Id"]) for c in containers if c.get("State") != "running"))
+        found = {c["Labels"][SERVICE_LABEL] for c in containers}
+        return [service for service in services if service not in found]
+
+    async def stop_services(self, services: List[str], timeout: int = 10):
+        """Stop the containers of some services"""
+        containers = await self.containers(services)
+        await asyncio.gather(*(self.stop(c["Id"], timeout) for c in containers if c.get("State") == "running"))
+
+    async def service_states(self, services: Optional[List[str]] = None) -> Dict[str, str]:
+        """Container state per service (running, exited, ...)"""
+        return {
+            c["Labels"][SERVICE_LABEL]: c.get("State", "unknown")
+            for c in await self.containers(services)
+        }
+
+    async def events(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream container events for Satyug services
+
+        Yields:
+            {"service", "action", "id", "time", "exit_code"} per event;
+            action is e.g. start, die, stop, health_status: unhealthy
+        """
+        filters = json.dumps({"type": ["container"], "label": [SERVICE_LABEL]})
+        session = await self.session()
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+        async with session.get(f"{self.base_url}/events", params={"filters": filters}, timeout=timeout) as resp:
+            if resp.status != 200:
+                raise DockerEngineError(f"GET /events: HTTP {resp.status}")
+            async for line in resp.content:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                action = event.get("Action") or event.get("status", "")
+                if action.startswith("exec_"):
+                    continue
+                attributes = event.get("Actor", {}).get("Attributes", {})
+                exit_code = attributes.get("exitCode")
+                yield {
+                    "service": attributes.get(SERVICE_LABEL),
+                    "action": action,
+                    "id": event.get("Actor", {}).get("ID") or event.get("id"),
+                    "time": event.get("time"),
+                    "exit_code": int(exit_code) if exit_code is not None else None
+                }
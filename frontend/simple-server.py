@@ -3,27 +3,15 @@
 Simple HTTP Server for Axzora Super App Frontend - No Unicode
 """
 
-import http.server
-import socketserver
 import webbrowser
 import threading
 import time
 import os
 import sys
 
-class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
-
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.end_headers()
+# static_server.py is shared with the copy of the app at the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from static_server import create_server, find_port
 
 def open_browser(port):
     """Open the default web browser after a short delay"""
@@ -33,20 +21,16 @@ def open_browser(port):
     webbrowser.open(url)
 
 def main():
-    PORT = 8000
+    # Production mode: browsers cache and revalidate instead of re-downloading
+    production = "--production" in sys.argv
     
     # Try to find an available port
-    for port in range(8000, 8010):
-        try:
-            with socketserver.TCPServer(("", port), CORSHTTPRequestHandler) as httpd:
-                PORT = port
-                break
-        except OSError:
-            continue
+    PORT = find_port(8000, 8010)
     
     print("Starting Axzora Super App Local Server...")
     print(f"Serving from: {os.getcwd()}")
     print(f"Server running at: http://localhost:{PORT}")
+    print(f"Mode: {'production (cached, precompressed)' if production else 'development (no caching)'}")
     print("Press Ctrl+C to stop the server")
     print("="*50)
     
@@ -56,7 +40,7 @@ def main():
     browser_thread.start()
     
     try:
-        with socketserver.TCPServer(("", PORT), CORSHTTPRequestHandler) as httpd:
+        with create_server(PORT, production=production) as httpd:
             httpd.serve_forever()
     except KeyboardInterrupt:
         print("\nServer stopped by user")
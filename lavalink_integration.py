@@ -6,12 +6,28 @@ Provides audio streaming, music playback, and advanced audio processing
 
 import asyncio
 import aiohttp
+import base64
+import io
+import random
+import re
+import struct
+import sys
+import time
+import unicodedata
+import wave
 import logging
-from typing import Dict, List, Optional, Any
+import sqlite3
+import zlib
+from collections import deque, OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Iterable, Iterator, Union
 from dataclasses import dataclass
 from enum import Enum
 import json
 
+from audio_clip_server import AudioClipServer
+from voice_commands import _is_word_char
+
 logger = logging.getLogger('LavalinkIntegration')
 
 class TrackEndReason(Enum):
@@ -58,6 +74,629 @@ class Track:
             "is_stream": self.is_stream
         }
 
+@dataclass(eq=False)
+class PendingQuery:
+    """A queue entry queued by search query, not resolved to a track yet"""
+    query: str
+    
+    def to_dict(self) -> Dict:
+        return {"query": self.query, "pending": True}
+
+class _TrackReader:
+    """Reads Lavaplayer's Java DataOutput track encoding"""
+    
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+    
+    def read(self, fmt: str):
+        value = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return value[0]
+    
+    def read_utf(self) -> str:
+        length = self.read('>H')
+        raw = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return raw.decode('utf-8', errors='replace')
+    
+    def read_nullable_utf(self) -> Optional[str]:
+        return self.read_utf() if self.read('>?') else None
+
+@lru_cache(maxsize=4096)
+def decode_track_info(encoded: str) -> Dict[str, Any]:
+    """
+    Decode track info locally from a Lavalink encoded track string
+    
+    Mirrors /v4/decodetrack for the common fields without a round trip.
+    """
+    reader = _TrackReader(base64.b64decode(encoded))
+    header = reader.read('>i')
+    flags = (header & 0xC0000000) >> 30
+    version = reader.read('>B') if flags & 1 else 1
+    
+    title = reader.read_utf()
+    author = reader.read_utf()
+    length = reader.read('>q')
+    identifier = reader.read_utf()
+    is_stream = reader.read('>?')
+    uri = reader.read_nullable_utf() if version >= 2 else None
+    artwork_url = reader.read_nullable_utf() if version >= 3 else None
+    isrc = reader.read_nullable_utf() if version >= 3 else None
+    source_name = reader.read_utf()
+    
+    return {
+        "identifier": identifier,
+        "isSeekable": not is_stream,
+        "author": author,
+        "length": length,
+        "isStream": is_stream,
+        "position": 0,
+        "title": title,
+        "uri": uri,
+        "artworkUrl": artwork_url,
+        "isrc": isrc,
+        "sourceName": source_name
+    }
+
+def _track_from_encoded(encoded: str) -> Track:
+    """Track from an encoded string, with locally decoded info when possible"""
+    try:
+        return Track(encoded, decode_track_info(encoded))
+    except Exception:
+        return Track(encoded, {})
+
+class TrackQueue:
+    """
+    Player queue backed by a deque
+    
+    - O(1) append/pop at both ends, bulk extend
+    - shuffle, move and remove by index
+    - entries can be PendingQuery placeholders, resolved in place later
+      so they keep their position
+    - optional history ring of recently played tracks
+    - compact mode keeps only encoded strings; track info is decoded
+      locally (and cached) when a track is read back
+    """
+    
+    def __init__(self, compact: bool = False, history_size: int = 0):
+        self.compact = compact
+        self._items: deque = deque()
+        self.history: deque = deque(maxlen=history_size)
+    
+    def _pack(self, track: Union[Track, PendingQuery]) -> Union[Track, PendingQuery, str]:
+        return track.encoded if self.compact and isinstance(track, Track) else track
+    
+    @staticmethod
+    def _unpack(item: Union[Track, PendingQuery, str]) -> Union[Track, PendingQuery]:
+        if not isinstance(item, str):
+            return item
+        return Track(item, decode_track_info(item))
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __bool__(self) -> bool:
+        return bool(self._items)
+    
+    def __iter__(self) -> Iterator[Union[Track, PendingQuery]]:
+        return (self._unpack(item) for item in self._items)
+    
+    def __getitem__(self, index: int) -> Union[Track, PendingQuery]:
+        return self._unpack(self._items[index])
+    
+    @property
+    def next_pending(self) -> bool:
+        """The next entry is a query still to be resolved"""
+        return bool(self._items) and isinstance(self._items[0], PendingQuery)
+    
+    def append(self, track: Union[Track, PendingQuery]):
+        """Add a track to the end"""
+        self._items.append(self._pack(track))
+    
+    def appendleft(self, track: Union[Track, PendingQuery]):
+        """Add a track to the front (plays next)"""
+        self._items.appendleft(self._pack(track))
+    
+    def extend(self, tracks: Iterable[Union[Track, PendingQuery]]):
+        """Add many tracks at once"""
+        if self.compact:
+            self._items.extend(self._pack(track) for track in tracks)
+        else:
+            self._items.extend(tracks)
+    
+    def popleft(self) -> Union[Track, PendingQuery]:
+        """Remove and return the next track"""
+        return self._unpack(self._items.popleft())
+    
+    def resolve(self, entry: PendingQuery, track: Optional[Track]) -> bool:
+        """
+        Put a track in place of a pending entry, or drop the entry if None
+        
+        Returns:
+            False if the entry is no longer queued
+        """
+        for index, item in enumerate(self._items):
+            if item is entry:
+                if track is None:
+                    del self._items[index]
+                else:
+                    self._items[index] = self._pack(track)
+                return True
+        return False
+    
+    def remove(self, index: int) -> Union[Track, PendingQuery]:
+        """Remove and return the track at index (IndexError if out of range)"""
+        item = self._items[index]
+        del self._items[index]
+        return self._unpack(item)
+    
+    def move(self, source: int, destination: int):
+        """Move a track from one position to another (IndexError if out of range)"""
+        if not -len(self._items) <= destination < len(self._items):
+            raise IndexError("queue index out of range")
+        item = self._items[source]
+        del self._items[source]
+        self._items.insert(destination % (len(self._items) + 1), item)
+    
+    def shuffle(self):
+        """Shuffle the queue in place"""
+        items = list(self._items)
+        random.shuffle(items)
+        self._items = deque(items)
+    
+    def clear(self):
+        """Remove all queued tracks"""
+        self._items.clear()
+    
+    def record(self, track: Track):
+        """Remember a played track in the history ring"""
+        self.history.append(self._pack(track))
+    
+    def recent(self) -> List[Track]:
+        """Recently played tracks, newest first"""
+        return [self._unpack(item) for item in reversed(self.history)]
+    
+    def encoded(self) -> List[Union[str, Dict[str, str]]]:
+        """Encoded strings of all queued tracks ({"query": ...} for pending entries)"""
+        return [
+            item if isinstance(item, str)
+            else {"query": item.query} if isinstance(item, PendingQuery)
+            else item.encoded
+            for item in self._items
+        ]
+
+class SearchCache:
+    """
+    Search result cache keyed on (source, normalized query)
+    
+    - In-memory LRU with a TTL per entry
+    - Optional persistent tier in SQLite so repeat requests survive restarts
+    """
+    
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.persist_path = persist_path
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        
+        if persist_path:
+            with sqlite3.connect(persist_path) as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS search_cache "
+                    "(key TEXT PRIMARY KEY, tracks TEXT NOT NULL, expires REAL NOT NULL)"
+                )
+    
+    @staticmethod
+    def key(source: str, query: str) -> str:
+        """Cache key; plain queries are case- and whitespace-insensitive"""
+        if query.startswith("http"):
+            return query.strip()
+        normalized = re.sub(r'\s+', ' ', query).strip().casefold()
+        return f"{source}:{normalized}"
+    
+    async def get(self, key: str) -> Optional[List[Track]]:
+        """Cached tracks, or None on a miss"""
+        entry = self.entries.get(key)
+        now = time.time()
+        
+        if entry and entry[0] > now:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self.entries[key]
+        
+        if self.persist_path:
+            row = await asyncio.to_thread(self._load, key, now)
+            if row:
+                expires, tracks = row
+                self._remember(key, tracks, expires)
+                self.hits += 1
+                return tracks
+        
+        self.misses += 1
+        return None
+    
+    async def put(self, key: str, tracks: List[Track]):
+        """Cache tracks for a key"""
+        expires = time.time() + self.ttl
+        self._remember(key, list(tracks), expires)
+        if self.persist_path:
+            await asyncio.to_thread(self._store, key, tracks, expires)
+    
+    def _remember(self, key: str, tracks: List[Track], expires: float):
+        self.entries[key] = (expires, tracks)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def _load(self, key: str, now: float):
+        with sqlite3.connect(self.persist_path) as db:
+            row = db.execute(
+                "SELECT expires, tracks FROM search_cache WHERE key = ? AND expires > ?",
+                (key, now)
+            ).fetchone()
+        if not row:
+            return None
+        return row[0], [Track(t['encoded'], t['info']) for t in json.loads(row[1])]
+    
+    def _store(self, key: str, tracks: List[Track], expires: float):
+        data = json.dumps([{"encoded": t.encoded, "info": t.info} for t in tracks])
+        with sqlite3.connect(self.persist_path) as db:
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, tracks, expires) VALUES (?, ?, ?)",
+                (key, data, expires)
+            )
+            db.execute("DELETE FROM search_cache WHERE expires <= ?", (time.time(),))
+
+class PlayerSnapshotStore:
+    """
+    Compressed snapshots of evicted players
+    
+    Snapshots are zlib-compressed JSON of encoded track strings and
+    settings, bounded in memory (LRU), with an optional SQLite tier so
+    queues survive restarts.
+    """
+    
+    def __init__(self, max_entries: int = 1000, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self.entries: OrderedDict = OrderedDict()
+        
+        if persist_path:
+            with sqlite3.connect(persist_path) as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS player_snapshots "
+                    "(player_id TEXT PRIMARY KEY, data BLOB NOT NULL, saved REAL NOT NULL)"
+                )
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def save(self, player_id: str, snapshot: Dict[str, Any]):
+        data = zlib.compress(json.dumps(snapshot, separators=(',', ':')).encode('utf-8'))
+        self.entries[player_id] = data
+        self.entries.move_to_end(player_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        
+        if self.persist_path:
+            with sqlite3.connect(self.persist_path) as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO player_snapshots (player_id, data, saved) VALUES (?, ?, ?)",
+                    (player_id, data, time.time())
+                )
+    
+    def pop(self, player_id: str) -> Optional[Dict[str, Any]]:
+        """Take a snapshot out of the store"""
+        data = self.entries.pop(player_id, None)
+        
+        # Single primary-key lookup on a local file; cheap enough inline
+        if self.persist_path:
+            with sqlite3.connect(self.persist_path) as db:
+                if data is None:
+                    row = db.execute(
+                        "SELECT data FROM player_snapshots WHERE player_id = ?", (player_id,)
+                    ).fetchone()
+                    data = row[0] if row else None
+                db.execute("DELETE FROM player_snapshots WHERE player_id = ?", (player_id,))
+        
+        if data is None:
+            return None
+        return json.loads(zlib.decompress(data))
+
+class PlayerUpdateCoalescer:
+    """
+    Merges bursts of player updates into single PATCH requests
+    
+    Updates for the same player arriving within `window` seconds are
+    merged field by field (later values win) and sent together. Batches
+    for one player are sent strictly in order, and every caller's await
+    completes once the batch carrying its update has been sent.
+    """
+    
+    def __init__(self, send, window: float = 0.03):
+        """
+        Args:
+            send: Coroutine function (player_id, payload) doing the PATCH
+            window: Coalescing window in seconds (0 disables coalescing)
+        """
+        self.send = send
+        self.window = window
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.waiters: Dict[str, asyncio.Future] = {}
+        self.timers: Dict[str, asyncio.Task] = {}
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.updates = 0
+        self.requests = 0
+    
+    @property
+    def saved(self) -> int:
+        """Requests avoided by coalescing"""
+        return self.updates - self.requests
+    
+    def stats(self) -> Dict[str, int]:
+        return {"updates": self.updates, "requests": self.requests, "saved": self.saved}
+    
+    async def submit(self, player_id: str, payload: Dict[str, Any]):
+        """Queue an update and wait until it has been sent"""
+        self.updates += 1
+        
+        if self.window <= 0:
+            async with self.locks.setdefault(player_id, asyncio.Lock()):
+                self.requests += 1
+                await self.send(player_id, payload)
+            return
+        
+        pending = self.pending.setdefault(player_id, {})
+        # A new track resets the position; an earlier seek was for the old one
+        if "encodedTrack" in payload:
+            pending.pop("position", None)
+        pending.update(payload)
+        
+        waiter = self.waiters.get(player_id)
+        if waiter is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters[player_id] = waiter
+        if player_id not in self.timers:
+            self.timers[player_id] = asyncio.create_task(self._flush_later(player_id))
+        
+        await asyncio.shield(waiter)
+    
+    async def _flush_later(self, player_id: str):
+        await asyncio.sleep(self.window)
+        await self.flush(player_id)
+    
+    async def flush(self, player_id: str):
+        """Send a player's pending updates now"""
+        async with self.locks.setdefault(player_id, asyncio.Lock()):
+            timer = self.timers.pop(player_id, None)
+            if timer and timer is not asyncio.current_task():
+                timer.cancel()
+            
+            payload = self.pending.pop(player_id, None)
+            waiter = self.waiters.pop(player_id, None)
+            if payload is None:
+                return
+            
+            try:
+                self.requests += 1
+                await self.send(player_id, payload)
+                waiter.set_result(None)
+            except Exception as e:
+                waiter.set_exception(e)
+    
+    async def flush_all(self):
+        """Send every pending update"""
+        for player_id in list(self.pending):
+            await self.flush(player_id)
+    
+    def discard(self, player_id: str):
+        """Forget a player (after it has been destroyed)"""
+        timer = self.timers.pop(player_id, None)
+        if timer:
+            timer.cancel()
+        self.pending.pop(player_id, None)
+        waiter = self.waiters.pop(player_id, None)
+        if waiter and not waiter.done():
+            waiter.set_result(None)
+        self.locks.pop(player_id, None)
+
+# Named filter presets (Lavalink v4 filter objects)
+FILTER_PRESETS: Dict[str, Dict[str, Any]] = {
+    "bass_boost": {
+        "equalizer": [
+            {"band": 0, "gain": 0.2},
+            {"band": 1, "gain": 0.15},
+            {"band": 2, "gain": 0.1}
+        ]
+    },
+    "treble_boost": {
+        "equalizer": [
+            {"band": 11, "gain": 0.1},
+            {"band": 12, "gain": 0.15},
+            {"band": 13, "gain": 0.2}
+        ]
+    },
+    "nightcore": {
+        "timescale": {"speed": 1.3, "pitch": 1.3, "rate": 1.0}
+    },
+    "vaporwave": {
+        "timescale": {"speed": 0.85, "pitch": 0.8, "rate": 1.0},
+        "equalizer": [{"band": 0, "gain": 0.1}, {"band": 1, "gain": 0.1}]
+    },
+    "karaoke": {
+        "karaoke": {"level": 1.0, "monoLevel": 1.0, "filterBand": 220.0, "filterWidth": 100.0}
+    },
+    "8d": {
+        "rotation": {"rotationHz": 0.2}
+    },
+    "soft": {
+        "lowPass": {"smoothing": 20.0}
+    },
+    "tremolo": {
+        "tremolo": {"frequency": 4.0, "depth": 0.5}
+    }
+}
+
+# Spoken names for presets (Hindi and English)
+FILTER_ALIASES: Dict[str, str] = {
+    "bass boost": "bass_boost",
+    "bass": "bass_boost",
+    "बेस": "bass_boost",
+    "treble": "treble_boost",
+    "nightcore": "nightcore",
+    "नाइटकोर": "nightcore",
+    "vaporwave": "vaporwave",
+    "slowed": "vaporwave",
+    "karaoke": "karaoke",
+    "कराओके": "karaoke",
+    "8d": "8d",
+    "soft": "soft",
+    "tremolo": "tremolo"
+}
+
+class FilterEngine:
+    """
+    Composes filter presets into one Lavalink filter payload
+    
+    Composition rules:
+    - equalizer: gains for the same band are summed (clamped to -0.25..1.0)
+    - timescale: speed, pitch and rate are multiplied
+    - volume: multiplied
+    - any other filter: later presets (by name) override earlier ones
+    
+    Merged payloads are cached per preset combination, so switching
+    between combinations costs one dict lookup and one update.
+    """
+    
+    EQ_MIN = -0.25
+    EQ_MAX = 1.0
+    
+    def __init__(self, presets: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.presets = presets if presets is not None else FILTER_PRESETS
+        self._cache: Dict[frozenset, Dict[str, Any]] = {}
+    
+    def compose(self, names: Iterable[str]) -> Dict[str, Any]:
+        """
+        Merged filter payload for a set of presets
+        
+        Args:
+            names: Preset names (order does not matter)
+        """
+        key = frozenset(names)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        
+        unknown = key - set(self.presets)
+        if unknown:
+            raise ValueError(f"Unknown filter presets: {sorted(unknown)}")
+        
+        bands: Dict[int, float] = {}
+        timescale: Dict[str, float] = {}
+        merged: Dict[str, Any] = {}
+        
+        for name in sorted(key):
+            for filter_name, value in self.presets[name].items():
+                if filter_name == "equalizer":
+                    for band in value:
+                        bands[band["band"]] = bands.get(band["band"], 0.0) + band["gain"]
+                elif filter_name == "timescale":
+                    for field, factor in value.items():
+                        timescale[field] = timescale.get(field, 1.0) * factor
+                elif filter_name == "volume":
+                    merged["volume"] = merged.get("volume", 1.0) * value
+                else:
+                    merged[filter_name] = dict(value)
+        
+        if bands:
+            merged["equalizer"] = [
+                {"band": band, "gain": round(max(self.EQ_MIN, min(self.EQ_MAX, gain)), 4)}
+                for band, gain in sorted(bands.items())
+            ]
+        if timescale:
+            merged["timescale"] = {field: round(value, 4) for field, value in timescale.items()}
+        
+        self._cache[key] = merged
+        return merged
+    
+    @staticmethod
+    def presets_in(text: str) -> List[str]:
+        """Preset names mentioned in a spoken request ("bass boost and nightcore")"""
+        text = unicodedata.normalize('NFC', text).casefold()
+        found = []
+        # Longest aliases first so "bass boost" wins over "bass"
+        for alias in sorted(FILTER_ALIASES, key=len, reverse=True):
+            start = text.find(alias)
+            while start != -1:
+                end = start + len(alias)
+                # Whole words only: "soft" is not in "software"
+                if ((start == 0 or not _is_word_char(text[start - 1]))
+                        and (end == len(text) or not _is_word_char(text[end]))):
+                    text = text[:start] + " " * len(alias) + text[end:]
+                    preset = FILTER_ALIASES[alias]
+                    if preset not in found:
+                        found.append(preset)
+                start = text.find(alias, start + 1)
+        return found
+    
+    @staticmethod
+    def transition_steps(current: Dict[str, Any], target: Dict[str, Any], steps: int) -> List[Dict[str, Any]]:
+        """
+        Intermediate payloads from current to target filters
+        
+        Equalizer gains and timescale factors are interpolated; other
+        filters switch at the final step. The last payload is the target.
+        """
+        if steps <= 1:
+            return [target]
+        
+        current_bands = {b["band"]: b["gain"] for b in current.get("equalizer", [])}
+        target_bands = {b["band"]: b["gain"] for b in target.get("equalizer", [])}
+        all_bands = sorted(set(current_bands) | set(target_bands))
+        current_ts = current.get("timescale", {})
+        target_ts = target.get("timescale", {})
+        ts_fields = sorted(set(current_ts) | set(target_ts))
+        
+        payloads = []
+        for step in range(1, steps):
+            t = step / steps
+            payload = {k: v for k, v in current.items() if k not in ("equalizer", "timescale")}
+            if all_bands:
+                payload["equalizer"] = [
+                    {"band": band, "gain": round(current_bands.get(band, 0.0) * (1 - t) + target_bands.get(band, 0.0) * t, 4)}
+                    for band in all_bands
+                ]
+            if ts_fields:
+                payload["timescale"] = {
+                    field: round(current_ts.get(field, 1.0) * (1 - t) + target_ts.get(field, 1.0) * t, 4)
+                    for field in ts_fields
+                }
+            payloads.append(payload)
+        
+        payloads.append(target)
+        return payloads
+
+@dataclass
+class BatchItemResult:
+    """Outcome of one item in a batch audio operation"""
+    key: str
+    success: bool
+    result: Any = None
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        return {
+            "key": self.key,
+            "success": self.success,
+            "result": self.result,
+            "error": self.error
+        }
+
 @dataclass
 class PlayerState:
     """Current player state"""
@@ -72,18 +711,170 @@ class LavalinkPlayer:
     Manages audio playback for a single session
     """
     
-    def __init__(self, session_id: str, lavalink_client: 'LavalinkClient'):
+    def __init__(self, session_id: str, lavalink_client: 'LavalinkClient',
+                 compact_queue: bool = False, history_size: int = 50,
+                 prefetch_depth: int = 3, lookahead_ms: int = 50):
+        """
+        Args:
+            session_id: Player (guild) id
+            lavalink_client: Client owning the player
+            compact_queue: Keep only encoded strings in the queue
+            history_size: Number of played tracks remembered
+            prefetch_depth: Queued entries kept resolved and decoded ahead of time
+            lookahead_ms: Start the next track this long (plus the measured
+                update latency) before the current one ends; 0 waits for
+                Lavalink's TrackEndEvent instead
+        """
         self.session_id = session_id
         self.client = lavalink_client
         self.current_track: Optional[Track] = None
-        self.queue: List[Track] = []
+        self.queue = TrackQueue(compact=compact_queue, history_size=history_size)
         self.volume = 100
         self.paused = False
         self.position = 0
         self.filters = {}
+        self.filter_presets: frozenset = frozenset()
+        self.state: Optional[PlayerState] = None
+        self.last_active = time.monotonic()
+        self._sync_settings = False
+        
+        # Queries queued by name sit in the queue as PendingQuery entries
+        # until the prefetcher resolves them
+        self.prefetch_depth = prefetch_depth
+        self.lookahead_ms = lookahead_ms
+        self._prefetch_lock = asyncio.Lock()
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._lookahead_task: Optional[asyncio.Task] = None
+        # play_next() calls in flight; the track they replace may report
+        # FINISHED before current_track changes
+        self._advancing = 0
         
         logger.info(f"🎵 Player created for session: {session_id}")
     
+    def touch(self):
+        """Record activity (keeps the player from idle eviction)"""
+        self.last_active = time.monotonic()
+    
+    @property
+    def playing(self) -> bool:
+        return self.current_track is not None and not self.paused
+    
+    def idle_for(self) -> float:
+        """Seconds since the last activity, or 0 while playing"""
+        if self.playing:
+            return 0.0
+        return time.monotonic() - self.last_active
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Compact state for restoring the player later"""
+        return {
+            "current": self.current_track.encoded if self.current_track else None,
+            "position": self.current_position,
+            "queue": self.queue.encoded(),
+            "volume": self.volume,
+            "filters": self.filters,
+            "presets": sorted(self.filter_presets)
+        }
+    
+    def restore(self, snapshot: Dict[str, Any]):
+        """
+        Restore queue and settings from a snapshot
+        
+        The interrupted track goes back to the front of the queue; nothing
+        plays until the next play/skip.
+        """
+        encoded = snapshot.get("queue", [])
+        if snapshot.get("current"):
+            encoded = [snapshot["current"]] + encoded
+        self.queue.extend(
+            PendingQuery(e["query"]) if isinstance(e, dict) else _track_from_encoded(e)
+            for e in encoded
+        )
+        # Snapshots from before pending queries were kept in the queue
+        self.queue.extend(PendingQuery(query) for query in snapshot.get("pending", []))
+        self.volume = snapshot.get("volume", 100)
+        self.filters = snapshot.get("filters", {})
+        self.filter_presets = frozenset(snapshot.get("presets", []))
+        self.position = snapshot.get("position", 0) if snapshot.get("current") else 0
+        self._sync_settings = True
+        
+        logger.info(f"♻️ Player restored: {self.session_id} ({len(self.queue)} queued)")
+    
+    @property
+    def current_position(self) -> int:
+        """Playback position extrapolated from the last playerUpdate"""
+        if not self.state or self.paused or not self.current_track:
+            return self.position
+        position = self.position + max(0, int(time.time() * 1000) - self.state.time)
+        if self.current_track.duration and not self.current_track.is_stream:
+            position = min(position, self.current_track.duration)
+        return position
+    
+    def _rebase_position(self, position: int):
+        """Restart position extrapolation from a locally known position"""
+        self.position = position
+        now = int(time.time() * 1000)
+        if self.state:
+            self.state.time = now
+            self.state.position = position
+        else:
+            # No playerUpdate yet; extrapolate from our own clock
+            self.state = PlayerState(time=now, position=position, connected=False, ping=-1)
+    
+    def update_state(self, state: Dict[str, Any]):
+        """Apply a playerUpdate from the Lavalink WebSocket"""
+        self.state = PlayerState(
+            time=state.get('time', 0),
+            position=state.get('position', 0),
+            connected=state.get('connected', False),
+            ping=state.get('ping', -1)
+        )
+        self.position = self.state.position
+    
+    async def handle_event(self, event: Dict[str, Any]):
+        """
+        Handle a player event from the Lavalink WebSocket
+        
+        Args:
+            event: Event payload (op "event")
+        """
+        event_type = event.get('type')
+        
+        self.touch()
+        
+        if event_type == 'TrackStartEvent':
+            logger.info(f"🎶 Track started: {self.current_track.title if self.current_track else '?'}")
+        
+        elif event_type == 'TrackEndEvent':
+            reason = TrackEndReason(event.get('reason', 'finished'))
+            logger.info(f"⏭️ Track ended ({reason.value})")
+            
+            # The lookahead may already have started (or be starting) the next track
+            ended = event.get('track', {}).get('encoded')
+            if ended and self.current_track and ended != self.current_track.encoded:
+                return
+            if self._advancing:
+                return
+            
+            # REPLACED/STOPPED/CLEANUP are caused by us; don't advance
+            if reason in (TrackEndReason.FINISHED, TrackEndReason.LOAD_FAILED):
+                if not await self.play_next():
+                    if self.current_track:
+                        self.queue.record(self.current_track)
+                    self.current_track = None
+                    self.position = 0
+        
+        elif event_type == 'TrackExceptionEvent':
+            logger.error(f"❌ Track exception: {event.get('exception', {}).get('message')}")
+        
+        elif event_type == 'TrackStuckEvent':
+            logger.warning(f"⚠️ Track stuck for {event.get('thresholdMs')}ms, skipping")
+            if not self._advancing:
+                await self.play_next()
+        
+        elif event_type == 'WebSocketClosedEvent':
+            logger.warning(f"⚠️ Voice connection closed: {event.get('reason')}")
+    
     async def play(self, track: Track, start_time: int = 0):
         """
         Play a track
@@ -97,9 +888,20 @@ class LavalinkPlayer:
             "position": start_time
         }
         
+        # A restored player starts fresh on Lavalink; send its settings along
+        if self._sync_settings:
+            payload["volume"] = self.volume
+            payload["filters"] = self.filters
+            self._sync_settings = False
+        
         await self.client._send_player_update(self.session_id, payload)
+        if self.current_track:
+            self.queue.record(self.current_track)
         self.current_track = track
         self.paused = False
+        self._rebase_position(start_time)
+        self._schedule_lookahead()
+        self.schedule_prefetch()
         
         logger.info(f"▶️ Playing: {track.title} by {track.author}")
     
@@ -107,7 +909,10 @@ class LavalinkPlayer:
         """Pause or resume playback"""
         payload = {"paused": paused}
         await self.client._send_player_update(self.session_id, payload)
+        position = self.current_position
         self.paused = paused
+        self._rebase_position(position)
+        self._schedule_lookahead()
         
         logger.info(f"{'⏸️ Paused' if paused else '▶️ Resumed'}")
     
@@ -117,6 +922,7 @@ class LavalinkPlayer:
         await self.client._send_player_update(self.session_id, payload)
         self.current_track = None
         self.paused = False
+        self._schedule_lookahead()
         
         logger.info("⏹️ Stopped")
     
@@ -129,7 +935,8 @@ class LavalinkPlayer:
         """
         payload = {"position": position}
         await self.client._send_player_update(self.session_id, payload)
-        self.position = position
+        self._rebase_position(position)
+        self._schedule_lookahead()
         
         logger.info(f"⏩ Seeked to: {position}ms")
     
@@ -160,18 +967,149 @@ class LavalinkPlayer:
         
         logger.info(f"🎛️ Filters applied: {list(filters.keys())}")
     
+    async def apply_presets(self, presets: Iterable[str], engine: 'FilterEngine',
+                            transition_ms: int = 0, steps: int = 3):
+        """
+        Switch to a set of filter presets in one update
+        
+        Args:
+            presets: Preset names to have active
+            engine: FilterEngine composing the payload
+            transition_ms: Fade filters over this duration (0 = instant)
+            steps: Number of updates used for a fade
+        """
+        presets = frozenset(presets)
+        target = engine.compose(presets)
+        
+        if transition_ms > 0 and steps > 1:
+            payloads = engine.transition_steps(self.filters, target, steps)
+            delay = transition_ms / 1000 / len(payloads)
+            for payload in payloads[:-1]:
+                await self.client._send_player_update(self.session_id, {"filters": payload})
+                await asyncio.sleep(delay)
+        
+        await self.set_filters(target)
+        self.filter_presets = presets
+    
     def add_to_queue(self, track: Track):
         """Add track to queue"""
         self.queue.append(track)
+        self.touch()
         logger.info(f"➕ Added to queue: {track.title}")
     
+    def add_many_to_queue(self, tracks: List[Track]):
+        """Add many tracks to the queue in one step"""
+        self.queue.extend(tracks)
+        self.touch()
+        logger.info(f"➕ Added {len(tracks)} tracks to queue")
+    
+    def queue_queries(self, queries: List[str]):
+        """
+        Queue tracks by search query
+        
+        Queries take their place in the queue right away and are resolved
+        in order by the prefetcher, a few ahead of playback, instead of
+        all up front.
+        """
+        self.queue.extend(PendingQuery(query) for query in queries)
+        self.touch()
+        self.schedule_prefetch()
+        logger.info(f"➕ Queued {len(queries)} queries")
+    
+    def schedule_prefetch(self):
+        """Start the prefetcher unless it is already running"""
+        if self._prefetch_task and not self._prefetch_task.done():
+            return
+        if not self.queue:
+            return
+        self._prefetch_task = asyncio.create_task(self.prefetch())
+    
+    async def prefetch(self, depth: Optional[int] = None):
+        """
+        Get the next queue items ready to play
+        
+        Pending queries are resolved into tracks in place and tracks
+        without info are decoded, so advancing never waits on a search.
+        
+        Args:
+            depth: Entries to prepare (default: prefetch_depth)
+        """
+        depth = self.prefetch_depth if depth is None else depth
+        async with self._prefetch_lock:
+            index = 0
+            while index < min(depth, len(self.queue)):
+                try:
+                    track = self.queue[index]
+                except Exception:
+                    index += 1
+                    continue  # Not decodable locally
+                
+                if isinstance(track, PendingQuery):
+                    tracks = await self.client.search(track.query)
+                    if not tracks:
+                        logger.warning(f"No tracks found for queued query: {track.query}")
+                    # The queue may have changed meanwhile; re-read this position
+                    self.queue.resolve(track, tracks[0] if tracks else None)
+                    continue
+                
+                if not track.info:
+                    decoded = await self.client.decode_track(track.encoded)
+                    if decoded:
+                        track.info = decoded.info
+                index += 1
+    
+    def _schedule_lookahead(self):
+        if self._lookahead_task:
+            self._lookahead_task.cancel()
+            self._lookahead_task = None
+        
+        track = self.current_track
+        if (track is None or self.paused or track.is_stream
+                or not track.duration or self.lookahead_ms <= 0):
+            return
+        self._lookahead_task = asyncio.create_task(self._lookahead(track))
+    
+    async def _lookahead(self, track: Track):
+        """Start the next track just before `track` ends"""
+        while True:
+            lead = self.lookahead_ms + self.client.update_latency * 1000
+            remaining = track.duration - self.current_position - lead
+            if remaining <= 0:
+                break
+            await asyncio.sleep(remaining / 1000)
+            if self.current_track is not track or self.paused:
+                return
+        
+        if self.queue.next_pending:
+            await self.prefetch(1)
+        if self.current_track is track and self.queue:
+            # play() reschedules the lookahead; don't let it cancel this task
+            self._lookahead_task = None
+            await self.play_next()
+    
+    def cancel_tasks(self):
+        """Stop background prefetch and lookahead"""
+        for task in (self._prefetch_task, self._lookahead_task):
+            if task:
+                task.cancel()
+        self._prefetch_task = None
+        self._lookahead_task = None
+    
     async def play_next(self):
         """Play next track in queue"""
-        if self.queue:
-            track = self.queue.pop(0)
-            await self.play(track)
-            return True
-        return False
+        self._advancing += 1
+        try:
+            if self.queue.next_pending:
+                await self.prefetch(1)
+            if self.queue and not self.queue.next_pending:
+                track = self.queue.popleft()
+                # Resume a track interrupted by eviction where it left off
+                start = self.position if self._sync_settings else 0
+                await self.play(track, start)
+                return True
+            return False
+        finally:
+            self._advancing -= 1
     
     def clear_queue(self):
         """Clear the queue"""
@@ -190,7 +1128,10 @@ class LavalinkClient:
     - Multiple player sessions
     """
     
-    def __init__(self, host: str = "localhost", port: int = 2333, password: str = "youshallnotpass"):
+    def __init__(self, host: str = "localhost", port: int = 2333, password: str = "youshallnotpass",
+                 search_cache: Optional['SearchCache'] = None, update_window: float = 0.03,
+                 snapshots: Optional['PlayerSnapshotStore'] = None, max_players: int = 100,
+                 idle_timeout: float = 600):
         """
         Initialize Lavalink client
         
@@ -198,63 +1139,352 @@ class LavalinkClient:
             host: Lavalink server host
             port: Lavalink server port
             password: Lavalink server password
+            search_cache: Search result cache (a private in-memory one by default)
+            update_window: Seconds to coalesce player updates (0 disables)
+            snapshots: Store for queues of evicted players
+            max_players: Most players kept at once (least recently active evicted)
+            idle_timeout: Seconds a stopped/paused player lives without activity
         """
         self.host = host
         self.port = port
         self.password = password
         self.base_url = f"http://{host}:{port}"
+        self.ws_url = f"ws://{host}:{port}/v4/websocket"
         
         self.session: Optional[aiohttp.ClientSession] = None
         self.players: Dict[str, LavalinkPlayer] = {}
         
+        # WebSocket event channel
+        self.session_id: Optional[str] = None
+        self.resume_timeout = 60
+        self.stats: Dict[str, Any] = {}
+        self.ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._ws_task: Optional[asyncio.Task] = None
+        self._message_tasks: set = set()
+        self._ready = asyncio.Event()
+        self._closing = False
+        
+        # Search and decode caches
+        self.search_cache = search_cache or SearchCache()
+        self.decode_cache: OrderedDict = OrderedDict()
+        self.decode_cache_size = 4096
+        self._inflight: Dict[str, asyncio.Task] = {}
+        
+        # Player PATCH coalescing
+        self.updates = PlayerUpdateCoalescer(self._patch_player, update_window)
+        # Smoothed PATCH round trip, used to time gapless track changes
+        self.patch_latency = 0.0
+        
+        # Player lifecycle
+        self.snapshots = snapshots or PlayerSnapshotStore()
+        self.max_players = max_players
+        self.idle_timeout = idle_timeout
+        self.evictions = 0
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._background: set = set()
+        
         logger.info(f"🎵 Lavalink client initialized: {self.base_url}")
     
-    async def connect(self):
-        """Establish connection to Lavalink server"""
-        self.session = aiohttp.ClientSession(headers={
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
             "Authorization": self.password,
             "User-Id": "mr-happy-ai",
             "Client-Name": "MrHappy/1.0"
-        })
+        }
+    
+    async def connect(self, ready_timeout: float = 10):
+        """Establish connection to Lavalink server"""
+        self._closing = False
+        self.session = aiohttp.ClientSession(headers=self.headers)
         
         # Test connection
         try:
             async with self.session.get(f"{self.base_url}/version") as resp:
-                if resp.status == 200:
-                    version = await resp.text()
-                    logger.info(f"✅ Connected to Lavalink {version}")
-                    return True
+                if resp.status != 200:
+                    return False
+                version = await resp.text()
+                logger.info(f"✅ Connected to Lavalink {version}")
         except Exception as e:
             logger.error(f"❌ Failed to connect to Lavalink: {e}")
             return False
+        
+        # Open the event channel and wait for the session id
+        self._ws_task = asyncio.create_task(self._run_websocket())
+        self._reaper_task = asyncio.create_task(self._reap_idle_players())
+        try:
+            await asyncio.wait_for(self._ready.wait(), ready_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ Lavalink WebSocket not ready, continuing without events")
+        return True
     
     async def disconnect(self):
         """Close connection"""
+        self._closing = True
+        if self._reaper_task:
+            self._reaper_task.cancel()
+        for player in self.players.values():
+            player.cancel_tasks()
+        for task in self._message_tasks:
+            task.cancel()
+        if self._message_tasks:
+            await asyncio.gather(*self._message_tasks, return_exceptions=True)
+        if self._background:
+            await asyncio.wait(self._background, timeout=5)
+        await self.updates.flush_all()
+        stats = self.updates.stats()
+        if stats["saved"]:
+            logger.info(f"📉 Player updates: {stats['updates']} coalesced into {stats['requests']} requests")
+        if self._ws_task:
+            self._ws_task.cancel()
+            try:
+                await self._ws_task
+            except asyncio.CancelledError:
+                pass
+        if self.ws and not self.ws.closed:
+            await self.ws.close()
         if self.session:
             await self.session.close()
             logger.info("👋 Disconnected from Lavalink")
     
+    async def _run_websocket(self):
+        """Keep the WebSocket connected, resuming the session after drops"""
+        backoff = 1
+        while not self._closing:
+            headers = dict(self.headers)
+            if self.session_id:
+                headers["Session-Id"] = self.session_id
+            
+            try:
+                async with self.session.ws_connect(self.ws_url, headers=headers, heartbeat=30) as ws:
+                    self.ws = ws
+                    backoff = 1
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            await self._handle_message(json.loads(message.data))
+                        elif message.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Lavalink WebSocket error: {e}")
+            
+            self._ready.clear()
+            if self._closing:
+                break
+            logger.warning(f"🔌 Lavalink WebSocket closed, reconnecting in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+    
+    async def _handle_message(self, data: Dict[str, Any]):
+        """Dispatch a WebSocket message"""
+        op = data.get('op')
+        
+        if op == 'ready':
+            resumed = data.get('resumed', False)
+            self.session_id = data['sessionId']
+            self._ready.set()
+            logger.info(f"🔗 Lavalink session {'resumed' if resumed else 'ready'}: {self.session_id}")
+            
+            self._spawn(self._configure_resuming())
+            if not resumed:
+                self._spawn(self._restore_players())
+        
+        elif op == 'playerUpdate':
+            player = self.players.get(data.get('guildId'))
+            if player:
+                player.update_state(data.get('state', {}))
+        
+        elif op == 'stats':
+            self.stats = data
+        
+        elif op == 'event':
+            player = self.players.get(data.get('guildId'))
+            if player:
+                # Don't block the reader while the next track is started
+                self._spawn(player.handle_event(data))
+    
+    def _spawn(self, coroutine) -> asyncio.Task:
+        """Run a message handler in the background; cancelled on disconnect"""
+        task = asyncio.create_task(coroutine)
+        self._message_tasks.add(task)
+        task.add_done_callback(self._message_tasks.discard)
+        return task
+    
+    async def _configure_resuming(self):
+        """Ask Lavalink to keep the session alive across reconnects"""
+        try:
+            async with self.session.patch(
+                f"{self.base_url}/v4/sessions/{self.session_id}",
+                json={"resuming": True, "timeout": self.resume_timeout}
+            ) as resp:
+                if resp.status != 200:
+                    logger.warning(f"⚠️ Session resuming not enabled: {resp.status}")
+        except Exception as e:
+            logger.error(f"❌ Session update error: {e}")
+    
+    async def _restore_players(self):
+        """Recreate players on a fresh session (resume window missed)"""
+        for player in list(self.players.values()):
+            if player.current_track:
+                logger.info(f"♻️ Restoring player: {player.session_id}")
+                await self._send_player_update(player.session_id, {
+                    "encodedTrack": player.current_track.encoded,
+                    "position": player.current_position,
+                    "volume": player.volume,
+                    "paused": player.paused,
+                    "filters": player.filters
+                })
+    
+    def _player_url(self, guild_id: str) -> str:
+        # Before the WebSocket is ready fall back to the player id
+        session_id = self.session_id or guild_id
+        return f"{self.base_url}/v4/sessions/{session_id}/players/{guild_id}"
+    
+    @property
+    def update_latency(self) -> float:
+        """Expected seconds from a player update to Lavalink applying it"""
+        return self.updates.window + self.patch_latency
+    
+    @property
+    def available(self) -> bool:
+        """Connected with a live event channel"""
+        return (self.session is not None and not self.session.closed
+                and self._ready.is_set() and not self._closing)
+    
+    @property
+    def penalty(self) -> float:
+        """
+        Load penalty from the node's reported stats (lower is better)
+        
+        Same weighting as the reference Lavalink clients: playing players,
+        an exponential CPU term and exponential frame deficit/nulled terms.
+        Players created since the last stats report count as playing, so a
+        burst of new players doesn't all land on the same node.
+        """
+        if not self.stats:
+            return float(len(self.players))
+        
+        cpu = self.stats.get('cpu', {})
+        frames = self.stats.get('frameStats') or {}
+        
+        players = self.stats.get('playingPlayers', 0)
+        players += max(0, len(self.players) - self.stats.get('players', 0))
+        cpu_penalty = 1.05 ** (100 * cpu.get('systemLoad', 0)) * 10 - 10
+        deficit_penalty = 1.03 ** (500 * (frames.get('deficit', 0) / 3000)) * 600 - 600
+        nulled_penalty = (1.03 ** (500 * (frames.get('nulled', 0) / 3000)) * 300 - 300) * 2
+        
+        return players + cpu_penalty + deficit_penalty + nulled_penalty
+    
     def get_player(self, session_id: str) -> LavalinkPlayer:
         """Get or create a player for a session"""
         if session_id not in self.players:
-            self.players[session_id] = LavalinkPlayer(session_id, self)
+            if len(self.players) >= self.max_players:
+                self._evict_least_active()
+            
+            player = LavalinkPlayer(session_id, self)
+            snapshot = self.snapshots.pop(session_id)
+            if snapshot:
+                player.restore(snapshot)
+            self.players[session_id] = player
         return self.players[session_id]
     
-    async def search(self, query: str, source: str = "ytsearch") -> List[Track]:
+    def _evict_least_active(self):
+        # Prefer idle players; among equals the least recently active
+        victim = max(
+            self.players.values(),
+            key=lambda player: (not player.playing, time.monotonic() - player.last_active)
+        )
+        self._forget_player(victim)
+        task = asyncio.ensure_future(self._delete_player(victim.session_id))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+    
+    def _forget_player(self, player: LavalinkPlayer):
+        player.cancel_tasks()
+        self.snapshots.save(player.session_id, player.snapshot())
+        self.players.pop(player.session_id, None)
+        self.updates.discard(player.session_id)
+        self.evictions += 1
+        logger.info(f"💤 Player evicted: {player.session_id}")
+    
+    async def destroy_player(self, session_id: str, persist: bool = True):
+        """
+        Destroy a player on Lavalink and locally
+        
+        Args:
+            session_id: Player to destroy
+            persist: Keep a snapshot so the queue can be restored
+        """
+        player = self.players.get(session_id)
+        if not player:
+            return
+        
+        if persist:
+            self._forget_player(player)
+        else:
+            player.cancel_tasks()
+            self.players.pop(session_id, None)
+            self.updates.discard(session_id)
+        await self._delete_player(session_id)
+    
+    async def _reap_idle_players(self, interval: float = 60):
+        """Periodically destroy players idle past idle_timeout"""
+        while True:
+            await asyncio.sleep(min(interval, self.idle_timeout))
+            for player in list(self.players.values()):
+                try:
+                    if player.idle_for() >= self.idle_timeout:
+                        await self.destroy_player(player.session_id)
+                except Exception as e:
+                    logger.error(f"❌ Reaping player {player.session_id} failed: {e}")
+    
+    async def search(self, query: str, source: str = "ytsearch", use_cache: bool = True) -> List[Track]:
         """
         Search for tracks
         
+        Repeat queries are answered from the search cache, and concurrent
+        identical searches share a single Lavalink request.
+        
         Args:
             query: Search query
             source: Source identifier (ytsearch, scsearch, spsearch, etc.)
+            use_cache: Set False to force a fresh lookup
             
         Returns:
             List of tracks
         """
-        if not query.startswith("http"):
-            query = f"{source}:{query}"
+        identifier = query if query.startswith("http") else f"{source}:{query}"
+        
+        if not use_cache:
+            return await self._load_tracks(identifier)
+        
+        key = self.search_cache.key(source, query)
+        cached = await self.search_cache.get(key)
+        if cached is not None:
+            logger.info(f"⚡ Search cache hit: {query}")
+            return list(cached)
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._search_and_cache(key, identifier))
+            self._inflight[key] = task
         
-        params = {"identifier": query}
+        # Shielded so one caller giving up doesn't cancel the others
+        return list(await asyncio.shield(task))
+    
+    async def _search_and_cache(self, key: str, identifier: str) -> List[Track]:
+        try:
+            tracks = await self._load_tracks(identifier)
+            if tracks:
+                await self.search_cache.put(key, tracks)
+            return tracks
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _load_tracks(self, identifier: str) -> List[Track]:
+        """Resolve an identifier with /v4/loadtracks"""
+        params = {"identifier": identifier}
         
         try:
             async with self.session.get(
@@ -279,26 +1509,47 @@ class LavalinkClient:
                         return [Track(t['encoded'], t['info']) for t in tracks_data]
                     
                     else:
-                        logger.warning(f"No tracks found for: {query}")
+                        logger.warning(f"No tracks found for: {identifier}")
                         return []
+                
+                logger.error(f"❌ Search failed: {resp.status}")
         except Exception as e:
             logger.error(f"❌ Search error: {e}")
-            return []
+        return []
     
     async def _send_player_update(self, session_id: str, payload: Dict[str, Any]):
-        """Send player update to Lavalink"""
+        """Send player update to Lavalink (coalesced with other updates in flight)"""
+        player = self.players.get(session_id)
+        if player is None:
+            # Evicted or destroyed while a caller still held it; sending would
+            # recreate the player on Lavalink after its DELETE
+            logger.debug(f"Dropping update for evicted player {session_id}")
+            return
+        player.touch()
+        await self.updates.submit(session_id, payload)
+    
+    async def _patch_player(self, session_id: str, payload: Dict[str, Any]):
+        """PATCH the player on Lavalink"""
+        started = time.monotonic()
         try:
             async with self.session.patch(
-                f"{self.base_url}/v4/sessions/{session_id}/players/{session_id}",
+                self._player_url(session_id),
                 json=payload
             ) as resp:
                 if resp.status not in [200, 204]:
                     logger.error(f"❌ Player update failed: {resp.status}")
+            elapsed = time.monotonic() - started
+            self.patch_latency = elapsed if not self.patch_latency else 0.8 * self.patch_latency + 0.2 * elapsed
         except Exception as e:
             logger.error(f"❌ Player update error: {e}")
     
     async def decode_track(self, encoded: str) -> Optional[Track]:
         """Decode a track from encoded string"""
+        info = self.decode_cache.get(encoded)
+        if info is not None:
+            self.decode_cache.move_to_end(encoded)
+            return Track(encoded, info)
+        
         try:
             async with self.session.get(
                 f"{self.base_url}/v4/decodetrack",
@@ -306,16 +1557,29 @@ class LavalinkClient:
             ) as resp:
                 if resp.status == 200:
                     info = await resp.json()
+                    self.decode_cache[encoded] = info
+                    if len(self.decode_cache) > self.decode_cache_size:
+                        self.decode_cache.popitem(last=False)
                     return Track(encoded, info)
         except Exception as e:
             logger.error(f"❌ Decode error: {e}")
         return None
     
+    async def _delete_player(self, session_id: str) -> bool:
+        """DELETE the player on Lavalink"""
+        try:
+            async with self.session.delete(self._player_url(session_id)) as resp:
+                return resp.status in [200, 204]
+        except Exception as e:
+            logger.error(f"❌ Player delete error: {e}")
+            return False
+    
     async def get_player_info(self, session_id: str) -> Optional[Dict]:
         """Get player information"""
+        await self.updates.flush(session_id)
         try:
             async with self.session.get(
-                f"{self.base_url}/v4/sessions/{session_id}/players/{session_id}"
+                self._player_url(session_id)
             ) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -323,32 +1587,225 @@ class LavalinkClient:
             logger.error(f"❌ Get player info error: {e}")
         return None
 
+class LavalinkNodePool:
+    """
+    Several Lavalink nodes behind the LavalinkClient interface
+    
+    - New players go to the available node with the lowest load penalty
+    - Searches and decodes go to the least-loaded node, with one shared
+      search cache
+    - When a node stays unavailable past `failover_after` seconds, its
+      players move to another node with their queue, volume, filters and
+      playback position intact
+    - Nodes that are down at boot are retried with backoff until they join
+    """
+    
+    def __init__(self, nodes: List[tuple], password: str = "youshallnotpass",
+                 search_cache: Optional[SearchCache] = None, failover_after: float = 3,
+                 check_interval: float = 1):
+        """
+        Args:
+            nodes: (host, port) pairs
+            password: Lavalink server password
+            search_cache: Search cache shared by all nodes
+            failover_after: Seconds a node may be down before its players move
+            check_interval: Seconds between node availability checks
+        """
+        self.search_cache = search_cache or SearchCache()
+        self.snapshots = PlayerSnapshotStore()
+        self.nodes = [
+            LavalinkClient(host, port, password, search_cache=self.search_cache,
+                           snapshots=self.snapshots)
+            for host, port in nodes
+        ]
+        self.failover_after = failover_after
+        self.check_interval = check_interval
+        self.migrations = 0
+        self._down_since: Dict[LavalinkClient, float] = {}
+        # Players moved off a node, to delete there if it comes back
+        self._orphans: Dict[LavalinkClient, List[str]] = {}
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._retry_tasks: Dict[LavalinkClient, asyncio.Task] = {}
+        
+        logger.info(f"🎵 Lavalink node pool: {len(self.nodes)} nodes")
+    
+    @property
+    def players(self) -> Dict[str, LavalinkPlayer]:
+        players = {}
+        for node in self.nodes:
+            players.update(node.players)
+        return players
+    
+    async def connect(self) -> bool:
+        """Connect every node; succeeds if at least one is up"""
+        results = await asyncio.gather(*(node.connect() for node in self.nodes))
+        for node, connected in zip(self.nodes, results):
+            if not connected:
+                self._retry_tasks[node] = asyncio.create_task(self._retry_connect(node))
+        self._monitor_task = asyncio.create_task(self._monitor())
+        return any(results)
+    
+    async def _retry_connect(self, node: LavalinkClient):
+        """Keep connecting a node that was down at boot"""
+        backoff = 1
+        try:
+            while True:
+                logger.warning(f"🔌 Lavalink node {node.base_url} down, retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+                # connect() opens a new HTTP session each attempt
+                if node.session:
+                    await node.session.close()
+                if await node.connect():
+                    logger.info(f"✅ Lavalink node {node.base_url} joined the pool")
+                    return
+        finally:
+            self._retry_tasks.pop(node, None)
+    
+    async def disconnect(self):
+        """Disconnect every node"""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+        for task in list(self._retry_tasks.values()):
+            task.cancel()
+        await asyncio.gather(*(node.disconnect() for node in self.nodes))
+    
+    def best_node(self, exclude: Optional[LavalinkClient] = None) -> LavalinkClient:
+        """Least-loaded available node (falls back to any node)"""
+        candidates = [node for node in self.nodes if node.available and node is not exclude]
+        if not candidates:
+            candidates = [node for node in self.nodes if node is not exclude] or self.nodes
+        return min(candidates, key=lambda node: node.penalty)
+    
+    def node_for(self, session_id: str) -> Optional[LavalinkClient]:
+        for node in self.nodes:
+            if session_id in node.players:
+                return node
+        return None
+    
+    def get_player(self, session_id: str) -> LavalinkPlayer:
+        """Get a player, placing new ones on the least-loaded node"""
+        node = self.node_for(session_id) or self.best_node()
+        return node.get_player(session_id)
+    
+    async def search(self, query: str, source: str = "ytsearch", use_cache: bool = True) -> List[Track]:
+        return await self.best_node().search(query, source, use_cache)
+    
+    async def decode_track(self, encoded: str) -> Optional[Track]:
+        return await self.best_node().decode_track(encoded)
+    
+    async def get_player_info(self, session_id: str) -> Optional[Dict]:
+        node = self.node_for(session_id)
+        return await node.get_player_info(session_id) if node else None
+    
+    async def _monitor(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.check_interval)
+            for node in self.nodes:
+                if node.available:
+                    self._down_since.pop(node, None)
+                    for session_id in self._orphans.pop(node, []):
+                        if session_id not in node.players:
+                            await node._delete_player(session_id)
+                    continue
+                
+                down_since = self._down_since.setdefault(node, loop.time())
+                if node.players and loop.time() - down_since >= self.failover_after:
+                    await self.migrate_players(node)
+    
+    async def migrate_players(self, source: LavalinkClient):
+        """Move every player off a node, each to the least-loaded other node"""
+        for player in list(source.players.values()):
+            target = self.best_node(exclude=source)
+            if target is source or not target.available:
+                logger.warning(f"⚠️ No healthy Lavalink node to fail over to from {source.base_url}")
+                return
+            await self.migrate_player(player, target)
+    
+    async def migrate_player(self, player: LavalinkPlayer, target: LavalinkClient):
+        """Move one player to another node, resuming where it was"""
+        source = player.client
+        position = player.current_position
+        
+        source.players.pop(player.session_id, None)
+        source.updates.discard(player.session_id)
+        self._orphans.setdefault(source, []).append(player.session_id)
+        player.client = target
+        target.players[player.session_id] = player
+        
+        payload = {
+            "volume": player.volume,
+            "paused": player.paused,
+            "filters": player.filters
+        }
+        if player.current_track:
+            payload["encodedTrack"] = player.current_track.encoded
+            payload["position"] = position
+        await target._send_player_update(player.session_id, payload)
+        player._rebase_position(position)
+        
+        self.migrations += 1
+        logger.info(f"🔀 Player {player.session_id} moved {source.base_url} → {target.base_url} at {position}ms")
+
 class MrHappyAudioSystem:
     """
     Mr. Happy Audio System
     High-level audio interface for Mr. Happy AI
     """
     
-    def __init__(self, lavalink_host: str = "localhost", lavalink_port: int = 2333):
-        self.lavalink = LavalinkClient(lavalink_host, lavalink_port)
+    def __init__(self, lavalink_host: str = "localhost", lavalink_port: int = 2333,
+                 search_cache_path: Optional[str] = None,
+                 lavalink_nodes: Optional[List[tuple]] = None,
+                 batch_concurrency: int = 8,
+                 clip_server: Optional[AudioClipServer] = None):
+        search_cache = SearchCache(persist_path=search_cache_path)
+        
+        # Extra nodes join the primary one in a load-balancing pool with the same interface
+        nodes = [(lavalink_host, lavalink_port)]
+        nodes += [node for node in lavalink_nodes or [] if node not in nodes]
+        if len(nodes) > 1:
+            self.lavalink = LavalinkNodePool(nodes, search_cache=search_cache)
+        else:
+            self.lavalink = LavalinkClient(
+                lavalink_host,
+                lavalink_port,
+                search_cache=search_cache
+            )
         self.default_session = "mr-happy-main"
+        self.filters = FilterEngine()
+        # Most searches/updates a batch operation runs at once
+        self.batch_concurrency = batch_concurrency
+        
+        # Spoken replies play on a companion player while music ducks
+        self.clips = clip_server or AudioClipServer()
+        self.voice_suffix = ":voice"
+        self.duck_volume = 30
+        # session -> [volume before ducking, overlapping speeches, ducked volume]
+        self._ducks: Dict[str, List[int]] = {}
+        self._speech: set = set()
         
         logger.info("🎵 Mr. Happy Audio System initialized")
     
     async def start(self):
         """Start the audio system"""
+        await self.clips.start()
         await self.lavalink.connect()
     
     async def stop(self):
         """Stop the audio system"""
+        for task in self._speech:
+            task.cancel()
         await self.lavalink.disconnect()
+        await self.clips.stop()
     
-    async def play_music(self, query: str, session_id: Optional[str] = None) -> bool:
+    async def play_music(self, query: Union[str, List[str]], session_id: Optional[str] = None) -> bool:
         """
         Play music from query
         
         Args:
-            query: Search query or URL
+            query: Search query or URL, or several to play in order (only the
+                first is resolved now; the rest are prefetched while it plays)
             session_id: Session identifier (uses default if None)
             
         Returns:
@@ -357,6 +1814,18 @@ class MrHappyAudioSystem:
         session_id = session_id or self.default_session
         player = self.lavalink.get_player(session_id)
         
+        if not isinstance(query, str):
+            queries = list(query)
+            if not queries:
+                return False
+            tracks = await self.lavalink.search(queries[0])
+            if not tracks:
+                logger.warning(f"No tracks found for: {queries[0]}")
+                return False
+            await player.play(tracks[0])
+            player.queue_queries(queries[1:])
+            return True
+        
         # Search for tracks
         tracks = await self.lavalink.search(query)
         
@@ -368,8 +1837,8 @@ class MrHappyAudioSystem:
         await player.play(tracks[0])
         
         # Add rest to queue
-        for track in tracks[1:]:
-            player.add_to_queue(track)
+        if len(tracks) > 1:
+            player.add_many_to_queue(tracks[1:])
         
         return True
     
@@ -403,41 +1872,47 @@ class MrHappyAudioSystem:
         player = self.lavalink.get_player(session_id)
         await player.set_volume(volume)
     
-    async def apply_nightcore_filter(self, session_id: Optional[str] = None):
-        """Apply nightcore effect"""
+    async def apply_filters(self, presets: List[str], session_id: Optional[str] = None,
+                            replace: bool = False, transition_ms: int = 0) -> List[str]:
+        """
+        Apply filter presets in a single update
+        
+        Args:
+            presets: Preset names to add (see FILTER_PRESETS)
+            session_id: Session identifier (uses default if None)
+            replace: Drop presets already active instead of combining
+            transition_ms: Fade into the new filters over this duration
+            
+        Returns:
+            Active preset names
+        """
         session_id = session_id or self.default_session
         player = self.lavalink.get_player(session_id)
         
-        filters = {
-            "timescale": {
-                "speed": 1.3,
-                "pitch": 1.3,
-                "rate": 1.0
-            }
-        }
-        
-        await player.set_filters(filters)
+        active = set(presets) if replace else set(player.filter_presets) | set(presets)
+        await player.apply_presets(active, self.filters, transition_ms)
+        return sorted(active)
     
-    async def apply_bass_boost(self, session_id: Optional[str] = None):
-        """Apply bass boost"""
+    async def remove_filters(self, presets: List[str], session_id: Optional[str] = None) -> List[str]:
+        """Remove filter presets, keeping the others"""
         session_id = session_id or self.default_session
         player = self.lavalink.get_player(session_id)
         
-        filters = {
-            "equalizer": [
-                {"band": 0, "gain": 0.2},
-                {"band": 1, "gain": 0.15},
-                {"band": 2, "gain": 0.1}
-            ]
-        }
-        
-        await player.set_filters(filters)
+        active = set(player.filter_presets) - set(presets)
+        await player.apply_presets(active, self.filters)
+        return sorted(active)
+    
+    async def apply_nightcore_filter(self, session_id: Optional[str] = None):
+        """Apply nightcore effect"""
+        await self.apply_filters(["nightcore"], session_id)
+    
+    async def apply_bass_boost(self, session_id: Optional[str] = None):
+        """Apply bass boost"""
+        await self.apply_filters(["bass_boost"], session_id)
     
     async def clear_filters(self, session_id: Optional[str] = None):
         """Clear all filters"""
-        session_id = session_id or self.default_session
-        player = self.lavalink.get_player(session_id)
-        await player.set_filters({})
+        await self.apply_filters([], session_id, replace=True)
     
     async def get_now_playing(self, session_id: Optional[str] = None) -> Optional[Dict]:
         """Get currently playing track info"""
@@ -449,11 +1924,699 @@ class MrHappyAudioSystem:
         return None
     
     async def get_queue(self, session_id: Optional[str] = None) -> List[Dict]:
-        """Get queue"""
+        """Get queue (entries still being looked up have "pending": True)"""
         session_id = session_id or self.default_session
         player = self.lavalink.get_player(session_id)
         
         return [track.to_dict() for track in player.queue]
+    
+    # ============================================
+    # Batch operations
+    # ============================================
+    
+    async def _run_batch(self, items: List[Any], worker, concurrency: Optional[int] = None) -> List[BatchItemResult]:
+        """
+        Run a coroutine per item with bounded parallelism
+        
+        Failures are reported per item instead of aborting the batch.
+        Results come back in input order.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.batch_concurrency)
+        
+        async def run(item) -> BatchItemResult:
+            async with semaphore:
+                try:
+                    return BatchItemResult(str(item), True, await worker(item))
+                except Exception as e:
+                    return BatchItemResult(str(item), False, error=str(e) or type(e).__name__)
+        
+        return await asyncio.gather(*(run(item) for item in items))
+    
+    async def _resolve_first(self, query: str) -> Track:
+        tracks = await self.lavalink.search(query)
+        if not tracks:
+            raise LookupError(f"No tracks found for: {query}")
+        return tracks[0]
+    
+    async def search_many(self, queries: List[str], concurrency: Optional[int] = None) -> List[BatchItemResult]:
+        """
+        Resolve many queries concurrently
+        
+        Returns:
+            Per-query results; `result` is the best matching Track
+        """
+        return await self._run_batch(queries, self._resolve_first, concurrency)
+    
+    async def queue_many(self, queries: List[str], session_id: Optional[str] = None,
+                         play: bool = True, concurrency: Optional[int] = None) -> List[BatchItemResult]:
+        """
+        Queue many songs at once ("queue these 20 songs")
+        
+        All queries are searched concurrently; tracks are queued in the
+        order the queries were given, skipping those that found nothing.
+        
+        Args:
+            queries: Search queries or URLs
+            session_id: Session identifier (uses default if None)
+            play: Start playback if the player is idle
+            concurrency: Parallel searches (default: batch_concurrency)
+            
+        Returns:
+            Per-query results with the queued track info
+        """
+        session_id = session_id or self.default_session
+        results = await self.search_many(queries, concurrency)
+        
+        tracks = [item.result for item in results if item.success]
+        player = self.lavalink.get_player(session_id)
+        if tracks:
+            if play and player.current_track is None:
+                await player.play(tracks[0])
+                tracks = tracks[1:]
+            if tracks:
+                player.add_many_to_queue(tracks)
+        
+        for item in results:
+            if item.success:
+                item.result = item.result.to_dict()
+        
+        found = sum(item.success for item in results)
+        logger.info(f"📦 Batch queued {found}/{len(queries)} songs on {session_id}")
+        return results
+    
+    async def for_sessions(self, action: str, session_ids: Optional[List[str]] = None,
+                           concurrency: Optional[int] = None, **params) -> List[BatchItemResult]:
+        """
+        Apply one operation to many sessions at once ("volume 40 in all rooms")
+        
+        Args:
+            action: play, pause, resume, stop, skip, volume or filters
+            session_ids: Sessions to act on (default: every active player)
+            concurrency: Sessions updated in parallel (default: batch_concurrency)
+            **params: Operation parameters (query, volume, presets, replace)
+            
+        Returns:
+            Per-session results
+        """
+        actions = {
+            "play": lambda session: self.play_music(params["query"], session),
+            "pause": self.pause_music,
+            "resume": self.resume_music,
+            "stop": self.stop_music,
+            "skip": self.skip_track,
+            "volume": lambda session: self.set_volume(params["volume"], session),
+            "filters": lambda session: self.apply_filters(
+                params.get("presets", []), session, replace=params.get("replace", False)
+            )
+        }
+        if action not in actions:
+            raise ValueError(f"Unknown batch action: {action}")
+        
+        if session_ids is None:
+            session_ids = [s for s in self.lavalink.players if not s.endswith(self.voice_suffix)]
+        
+        results = await self._run_batch(session_ids, actions[action], concurrency)
+        for item in results:
+            # play/skip report "nothing to do" as False
+            if item.result is False:
+                item.success = False
+                item.error = "No tracks"
+        logger.info(f"📦 Batch {action} on {len(session_ids)} sessions")
+        return results
+    
+    # ============================================
+    # Speech playback
+    # ============================================
+    
+    @staticmethod
+    def _wav_duration_ms(audio: bytes) -> int:
+        try:
+            with wave.open(io.BytesIO(audio)) as wav:
+                return int(wav.getnframes() * 1000 / wav.getframerate())
+        except (wave.Error, EOFError, ZeroDivisionError):
+            return 0
+    
+    async def _duck(self, player: LavalinkPlayer, level: int):
+        entry = self._ducks.get(player.session_id)
+        if entry is None:
+            entry = self._ducks[player.session_id] = [player.volume, 0, player.volume]
+            if player.current_track and player.volume > level:
+                await player.set_volume(level)
+                entry[2] = player.volume
+        entry[1] += 1
+    
+    async def _unduck(self, player: LavalinkPlayer):
+        entry = self._ducks.get(player.session_id)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._ducks[player.session_id]
+            # A volume change made while speaking wins over the saved one
+            if player.volume == entry[2] and player.volume != entry[0]:
+                await player.set_volume(entry[0])
+    
+    async def speak(self, audio: bytes, session_id: Optional[str] = None,
+                    content_type: str = "audio/wav", duck_volume: Optional[int] = None) -> bool:
+        """
+        Play synthesized speech through Lavalink
+        
+        The audio is served from memory by the clip server and played on a
+        companion player ("<session>:voice"). Music on the session is ducked
+        while it speaks and restored afterwards.
+        
+        Args:
+            audio: Encoded audio (WAV from synthesize_voice)
+            session_id: Session identifier (uses default if None)
+            content_type: MIME type of the audio
+            duck_volume: Music volume while speaking (default: duck_volume)
+            
+        Returns:
+            True once speech has started
+        """
+        session_id = session_id or self.default_session
+        url = self.clips.add(audio, content_type)
+        
+        # Clip URLs are single-use; don't let them into the search cache
+        tracks = await self.lavalink.search(url, use_cache=False)
+        if not tracks:
+            self.clips.discard(url)
+            logger.warning("⚠️ Lavalink could not load the speech clip")
+            return False
+        
+        clip = tracks[0]
+        duration = clip.duration or self._wav_duration_ms(audio)
+        music = self.lavalink.get_player(session_id)
+        voice = self.lavalink.get_player(session_id + self.voice_suffix)
+        
+        await self._duck(music, self.duck_volume if duck_volume is None else duck_volume)
+        try:
+            await voice.play(clip)
+        except Exception:
+            await self._unduck(music)
+            self.clips.discard(url)
+            raise
+        
+        task = asyncio.create_task(self._finish_speech(music, voice, clip, url, duration))
+        self._speech.add(task)
+        task.add_done_callback(self._speech.discard)
+        return True
+    
+    async def _finish_speech(self, music: LavalinkPlayer, voice: LavalinkPlayer,
+                             clip: Track, url: str, duration: int):
+        """Restore the music once the clip has played out"""
+        try:
+            await asyncio.sleep(duration / 1000 + voice.client.update_latency)
+            # Speech is over early if something else took the voice player
+            while voice.current_track is clip and voice.playing and voice.current_position < duration:
+                await asyncio.sleep(0.1)
+        finally:
+            self.clips.discard(url)
+            await self._unduck(music)
+
+class _LavalinkStub:
+    """
+    Local stand-in for a Lavalink node, for the load tests
+    
+    Serves /version, the event WebSocket (ready, stats, track events),
+    player PATCH/DELETE and the session PATCH. A track "plays" for its
+    length in `durations` from the moment its PATCH is applied; then a
+    FINISHED TrackEndEvent is sent, as a real node would.
+    """
+    
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0,
+                 durations: Optional[Dict[str, int]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.durations = durations if durations is not None else {}
+        self.session_id = f"stub-{id(self):x}"
+        self.players: Dict[str, Dict[str, Any]] = {}
+        # (monotonic time, guild, encoded track) of every track start
+        self.starts: List[tuple] = []
+        self.deletes = 0
+        self.port = 0
+        self._sockets: set = set()
+        self._ends: Dict[str, asyncio.TimerHandle] = {}
+        self.runner = None
+    
+    async def start(self, port: int = 0):
+        from aiohttp import web
+        
+        app = web.Application()
+        app.router.add_get('/version', self._version)
+        app.router.add_get('/v4/websocket', self._websocket)
+        app.router.add_patch('/v4/sessions/{session}', self._patch_session)
+        app.router.add_patch('/v4/sessions/{session}/players/{guild}', self._patch_player)
+        app.router.add_delete('/v4/sessions/{session}/players/{guild}', self._delete_player)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, '127.0.0.1', port).start()
+        self.port = self.runner.addresses[0][1]
+        return self
+    
+    async def stop(self):
+        """Go away like a crashed node"""
+        for handle in self._ends.values():
+            handle.cancel()
+        self._ends.clear()
+        for ws in list(self._sockets):
+            await ws.close()
+        await self.runner.cleanup()
+    
+    def _broadcast(self, message: Dict[str, Any]):
+        for ws in list(self._sockets):
+            if not ws.closed:
+                asyncio.ensure_future(ws.send_json(message))
+    
+    async def _version(self, request):
+        from aiohttp import web
+        return web.Response(text="4.0.0-stub")
+    
+    async def _websocket(self, request):
+        from aiohttp import web
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._sockets.add(ws)
+        try:
+            await ws.send_json({"op": "ready", "resumed": False, "sessionId": self.session_id})
+            while not ws.closed:
+                playing = sum(1 for player in self.players.values() if player.get("encodedTrack"))
+                await ws.send_json({"op": "stats", "players": len(self.players), "playingPlayers": playing,
+                                    "cpu": {"cores": 4, "systemLoad": 0.1, "lavalinkLoad": 0.01 * playing}})
+                await asyncio.sleep(0.5)
+        except ConnectionResetError:
+            pass
+        finally:
+            self._sockets.discard(ws)
+        return ws
+    
+    async def _patch_session(self, request):
+        from aiohttp import web
+        return web.json_response({"resuming": True, "timeout": 60})
+    
+    async def _patch_player(self, request):
+        from aiohttp import web
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        guild = request.match_info['guild']
+        payload = await request.json()
+        player = self.players.setdefault(guild, {})
+        if "encodedTrack" in payload:
+            previous = player.get("encodedTrack")
+            handle = self._ends.pop(guild, None)
+            if handle:
+                handle.cancel()
+                self._track_end(guild, previous, "replaced")
+            encoded = payload["encodedTrack"]
+            if encoded:
+                self.starts.append((time.monotonic(), guild, encoded))
+                remaining = self.durations.get(encoded, 0) - payload.get("position", 0)
+                if remaining > 0:
+                    self._ends[guild] = asyncio.get_running_loop().call_later(
+                        remaining / 1000, self._track_end, guild, encoded, "finished")
+        player.update(payload)
+        return web.json_response({})
+    
+    async def _delete_player(self, request):
+        from aiohttp import web
+        guild = request.match_info['guild']
+        handle = self._ends.pop(guild, None)
+        if handle:
+            handle.cancel()
+        self.players.pop(guild, None)
+        self.deletes += 1
+        return web.Response(status=204)
+    
+    def _track_end(self, guild: str, encoded: str, reason: str):
+        if reason == "finished":
+            self._ends.pop(guild, None)
+        self._broadcast({"op": "event", "type": "TrackEndEvent", "guildId": guild,
+                         "track": {"encoded": encoded}, "reason": reason})
+
+def _encode_track(title: str, author: str, length: int, identifier: str) -> str:
+    """Lavaplayer (version 2) encoding of a track, as decode_track_info reads it"""
+    def utf(text: str) -> bytes:
+        raw = text.encode('utf-8')
+        return struct.pack('>H', len(raw)) + raw
+    
+    body = (struct.pack('>B', 2) + utf(title) + utf(author) + struct.pack('>q', length)
+            + utf(identifier) + struct.pack('>?', False)
+            + struct.pack('>?', True) + utf(f"https://example.com/{identifier}")
+            + utf("http") + struct.pack('>q', 0))
+    return base64.b64encode(struct.pack('>i', len(body) | (1 << 30)) + body).decode('ascii')
+
+def _stub_tracks(count: int, length: int, prefix: str = "track") -> List[Track]:
+    return [
+        _track_from_encoded(_encode_track(f"{prefix} {i}", "Load Test", length, f"{prefix}-{i}"))
+        for i in range(count)
+    ]
+
+async def _load_test_updates(players: int = 50, bursts: int = 5, latency: float = 0.02) -> int:
+    """
+    Player update bursts with and without coalescing
+    
+    Every player gets `bursts` rounds of "volume up x3, seek, pause,
+    resume" fired 5 ms apart, like repeated voice commands or a slider.
+    
+    Returns:
+        Number of players whose final state on the stub is wrong
+    """
+    stub = await _LavalinkStub(latency).start()
+    failures = 0
+    print(f"Player updates: {players} players x {bursts} bursts, stub PATCH latency {latency * 1000:.0f} ms")
+    try:
+        for window in (0, 0.03):
+            stub.players.clear()
+            client = LavalinkClient("127.0.0.1", stub.port, update_window=window, max_players=players)
+            client.session = aiohttp.ClientSession(headers=client.headers,
+                                                   connector=aiohttp.TCPConnector(limit=0))
+            client.session_id = "load-test"
+            waits: List[float] = []
+            
+            async def timed(update):
+                started = time.monotonic()
+                await update
+                waits.append(time.monotonic() - started)
+            
+            async def drive(player: LavalinkPlayer):
+                pending = []
+                for burst in range(bursts):
+                    for update in (player.set_volume(100 + burst * 30 + 10),
+                                   player.set_volume(100 + burst * 30 + 20),
+                                   player.set_volume(100 + burst * 30 + 30),
+                                   player.seek(burst * 1000),
+                                   player.pause(True),
+                                   player.pause(False)):
+                        pending.append(asyncio.create_task(timed(update)))
+                        await asyncio.sleep(0.005)
+                await asyncio.gather(*pending)
+            
+            started = time.monotonic()
+            await asyncio.gather(*(drive(client.get_player(f"guild-{i}")) for i in range(players)))
+            elapsed = time.monotonic() - started
+            stats = client.updates.stats()
+            await client.session.close()
+            
+            expected = {"volume": 100 + bursts * 30, "position": (bursts - 1) * 1000, "paused": False}
+            wrong = sum(1 for i in range(players) if stub.players.get(f"guild-{i}") != expected)
+            failures += wrong
+            waits.sort()
+            label = f"window {window * 1000:.0f} ms" if window else "no coalescing"
+            print(f"  {label:<14} {stats['updates']:5d} updates -> {stats['requests']:5d} PATCHes "
+                  f"({stats['saved'] / stats['updates']:.0%} saved), {elapsed:.2f}s, "
+                  f"update wait p50 {waits[len(waits) // 2] * 1000:.0f} ms "
+                  f"p99 {waits[int(len(waits) * 0.99)] * 1000:.0f} ms, "
+                  f"final state {players - wrong}/{players} correct")
+    finally:
+        await stub.stop()
+    return failures
+
+async def _load_test_gaps(tracks: int = 6, length: int = 500, latency: float = 0.02,
+                          jitter: float = 0.02) -> int:
+    """
+    Gap between consecutive tracks, waiting for TrackEndEvent vs lookahead
+    
+    The gap is the time from the end of one track on the node to the
+    start of the next (negative: the next one replaced it that early).
+    A tight lookahead plus latency jitter makes FINISHED arrive while the
+    next PATCH is in flight, which must not advance the queue twice (the
+    second advance cuts the new track off right after it starts).
+    
+    Returns:
+        Runs whose tracks did not all play, in order and to (nearly) the end
+    """
+    failures = 0
+    print(f"Track gaps: {tracks} tracks of {length} ms, stub PATCH latency "
+          f"{latency * 1000:.0f}-{(latency + jitter) * 1000:.0f} ms")
+    for label, lookahead_ms in (("TrackEndEvent", 0), ("lookahead 1 ms", 1), ("lookahead 50 ms", 50)):
+        queue = _stub_tracks(tracks, length, prefix=f"gap{lookahead_ms}")
+        stub = await _LavalinkStub(latency, jitter, {track.encoded: length for track in queue}).start()
+        client = LavalinkClient("127.0.0.1", stub.port)
+        try:
+            await client.connect(ready_timeout=2)
+            player = client.get_player("gaps")
+            player.lookahead_ms = lookahead_ms
+            player.add_many_to_queue(queue[1:])
+            await player.play(queue[0])
+            # Wait out the whole queue (plus slack for late transitions)
+            await asyncio.sleep(tracks * length / 1000 + 1)
+        finally:
+            await client.disconnect()
+            await stub.stop()
+        
+        played = [encoded for _, _, encoded in stub.starts]
+        in_order = played == [track.encoded for track in queue]
+        gaps = [(b[0] - a[0]) * 1000 - length for a, b in zip(stub.starts, stub.starts[1:])]
+        # Replaced earlier than the lookahead (plus the slowest PATCH) allows
+        cut_short = sum(1 for gap in gaps if gap < -(lookahead_ms + (latency + jitter) * 1000 + 50))
+        failures += not in_order or cut_short > 0
+        gap_text = (f"gap mean {sum(gaps) / len(gaps):6.1f} ms, worst {max(gaps):6.1f} ms"
+                    if gaps else "no transitions")
+        order = [next(i for i, track in enumerate(queue) if track.encoded == encoded) for encoded in played]
+        print(f"  {label:<16} {gap_text}, played {len(played)}/{tracks} "
+              f"{'in order' if in_order else f'out of order: {order}'}, {cut_short} cut short")
+    return failures
+
+async def _load_test_queue(size: int = 10_000, edits: int = 1_000) -> int:
+    """
+    TrackQueue against the old list-backed queue on a big playlist
+    
+    Times adding the playlist, shuffle/move/remove edits and playing it
+    through (pop from the front), queueing it on a player track by track
+    vs in bulk, and the memory held by a full queue vs a compact one.
+    
+    Returns:
+        Number of failed checks (order or content lost)
+    """
+    import tracemalloc
+    
+    failures = 0
+    encoded = [_encode_track(f"song {i}", f"artist {i % 97}", 180_000, f"id-{i}") for i in range(size)]
+    tracks = [_track_from_encoded(item) for item in encoded]
+    print(f"Queue: {size} track playlist, {edits} edits of each kind")
+    
+    def timed(work) -> float:
+        started = time.perf_counter()
+        work()
+        return (time.perf_counter() - started) * 1000
+    
+    def list_queue():
+        queue: List[Track] = []
+        add = timed(lambda: [queue.append(track) for track in tracks])
+        edit = timed(lambda: [queue.insert(random.randrange(len(queue)), queue.pop(random.randrange(len(queue))))
+                              for _ in range(edits)] + [queue.pop(random.randrange(len(queue))) for _ in range(edits)])
+        queue[:] = tracks
+        drained: List[Track] = []
+        drain = timed(lambda: [drained.append(queue.pop(0)) for _ in range(len(queue))])
+        return add, edit, drain, drained
+    
+    def track_queue(compact: bool):
+        queue = TrackQueue(compact=compact, history_size=50)
+        add = timed(lambda: queue.extend(tracks))
+        edit = timed(lambda: [queue.move(random.randrange(len(queue)), random.randrange(len(queue)))
+                              for _ in range(edits)] + [queue.remove(random.randrange(len(queue))) for _ in range(edits)])
+        edit += timed(queue.shuffle)
+        queue.clear()
+        queue.extend(tracks)
+        drained: List[Track] = []
+        drain = timed(lambda: [drained.append(queue.popleft()) for _ in range(len(queue))])
+        return add, edit, drain, drained
+    
+    for label, run in (("list", list_queue),
+                       ("TrackQueue", lambda: track_queue(False)),
+                       ("compact", lambda: track_queue(True))):
+        add, edit, drain, drained = run()
+        intact = [track.encoded for track in drained] == encoded and all(
+            track.title == f"song {i}" for i, track in enumerate(drained))
+        failures += not intact
+        print(f"  {label:<11} add {add:7.1f} ms, edits {edit:7.1f} ms, play through {drain:7.1f} ms"
+              f"{'' if intact else ', ORDER OR CONTENT LOST'}")
+    
+    # The playlist path of play_music: one log line per track vs one in all
+    client = LavalinkClient("127.0.0.1", 0)
+    one_by_one, bulk = client.get_player("one-by-one"), client.get_player("bulk")
+    single = timed(lambda: [one_by_one.add_to_queue(track) for track in tracks])
+    many = timed(lambda: bulk.add_many_to_queue(tracks))
+    failures += one_by_one.queue.encoded() != encoded or bulk.queue.encoded() != encoded
+    print(f"  player      add_to_queue per track {single:7.1f} ms, add_many_to_queue {many:7.1f} ms")
+    
+    # Memory of a queue holding the playlist, built from encoded strings
+    # as restored or persisted queues are
+    for compact in (False, True):
+        decode_track_info.cache_clear()
+        tracemalloc.start()
+        queue = TrackQueue(compact=compact)
+        queue.extend(_track_from_encoded(item) for item in encoded)
+        decode_track_info.cache_clear()
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"  {'compact' if compact else 'full':<11} queue holds {held / 1024:7.0f} KiB "
+              f"({held / size:.0f} bytes/track besides the encoded strings)")
+        del queue
+    return failures
+
+async def _load_test_nodes(nodes: int = 3, players: int = 30, latency: float = 0.005) -> int:
+    """
+    Player placement across stub nodes and failover when one dies
+    
+    A burst of players is spread over the nodes, each with a queue and
+    its own volume. One node is then killed: its players must resume on
+    the others with track, position, volume and queue intact, and be
+    deleted from it once it is back.
+    
+    Returns:
+        Number of failed checks
+    """
+    failures = 0
+    length = 600_000
+    tracks = _stub_tracks(players * 6, length, prefix="node")
+    durations = {track.encoded: length for track in tracks}
+    stubs = [await _LavalinkStub(latency, durations=durations).start() for _ in range(nodes)]
+    pool = LavalinkNodePool([("127.0.0.1", stub.port) for stub in stubs],
+                            failover_after=0.5, check_interval=0.1)
+    print(f"Nodes: {players} players on {nodes} stub nodes, failover after {pool.failover_after}s")
+    try:
+        await pool.connect()
+        
+        async def start(i: int):
+            player = pool.get_player(f"guild-{i}")
+            player.add_many_to_queue(tracks[players + i * 5:players + i * 5 + 5])
+            await player.play(tracks[i])
+            await player.set_volume(50 + i)
+        
+        await asyncio.gather(*(start(i) for i in range(players)))
+        placed = [len(node.players) for node in pool.nodes]
+        failures += max(placed) - min(placed) > 1
+        print(f"  placement       {'/'.join(map(str, placed))} players per node")
+        
+        await asyncio.sleep(1)
+        victim = pool.nodes[0]
+        moving = {session_id: player.current_position for session_id, player in victim.players.items()}
+        killed = time.monotonic()
+        await stubs[0].stop()
+        while pool.migrations < len(moving) and time.monotonic() - killed < 10:
+            await asyncio.sleep(0.02)
+        moved_after = time.monotonic() - killed
+        
+        lost = 0
+        for session_id, position in moving.items():
+            i = int(session_id.split("-")[1])
+            node = pool.node_for(session_id)
+            state = stubs[pool.nodes.index(node)].players.get(session_id, {}) if node is not victim else {}
+            player = pool.players.get(session_id)
+            resumed_at = state.get("position", -1)
+            intact = (state.get("encodedTrack") == tracks[i].encoded and state.get("volume") == 50 + i
+                      and position <= resumed_at <= position + moved_after * 1000 + 500
+                      and player is not None and player.queue.encoded() == [
+                          track.encoded for track in tracks[players + i * 5:players + i * 5 + 5]])
+            lost += not intact
+        failures += lost
+        spread = [len(node.players) for node in pool.nodes[1:]]
+        print(f"  failover        {len(moving)} players moved in {moved_after:.2f}s "
+              f"(to {'/'.join(map(str, spread))}), {len(moving) - lost} resumed intact")
+        
+        # The node comes back empty; the moved players are deleted there
+        stubs[0] = await _LavalinkStub(latency).start(stubs[0].port)
+        deadline = time.monotonic() + 10
+        while stubs[0].deletes < len(moving) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        failures += stubs[0].deletes != len(moving)
+        print(f"  node rejoined   {stubs[0].deletes}/{len(moving)} moved players deleted there")
+    finally:
+        await pool.disconnect()
+        for stub in stubs:
+            await stub.stop()
+    return failures
+
+async def _load_test_eviction(rounds: int = 10, sessions: int = 500, max_players: int = 100) -> int:
+    """
+    Memory across many player sessions coming and going
+    
+    Each round, `sessions` sessions (a fifth of them returning from the
+    round before) queue and play a few tracks, change volume and pause.
+    Players are evicted at the cap while sessions are still busy and
+    reaped once idle. Traced memory must stop growing after warm-up.
+    
+    Returns:
+        Number of failed checks
+    """
+    import gc
+    import tracemalloc
+    
+    failures = 0
+    tracks = _stub_tracks(40, 180_000, prefix="evict")
+    stub = await _LavalinkStub().start()
+    client = LavalinkClient("127.0.0.1", stub.port, max_players=max_players, idle_timeout=0.05)
+    print(f"Eviction: {rounds} rounds of {sessions} sessions, at most {max_players} players, "
+          f"idle timeout {client.idle_timeout * 1000:.0f} ms")
+    
+    async def session(session_id: str):
+        player = client.get_player(session_id)
+        player.add_many_to_queue(random.sample(tracks, 3))
+        await player.play(random.choice(tracks))
+        await player.set_volume(random.randint(50, 150))
+        await player.pause(True)
+    
+    def internal_sizes() -> int:
+        updates = client.updates
+        return sum(map(len, (client.players, client._background, client._message_tasks, client._inflight,
+                             updates.pending, updates.waiters, updates.timers, updates.locks)))
+    
+    try:
+        await client.connect(ready_timeout=2)
+        tracemalloc.start()
+        memory = []
+        for round_ in range(rounds):
+            returning = [f"user-{round_ - 1}-{i}" for i in range(0, sessions, 5)] if round_ else []
+            fresh = [f"user-{round_}-{i}" for i in range(sessions - len(returning))]
+            await asyncio.gather(*(session(session_id) for session_id in returning + fresh))
+            # Let the reaper take the paused players and the DELETEs finish
+            await asyncio.sleep(0.3)
+            while client._background:
+                await asyncio.sleep(0.01)
+            # The stub shares the process; don't count its log of track starts
+            stub.starts.clear()
+            gc.collect()
+            memory.append(tracemalloc.get_traced_memory()[0])
+        tracemalloc.stop()
+        
+        leftovers = internal_sizes()
+        failures += leftovers > 0
+        failures += stub.deletes != client.evictions
+        warm = memory[rounds // 2]
+        growth = memory[-1] - warm
+        # Allow a little noise from allocator/cache churn
+        failures += growth > max(64 * 1024, warm * 0.02)
+        print(f"  memory          {' '.join(f'{size / 1024:.0f}' for size in memory)} KiB after each round")
+        print(f"  growth          {growth / 1024:+.0f} KiB over the second half, {client.evictions} evictions, "
+              f"{stub.deletes} DELETEs, {len(client.snapshots)} snapshots kept, "
+              f"{leftovers} entries left in player/update tables")
+    finally:
+        await client.disconnect()
+        await stub.stop()
+    return failures
+
+async def load_test(sections: Optional[List[str]] = None) -> int:
+    """
+    Run load tests against local Lavalink stubs
+    
+    Args:
+        sections: Any of LOAD_TESTS (default: all)
+    
+    Returns:
+        Number of failed checks
+    """
+    failures = 0
+    for name in sections or LOAD_TESTS:
+        failures += await LOAD_TESTS[name]()
+    return failures
+
+LOAD_TESTS = {
+    "updates": _load_test_updates,
+    "gaps": _load_test_gaps,
+    "queue": _load_test_queue,
+    "nodes": _load_test_nodes,
+    "eviction": _load_test_eviction
+}
 
 # Example usage
 async def main():
@@ -482,4 +2645,10 @@ async def main():
     await audio.stop()
 
 if __name__ == "__main__":
+    if "--load-test" in sys.argv:
+        args = sys.argv[sys.argv.index("--load-test") + 1:]
+        unknown = [name for name in args if name not in LOAD_TESTS]
+        if unknown:
+            sys.exit(f"Unknown load tests: {', '.join(unknown)} (choose from {', '.join(LOAD_TESTS)})")
+        sys.exit(1 if asyncio.run(load_test(args)) else 0)
     asyncio.run(main())
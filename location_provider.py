@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Termux Location Provider for Satyug Universe
+Non-blocking GPS/network/passive location on Android via termux-location
+"""
+
+import os
+import json
+import time
+import signal
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional
+import logging
+
+logger = logging.getLogger('LocationProvider')
+
+class TermuxLocationProvider:
+    """
+    Async wrapper around the `termux-location` command
+
+    The executable is looked up on PATH (override with TERMUX_LOCATION_BIN),
+    so a fake script can stand in for it off-device.
+    """
+
+    def __init__(self, executable: Optional[str] = None):
+        self.executable = executable or os.getenv('TERMUX_LOCATION_BIN', 'termux-location')
+
+    async def _spawn(self, provider: str, request: str) -> asyncio.subprocess.Process:
+        return await asyncio.create_subprocess_exec(
+            self.executable, '-p', provider, '-r', request,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True
+        )
+
+    @staticmethod
+    async def _terminate(process: asyncio.subprocess.Process, timeout: float = 1):
+        if process.returncode is not None:
+            return
+        # termux-location is a shell script; kill its whole process group so
+        # no grandchild keeps the stdout pipe (and so wait()) open
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⚠️ termux-location (pid {process.pid}) did not exit after kill")
+
+    async def get_fix(self, provider: str = "gps", request: str = "once",
+                      timeout: float = 10) -> Optional[Dict]:
+        """
+        Get a single location fix
+
+        Args:
+            provider: gps, network or passive
+            request: once (fresh fix) or last (last known fix)
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            Raw termux-location fix or None
+        """
+        try:
+            process = await self._spawn(provider, request)
+        except OSError as e:
+            logger.error(f"❌ termux-location not available: {e}")
+            return None
+
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ No {provider} fix within {timeout}s")
+            return None
+        finally:
+            # Timed out or cancelled by the caller: don't leave it running
+            if process.returncode is None:
+                await self._terminate(process)
+
+        if process.returncode != 0 or not stdout.strip():
+            return None
+
+        try:
+            fix = json.loads(stdout)
+        except json.JSONDecodeError:
+            logger.error(f"❌ Invalid termux-location output: {stdout[:100]!r}")
+            return None
+
+        if 'latitude' not in fix:
+            return None
+
+        fix.setdefault('provider', provider)
+        return fix
+
+    async def updates(self, provider: str = "gps") -> AsyncIterator[Dict]:
+        """
+        Stream location fixes (`-r updates`)
+
+        termux-location prints one pretty-printed JSON object per fix, so
+        the output is decoded incrementally as objects complete.
+
+        Yields:
+            Raw termux-location fixes
+        """
+        process = await self._spawn(provider, 'updates')
+        decoder = json.JSONDecoder()
+        buffer = ""
+
+        try:
+            while True:
+                chunk = await process.stdout.read(4096)
+                if not chunk:
+                    break
+                buffer += chunk.decode('utf-8', errors='replace')
+
+                while True:
+                    buffer = buffer.lstrip()
+                    if not buffer:
+                        break
+                    try:
+                        fix, end = decoder.raw_decode(buffer)
+                    except json.JSONDecodeError:
+                        break  # Object not complete yet
+                    buffer = buffer[end:]
+
+                    if isinstance(fix, dict) and 'latitude' in fix:
+                        fix.setdefault('provider', provider)
+                        yield fix
+        finally:
+            await self._terminate(process)
+
+class AdaptiveLocationProvider:
+    """
+    Picks the location provider per request
+
+    - passive/last known fixes are free and instant; used when fresh enough
+    - network is fast (~1 s) and cheap, accurate to tens of meters
+    - gps is accurate but slow to fix and costly on battery
+
+    `locate` escalates from the cheapest provider that can still meet the
+    accuracy target, within one overall time budget.
+    """
+
+    def __init__(self, termux: Optional[TermuxLocationProvider] = None,
+                 max_age: float = 60, network_timeout: float = 3):
+        self.termux = termux or TermuxLocationProvider()
+        self.max_age = max_age
+        self.network_timeout = network_timeout
+        self.last_fix: Optional[Dict] = None
+        self.last_fix_at: float = 0
+
+    def _remember(self, fix: Optional[Dict]) -> Optional[Dict]:
+        if fix:
+            self.last_fix = fix
+            self.last_fix_at = time.monotonic()
+        return fix
+
+    def _good_enough(self, fix: Optional[Dict], accuracy: float) -> bool:
+        if not fix or fix.get('accuracy', float('inf')) > accuracy:
+            return False
+        # Last known fixes report how old they are
+        return fix.get('elapsedMs', 0) <= self.max_age * 1000
+
+    def plan(self, accuracy: float, low_power: bool = False) -> List[str]:
+        """
+        Providers to try, in order
+
+        Args:
+            accuracy: Required accuracy in meters
+            low_power: Never wake the GPS
+        """
+        if low_power:
+            return ["passive", "network"]
+        if accuracy < 30:
+            return ["gps"]
+        return ["passive", "network", "gps"]
+
+    async def locate(self, accuracy: float = 50, timeout: float = 10,
+                     low_power: bool = False) -> Optional[Dict]:
+        """
+        Get a fix meeting the accuracy target as cheaply as possible
+
+        Args:
+            accuracy: Required accuracy in meters
+            timeout: Overall time budget in seconds
+            low_power: Never wake the GPS
+
+        Returns:
+            Best fix found (may be less accurate than requested), or None
+        """
+        if (self._good_enough(self.last_fix, accuracy)
+                and time.monotonic() - self.last_fix_at < self.max_age):
+            return self.last_fix
+
+        deadline = time.monotonic() + timeout
+        best = None
+
+        for provider in self.plan(accuracy, low_power):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            if provider == "passive":
+                fix = await self.termux.get_fix("passive", "last", min(remaining, 2))
+            elif provider == "network":
+                fix = await self.termux.get_fix("network", "once", min(remaining, self.network_timeout))
+            else:
+                fix = await self.termux.get_fix("gps", "once", remaining)
+
+            if fix and (best is None or fix.get('accuracy', float('inf')) < best.get('accuracy', float('inf'))):
+                best = fix
+            if self._good_enough(fix, accuracy):
+                break
+
+        return self._remember(best)
+
+    def continuous_provider(self, accuracy: float = 50, low_power: bool = False) -> str:
+        """Provider for continuous updates"""
+        if low_power:
+            return "passive"
+        return "gps" if accuracy < 30 else "network"
+
+    async def updates(self, accuracy: float = 50, low_power: bool = False) -> AsyncIterator[Dict]:
+        """Stream fixes from the provider suited to the accuracy target"""
+        provider = self.continuous_provider(accuracy, low_power)
+        logger.info(f"📡 Continuous location updates via {provider}")
+        async for fix in self.termux.updates(provider):
+            yield self._remember(fix)
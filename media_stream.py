@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Twilio Media Streams for Satyug Universe
+Bidirectional phone audio over WebSocket with barge-in
+
+Includes a local stand-in for Twilio's side of the stream so the
+endpoint can be exercised without a phone call:
+
+    python media_stream.py ws://localhost:8000/voice/stream caller.wav reply.wav
+"""
+
+import sys
+import json
+import time
+import wave
+import array
+import base64
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger('MediaStream')
+
+# Twilio streams 8 kHz μ-law, 20 ms per frame
+SAMPLE_RATE = 8000
+FRAME_BYTES = 160
+# Outbound audio is sent in 100 ms messages
+SEND_BYTES = FRAME_BYTES * 5
+# Times a call reopens its transcriber after it fails before hanging up
+TRANSCRIBER_RESTARTS = 2
+
+# ============================================
+# G.711 μ-law codec (audioop is gone in 3.13)
+# ============================================
+
+_BIAS = 0x84
+_CLIP = 8159
+
+def _encode_sample(sample: int) -> int:
+    # 14-bit reference encoder (matches audioop.lin2ulaw bit for bit)
+    sample >>= 2
+    mask = 0xFF
+    if sample < 0:
+        sample = -sample
+        mask = 0x7F
+    sample = min(sample, _CLIP) + (_BIAS >> 2)
+    segment = max(sample.bit_length() - 6, 0)
+    if segment > 7:
+        return 0x7F ^ mask
+    return ((segment << 4) | ((sample >> (segment + 1)) & 0x0F)) ^ mask
+
+def _decode_sample(value: int) -> int:
+    value = ~value & 0xFF
+    exponent = (value >> 4) & 0x07
+    sample = (((value & 0x0F) << 3) + _BIAS) << exponent
+    sample -= _BIAS
+    return -sample if value & 0x80 else sample
+
+_ULAW_ENCODE = bytes(_encode_sample(s - 65536 if s > 32767 else s) for s in range(65536))
+_ULAW_DECODE = array.array('h', (_decode_sample(v) for v in range(256)))
+
+def pcm16_to_ulaw(pcm: bytes) -> bytes:
+    """Encode little-endian 16-bit PCM to μ-law"""
+    samples = array.array('h', pcm)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    table = _ULAW_ENCODE
+    return bytes(table[s & 0xFFFF] for s in samples)
+
+def ulaw_to_pcm16(ulaw: bytes) -> bytes:
+    """Decode μ-law to little-endian 16-bit PCM"""
+    table = _ULAW_DECODE
+    samples = array.array('h', (table[b] for b in ulaw))
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+# ============================================
+# Server side
+# ============================================
+
+class MediaStreamSession:
+    """
+    One phone call on a Twilio Media Stream
+
+    Inbound μ-law frames are fed straight into an incremental transcriber.
+    When the transcriber reports the end of an utterance, the reply is
+    synthesized as a stream and sent back on the same socket while it is
+    still being generated. If the caller starts talking over the reply,
+    playback is cancelled and Twilio's buffer is cleared (barge-in).
+    A transcriber that fails is reopened a few times, then the call ends.
+    """
+
+    def __init__(self, websocket, speech, respond: Callable[[str], Awaitable[str]]):
+        """
+        Args:
+            websocket: FastAPI WebSocket (accepted)
+            speech: Object with open_transcriber() and synthesize_voice_stream()
+                (SpeechClient)
+            respond: Coroutine turning caller text into reply text
+        """
+        self.websocket = websocket
+        self.speech = speech
+        self.respond = respond
+
+        self.stream_sid: Optional[str] = None
+        self.call_sid: Optional[str] = None
+        self.transcriber = None
+        self.transcript_task: Optional[asyncio.Task] = None
+        self.transcriber_restarts = 0
+        self.reply_task: Optional[asyncio.Task] = None
+        self.pending_marks = set()
+        self.replies = 0
+        self.utterance_end: Optional[float] = None
+
+    @property
+    def speaking(self) -> bool:
+        return (self.reply_task is not None and not self.reply_task.done()) or bool(self.pending_marks)
+
+    async def run(self):
+        """Process the stream until Twilio stops it or the socket closes"""
+        try:
+            while True:
+                message = json.loads(await self.websocket.receive_text())
+                event = message.get("event")
+
+                if event == "media":
+                    if self.transcriber:
+                        await self.transcriber.send(base64.b64decode(message["media"]["payload"]))
+
+                elif event == "start":
+                    start = message["start"]
+                    self.stream_sid = start["streamSid"]
+                    self.call_sid = start.get("callSid")
+                    self.transcriber = await self.speech.open_transcriber("mulaw", SAMPLE_RATE)
+                    self._start_transcription()
+                    logger.info(f"📞 Media stream started: {self.call_sid}")
+
+                elif event == "mark":
+                    self.pending_marks.discard(message.get("mark", {}).get("name"))
+
+                elif event == "stop":
+                    logger.info(f"📞 Media stream stopped: {self.call_sid}")
+                    break
+        except Exception as e:
+            logger.info(f"📞 Media stream closed: {e}")
+        finally:
+            if self.reply_task:
+                self.reply_task.cancel()
+            if self.transcript_task:
+                self.transcript_task.cancel()
+            if self.transcriber:
+                await self.transcriber.close()
+
+    def _start_transcription(self):
+        self.transcript_task = asyncio.create_task(self._consume_transcripts())
+        self.transcript_task.add_done_callback(self._transcription_done)
+
+    def _transcription_done(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error:
+            logger.error(f"❌ Transcription failed: {error}")
+        else:
+            logger.warning("⚠️ Transcription stream ended")
+        asyncio.ensure_future(self._restart_transcription())
+
+    async def _restart_transcription(self):
+        """Reopen the transcriber, or end the call if that keeps failing"""
+        try:
+            await self.transcriber.close()
+        except Exception as e:
+            logger.debug(f"Closing failed transcriber: {e}")
+
+        if self.transcriber_restarts < TRANSCRIBER_RESTARTS:
+            self.transcriber_restarts += 1
+            try:
+                self.transcriber = await self.speech.open_transcriber("mulaw", SAMPLE_RATE)
+                self._start_transcription()
+                logger.info(f"🎤 Transcription reopened ({self.transcriber_restarts}/{TRANSCRIBER_RESTARTS})")
+                return
+            except Exception as e:
+                logger.error(f"❌ Reopening transcription failed: {e}")
+
+        # Nobody can be heard; hang up rather than keep a deaf call open
+        logger.error(f"📞 Ending media stream without transcription: {self.call_sid}")
+        try:
+            await self.websocket.close()
+        except Exception as e:
+            logger.debug(f"Closing media stream: {e}")
+
+    async def _consume_transcripts(self):
+        utterance = []
+        async for event in self.transcriber:
+            # Voice activity alone (noise, our own echo) doesn't interrupt;
+            # wait for words, interim results are enough
+            if event.get("transcript") and self.speaking:
+                await self.barge_in()
+
+            if event["type"] != "transcript" or not event["is_final"]:
+                continue
+
+            if event["transcript"]:
+                utterance.append(event["transcript"])
+
+            if event["speech_final"] and utterance:
+                text = " ".join(utterance)
+                utterance = []
+                self.utterance_end = time.monotonic()
+                self.reply_task = asyncio.create_task(self._reply(text))
+
+    async def _reply(self, text: str):
+        logger.info(f"🗣️ Caller said: {text}")
+        reply = await self.respond(text)
+
+        buffer = b""
+        first = True
+        async for chunk in self.speech.synthesize_voice_stream(reply):
+            buffer += chunk
+            while len(buffer) >= SEND_BYTES:
+                await self._send_audio(buffer[:SEND_BYTES])
+                buffer = buffer[SEND_BYTES:]
+                if first and self.utterance_end:
+                    latency = (time.monotonic() - self.utterance_end) * 1000
+                    logger.info(f"⚡ First reply audio after {latency:.0f}ms")
+                    first = False
+        if buffer:
+            await self._send_audio(buffer)
+
+        # Twilio echoes the mark once playback reaches it
+        self.replies += 1
+        name = f"reply-{self.replies}"
+        self.pending_marks.add(name)
+        await self._send({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": name}})
+
+    async def barge_in(self):
+        """Stop speaking because the caller started talking"""
+        if self.reply_task and not self.reply_task.done():
+            self.reply_task.cancel()
+        self.pending_marks.clear()
+        await self._send({"event": "clear", "streamSid": self.stream_sid})
+        logger.info("✋ Barge-in: playback cleared")
+
+    async def _send_audio(self, audio: bytes):
+        await self._send({
+            "event": "media",
+            "streamSid": self.stream_sid,
+            "media": {"payload": base64.b64encode(audio).decode('ascii')}
+        })
+
+    async def _send(self, message: Dict[str, Any]):
+        await self.websocket.send_text(json.dumps(message))
+
+# ============================================
+# Local stand-in for Twilio
+# ============================================
+
+class TwilioStreamStandIn:
+    """
+    Plays Twilio's part of a Media Stream against a local endpoint
+
+    Streams a WAV file (8 kHz mono 16-bit) as real-time μ-law frames,
+    collects the audio sent back, echoes marks once their audio would have
+    finished playing, and honours `clear` like Twilio does.
+    """
+
+    def __init__(self, url: str, call_sid: str = "CA-local", stream_sid: str = "MZ-local"):
+        self.url = url
+        self.call_sid = call_sid
+        self.stream_sid = stream_sid
+        self.received = bytearray()
+        self.clears = 0
+        self.first_reply_at: Optional[float] = None
+        self.caller_done_at: Optional[float] = None
+
+    async def run(self, wav_path: str, trailing_silence: float = 3.0) -> Dict[str, Any]:
+        """
+        Run one call
+
+        Args:
+            wav_path: Caller audio
+            trailing_silence: Seconds of silence to stream after the audio
+
+        Returns:
+            Call statistics
+        """
+        import aiohttp
+
+        with wave.open(wav_path, 'rb') as wav:
+            if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise ValueError("Caller audio must be 8 kHz mono 16-bit WAV")
+            caller = pcm16_to_ulaw(wav.readframes(wav.getnframes()))
+
+        silence = b"\xff" * int(SAMPLE_RATE * trailing_silence)
+
+        async with aiohttp.ClientSession() as session:
+            async with session.ws_connect(self.url) as ws:
+                receiver = asyncio.create_task(self._receive(ws))
+
+                await ws.send_str(json.dumps({"event": "connected", "protocol": "Call", "version": "1.0.0"}))
+                await ws.send_str(json.dumps({
+                    "event": "start",
+                    "streamSid": self.stream_sid,
+                    "start": {
+                        "streamSid": self.stream_sid,
+                        "callSid": self.call_sid,
+                        "tracks": ["inbound"],
+                        "mediaFormat": {"encoding": "audio/x-mulaw", "sampleRate": SAMPLE_RATE, "channels": 1}
+                    }
+                }))
+
+                await self._stream(ws, caller)
+                self.caller_done_at = time.monotonic()
+                await self._stream(ws, silence)
+
+                await ws.send_str(json.dumps({"event": "stop", "streamSid": self.stream_sid}))
+                await ws.close()
+                receiver.cancel()
+
+        latency = None
+        if self.first_reply_at and self.caller_done_at:
+            latency = (self.first_reply_at - self.caller_done_at) * 1000
+
+        return {
+            "reply_bytes": len(self.received),
+            "reply_seconds": len(self.received) / SAMPLE_RATE,
+            "clears": self.clears,
+            "first_reply_latency_ms": latency
+        }
+
+    async def _stream(self, ws, audio: bytes):
+        started = time.monotonic()
+        for index in range(0, len(audio), FRAME_BYTES):
+            frame = audio[index:index + FRAME_BYTES]
+            await ws.send_str(json.dumps({
+                "event": "media",
+                "streamSid": self.stream_sid,
+                "media": {
+                    "track": "inbound",
+                    "chunk": str(index // FRAME_BYTES + 1),
+                    "timestamp": str(index // 8),
+                    "payload": base64.b64encode(frame).decode('ascii')
+                }
+            }))
+            # Pace frames in real time
+            delay = started + (index + FRAME_BYTES) / SAMPLE_RATE - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    async def _receive(self, ws):
+        playback_ends = time.monotonic()
+        async for message in ws:
+            data = json.loads(message.data)
+            event = data.get("event")
+
+            if event == "media":
+                audio = base64.b64decode(data["media"]["payload"])
+                if self.first_reply_at is None:
+                    self.first_reply_at = time.monotonic()
+                self.received.extend(audio)
+                playback_ends = max(playback_ends, time.monotonic()) + len(audio) / SAMPLE_RATE
+
+            elif event == "mark":
+                asyncio.create_task(self._echo_mark(ws, data["mark"]["name"], playback_ends))
+
+            elif event == "clear":
+                self.clears += 1
+                playback_ends = time.monotonic()
+
+    async def _echo_mark(self, ws, name: str, at: float):
+        await asyncio.sleep(max(0.0, at - time.monotonic()))
+        if not ws.closed:
+            await ws.send_str(json.dumps({"event": "mark", "streamSid": self.stream_sid, "mark": {"name": name}}))
+
+    def save_reply(self, path: str):
+        """Write the received reply audio as 8 kHz 16-bit WAV"""
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(ulaw_to_pcm16(bytes(self.received)))
+
+async def main():
+    """Run the stand-in against a local endpoint"""
+    if len(sys.argv) < 3:
+        print("Usage: python media_stream.py <ws-url> <caller.wav> [reply.wav]")
+        return
+
+    stand_in = TwilioStreamStandIn(sys.argv[1])
+    stats = await stand_in.run(sys.argv[2])
+    logger.info(f"📊 Call stats: {stats}")
+
+    if len(sys.argv) > 3:
+        stand_in.save_reply(sys.argv[3])
+        logger.info(f"💾 Reply saved: {sys.argv[3]}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
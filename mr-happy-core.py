@@ -23,6 +23,13 @@ except ImportError:
     LAVALINK_AVAILABLE = False
     logger.warning("Lavalink integration not available")
 
+# Import voice bridge
+try:
+    from mr_happy_bridge import BridgeServer, DEFAULT_SOCKET_PATH
+    BRIDGE_AVAILABLE = True
+except ImportError:
+    BRIDGE_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -83,6 +90,173 @@ class IntegrationConfig:
     lavalink_host: str = "localhost"
     lavalink_port: int = 2333
     lavalink_password: str = "youshallnotpass"
+    # Extra nodes pooled with lavalink_host:lavalink_port, e.g. "host1:2333,host2:2333"
+    lavalink_nodes: str = os.getenv('LAVALINK_NODES', '')
+    
+    def lavalink_node_list(self) -> List[tuple]:
+        """Parse lavalink_nodes into (host, port) pairs"""
+        nodes = []
+        for entry in filter(None, (n.strip() for n in self.lavalink_nodes.split(','))):
+            host, _, port = entry.partition(':')
+            nodes.append((host, int(port or self.lavalink_port)))
+        return nodes
+
+class LiveTranscriber:
+    """
+    Incremental speech-to-text over a Deepgram live WebSocket
+    
+    Audio frames are pushed with `send`; iterating the transcriber yields
+    events as Deepgram produces them:
+    - {"type": "speech_started"}
+    - {"type": "transcript", "transcript": str, "is_final": bool, "speech_final": bool}
+    """
+    
+    def __init__(self, api_key: str, language: str = "hi", encoding: str = "mulaw",
+                 sample_rate: int = 8000, endpointing_ms: int = 300):
+        self.api_key = api_key
+        self.params = {
+            "encoding": encoding,
+            "sample_rate": str(sample_rate),
+            "channels": "1",
+            "language": language,
+            "interim_results": "true",
+            "vad_events": "true",
+            "endpointing": str(endpointing_ms)
+        }
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.ws = None
+    
+    async def start(self):
+        """Open the Deepgram live connection"""
+        self.session = aiohttp.ClientSession()
+        self.ws = await self.session.ws_connect(
+            "wss://api.deepgram.com/v1/listen",
+            params=self.params,
+            headers={"Authorization": f"Token {self.api_key}"}
+        )
+        logger.info("🎤 Live transcription started")
+    
+    async def send(self, audio: bytes):
+        """Send an audio frame"""
+        if self.ws and not self.ws.closed:
+            await self.ws.send_bytes(audio)
+    
+    async def __aiter__(self):
+        async for message in self.ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            
+            data = json.loads(message.data)
+            if data.get("type") == "SpeechStarted":
+                yield {"type": "speech_started"}
+            elif data.get("type") == "Results":
+                alternatives = data.get("channel", {}).get("alternatives", [])
+                yield {
+                    "type": "transcript",
+                    "transcript": alternatives[0].get("transcript", "") if alternatives else "",
+                    "is_final": data.get("is_final", False),
+                    "speech_final": data.get("speech_final", False)
+                }
+    
+    async def close(self):
+        """Flush and close the connection"""
+        try:
+            if self.ws and not self.ws.closed:
+                await self.ws.send_str(json.dumps({"type": "CloseStream"}))
+                await self.ws.close()
+        finally:
+            if self.session:
+                await self.session.close()
+        logger.info("🎤 Live transcription closed")
+
+class SpeechClient:
+    """
+    Streaming speech I/O: Deepgram live STT and Cartesia TTS
+    
+    Needs nothing but the API keys in VoiceConfig, so a process talking
+    to Mr. Happy over the bridge socket can handle call audio without
+    loading a whole MrHappyCore.
+    """
+    
+    def __init__(self, voice_config: Optional[VoiceConfig] = None):
+        self.voice_config = voice_config or VoiceConfig()
+    
+    def tts_request(self, text: str, emotion: str, output_format: Dict[str, Any]):
+        """Build the Cartesia TTS request (url, headers, payload)"""
+        url = "https://api.cartesia.ai/tts/bytes"
+        headers = {
+            "X-API-Key": self.voice_config.cartesia_api_key,
+            "Cartesia-Version": "2024-06-10",
+            "Content-Type": "application/json"
+        }
+        
+        payload = {
+            "model_id": self.voice_config.cartesia_model_id,
+            "transcript": text,
+            "voice": {
+                "mode": "id",
+                "id": self.voice_config.cartesia_voice_id
+            },
+            "language": self.voice_config.cartesia_language,
+            "output_format": output_format,
+            "add_timestamps": False,
+            "_experimental_voice_controls": {
+                "speed": self.voice_config.cartesia_speed,
+                "emotion": [emotion]
+            }
+        }
+        
+        return url, headers, payload
+    
+    async def synthesize_voice_stream(self, text: str, emotion: str = "content",
+                                      encoding: str = "pcm_mulaw", sample_rate: int = 8000,
+                                      chunk_size: int = 1600):
+        """
+        Synthesize voice as a stream of raw audio chunks
+        
+        Yields audio as soon as Cartesia produces it, so playback can start
+        before synthesis finishes. Defaults match Twilio Media Streams
+        (8 kHz μ-law).
+        """
+        try:
+            url, headers, payload = self.tts_request(text, emotion, {
+                "container": "raw",
+                "encoding": encoding,
+                "sample_rate": sample_rate
+            })
+            
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, headers=headers, json=payload) as response:
+                    # An error body is JSON, not audio; don't play it
+                    if response.status != 200:
+                        body = await response.text()
+                        logger.error(f"❌ TTS stream failed ({response.status}): {body[:200]}")
+                        return
+                    async for chunk in response.content.iter_chunked(chunk_size):
+                        yield chunk
+            logger.info(f"🔊 Streamed: {text[:50]}...")
+        except Exception as e:
+            logger.error(f"❌ TTS stream error: {e}")
+    
+    async def open_transcriber(self, encoding: str = "mulaw", sample_rate: int = 8000) -> 'LiveTranscriber':
+        """
+        Open an incremental speech-to-text stream (Deepgram live)
+        
+        Args:
+            encoding: Audio encoding of the frames that will be sent
+            sample_rate: Sample rate in Hz
+            
+        Returns:
+            Started LiveTranscriber
+        """
+        transcriber = LiveTranscriber(
+            self.voice_config.deepgram_api_key,
+            language=self.voice_config.cartesia_language,
+            encoding=encoding,
+            sample_rate=sample_rate
+        )
+        await transcriber.start()
+        return transcriber
 
 class MrHappyCore:
     """
@@ -102,6 +276,7 @@ class MrHappyCore:
         self.twilio_config = TwilioConfig()
         self.system_config = SystemConfig()
         self.integration_config = IntegrationConfig()
+        self.speech = SpeechClient(self.voice_config)
         
         self.context = []
         self.current_location = None
@@ -112,7 +287,8 @@ class MrHappyCore:
         if LAVALINK_AVAILABLE:
             self.audio_system = MrHappyAudioSystem(
                 self.integration_config.lavalink_host,
-                self.integration_config.lavalink_port
+                self.integration_config.lavalink_port,
+                lavalink_nodes=self.integration_config.lavalink_node_list()
             )
         
         logger.info("🎉 Mr. Happy AI Core initialized")
@@ -145,35 +321,18 @@ class MrHappyCore:
         Synthesize voice using Cartesia TTS
         """
         try:
-            url = "https://api.cartesia.ai/tts/bytes"
-            headers = {
-                "X-API-Key": self.voice_config.cartesia_api_key,
-                "Cartesia-Version": "2024-06-10",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model_id": self.voice_config.cartesia_model_id,
-                "transcript": text,
-                "voice": {
-                    "mode": "id",
-                    "id": self.voice_config.cartesia_voice_id
-                },
-                "language": self.voice_config.cartesia_language,
-                "output_format": {
-                    "container": "wav",
-                    "encoding": "pcm_s16le",
-                    "sample_rate": 16000
-                },
-                "add_timestamps": False,
-                "_experimental_voice_controls": {
-                    "speed": self.voice_config.cartesia_speed,
-                    "emotion": [emotion]
-                }
-            }
+            url, headers, payload = self.speech.tts_request(text, emotion, {
+                "container": "wav",
+                "encoding": "pcm_s16le",
+                "sample_rate": 16000
+            })
             
             async with aiohttp.ClientSession() as session:
                 async with session.post(url, headers=headers, json=payload) as response:
+                    if response.status != 200:
+                        body = await response.text()
+                        logger.error(f"❌ TTS failed ({response.status}): {body[:200]}")
+                        return b""
                     audio_data = await response.read()
                     logger.info(f"🔊 Synthesized: {text[:50]}...")
                     return audio_data
@@ -181,6 +340,31 @@ class MrHappyCore:
             logger.error(f"❌ TTS Error: {e}")
             return b""
     
+    async def speak(self, text: str, session_id: Optional[str] = None, emotion: str = "content") -> bool:
+        """
+        Say something through the Lavalink audio output
+        
+        Music on the session is ducked while Mr. Happy speaks.
+        """
+        if not self.audio_system:
+            return False
+        audio = await self.synthesize_voice(text, emotion)
+        if not audio:
+            return False
+        return await self.audio_system.speak(audio, session_id)
+    
+    async def synthesize_voice_stream(self, text: str, emotion: str = "content",
+                                      encoding: str = "pcm_mulaw", sample_rate: int = 8000,
+                                      chunk_size: int = 1600):
+        """Synthesize voice as a stream of raw audio chunks (see SpeechClient)"""
+        async for chunk in self.speech.synthesize_voice_stream(text, emotion, encoding,
+                                                               sample_rate, chunk_size):
+            yield chunk
+    
+    async def open_transcriber(self, encoding: str = "mulaw", sample_rate: int = 8000) -> 'LiveTranscriber':
+        """Open an incremental speech-to-text stream (see SpeechClient)"""
+        return await self.speech.open_transcriber(encoding, sample_rate)
+    
     async def think(self, user_input: str) -> str:
         """
         Process user input using Phi 3.5 Mini and OpenAI
@@ -461,6 +645,40 @@ You are proactive, autonomous, and always aim for the best outcome."""
                 await self.audio_system.clear_filters(session_id)
                 return {"success": True, "message": "Filters cleared"}
             
+            elif operation == 'filters':
+                # e.g. {"presets": ["bass_boost", "nightcore"]} or {"text": "bass boost and nightcore"}
+                presets = params.get('presets') or self.audio_system.filters.presets_in(params.get('text', ''))
+                active = await self.audio_system.apply_filters(
+                    presets,
+                    session_id,
+                    replace=params.get('replace', False),
+                    transition_ms=params.get('transition_ms', 0)
+                )
+                return {"success": True, "message": f"Filters active: {', '.join(active) or 'none'}"}
+            
+            elif operation == 'say':
+                text = params.get('text', '')
+                success = await self.speak(text, session_id, params.get('emotion', 'content'))
+                return {"success": success, "message": f"Said: {text}" if success else "Speech failed"}
+            
+            elif operation == 'queue_many':
+                results = await self.audio_system.queue_many(params.get('queries', []), session_id)
+                queued = sum(item.success for item in results)
+                return {
+                    "success": queued > 0,
+                    "message": f"Queued {queued} of {len(results)} songs",
+                    "results": [item.to_dict() for item in results]
+                }
+            
+            elif operation == 'all_sessions':
+                # e.g. {"action": "volume", "volume": 40, "sessions": ["kitchen", "bedroom"]}
+                extra = {k: v for k, v in params.items() if k not in ('operation', 'action', 'sessions', 'session_id')}
+                results = await self.audio_system.for_sessions(params.get('action'), params.get('sessions'), **extra)
+                return {
+                    "success": all(item.success for item in results),
+                    "results": [item.to_dict() for item in results]
+                }
+            
             else:
                 return {"success": False, "error": f"Unknown operation: {operation}"}
                 
@@ -505,9 +723,17 @@ async def main():
     """Main entry point"""
     mr_happy = MrHappyCore()
     
+    if mr_happy.audio_system:
+        await mr_happy.audio_system.start()
+    
     logger.info("🚀 Mr. Happy is now online!")
     logger.info("🎤 Ready for voice commands...")
     
+    # Serve the voice system over the local bridge socket
+    if BRIDGE_AVAILABLE and os.getenv('MR_HAPPY_BRIDGE', 'auto') != 'off':
+        bridge = BridgeServer(mr_happy, os.getenv('MR_HAPPY_SOCKET', DEFAULT_SOCKET_PATH))
+        await bridge.start()
+    
     # Example usage
     test_input = "नमस्ते मिस्टर हैप्पी, मेरे घर की लाइट चालू करो"  # "Hello Mr. Happy, turn on my home lights"
     response = await mr_happy.think(test_input)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Mr. Happy Bridge for Satyug Universe
+Fast channel from the voice webhooks to the Mr. Happy AI Core
+
+Two transports share one interface:
+- In-process: calls MrHappyCore directly when co-located
+- Unix socket: newline-delimited JSON RPC over a persistent, multiplexed
+  connection when the core runs as a separate process
+"""
+
+import os
+import json
+import time
+import asyncio
+import itertools
+import importlib.util
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger('MrHappyBridge')
+
+# Bind-mounted into the mr-happy container (docker-compose.yml), so the
+# host's voice system and the containerised core see the same socket
+DEFAULT_SOCKET_PATH = "/tmp/satyug/mr-happy.sock"
+CORE_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mr-happy-core.py")
+
+# Twilio abandons a webhook after 15 seconds; keep a margin for rendering
+# the TwiML and the network hop back to Twilio
+TWILIO_WEBHOOK_TIMEOUT = 15.0
+WEBHOOK_DEADLINE_MARGIN = 1.5
+
+class BridgeError(Exception):
+    """Raised when the core cannot be reached or the call fails"""
+
+def webhook_deadline(timeout: float = TWILIO_WEBHOOK_TIMEOUT,
+                     margin: float = WEBHOOK_DEADLINE_MARGIN) -> float:
+    """
+    Deadline for work done inside a Twilio webhook
+
+    Returns:
+        Absolute deadline on the time.monotonic() clock
+    """
+    return time.monotonic() + max(0.0, timeout - margin)
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise asyncio.TimeoutError("Deadline already passed")
+    return remaining
+
+def load_core_class(name: str = "MrHappyCore"):
+    """Load a class (MrHappyCore by default) from mr-happy-core.py (not importable by name)"""
+    spec = importlib.util.spec_from_file_location("mr_happy_core", CORE_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, name)
+
+class InProcessBridge:
+    """Calls a co-located MrHappyCore directly"""
+
+    transport = "inprocess"
+
+    def __init__(self, core):
+        self.core = core
+
+    async def think(self, text: str, deadline: Optional[float] = None) -> str:
+        return await asyncio.wait_for(self.core.think(text), _remaining(deadline))
+
+    async def execute_action(self, action: str, parameters: Dict[str, Any],
+                             deadline: Optional[float] = None) -> Dict[str, Any]:
+        return await asyncio.wait_for(
+            self.core.execute_action(action, parameters),
+            _remaining(deadline)
+        )
+
+    async def close(self):
+        pass
+
+class UnixSocketBridge:
+    """
+    RPC client for a MrHappyCore served by BridgeServer
+
+    A single connection is opened lazily and reused for every call; if
+    the core is down (or restarts), the next call connects again.
+    Requests are tagged with ids so concurrent webhooks share the
+    connection without waiting on each other.
+    """
+
+    transport = "unix"
+
+    def __init__(self, path: str = DEFAULT_SOCKET_PATH):
+        self.path = path
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def _ensure_connected(self):
+        if self.connected:
+            return
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                raise BridgeError(f"Mr. Happy not reachable at {self.path}: {e}") from e
+            self._reader_task = asyncio.create_task(self._read_responses())
+            logger.info(f"🔌 Connected to Mr. Happy at {self.path}")
+
+    async def _read_responses(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                future = self.pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(BridgeError(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        except Exception as e:
+            logger.error(f"❌ Bridge connection error: {e}")
+        finally:
+            self._fail_pending(BridgeError("Connection to Mr. Happy lost"))
+            if self.writer:
+                self.writer.close()
+            self.writer = None
+
+    def _fail_pending(self, error: Exception):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self.pending.clear()
+
+    async def call(self, method: str, params: Dict[str, Any],
+                   deadline: Optional[float] = None) -> Any:
+        """
+        Call a method on the remote core
+
+        Args:
+            method: "think" or "execute_action"
+            params: Method parameters
+            deadline: Absolute time.monotonic() deadline
+
+        Returns:
+            Method result
+        """
+        timeout = _remaining(deadline)
+        await asyncio.wait_for(self._ensure_connected(), timeout)
+
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+
+        request = {"id": request_id, "method": method, "params": params}
+        if deadline is not None:
+            request["timeout"] = _remaining(deadline)
+
+        try:
+            self.writer.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n")
+            await self.writer.drain()
+            return await asyncio.wait_for(future, _remaining(deadline))
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def think(self, text: str, deadline: Optional[float] = None) -> str:
+        return await self.call("think", {"text": text}, deadline)
+
+    async def execute_action(self, action: str, parameters: Dict[str, Any],
+                             deadline: Optional[float] = None) -> Dict[str, Any]:
+        return await self.call(
+            "execute_action",
+            {"action": action, "parameters": parameters},
+            deadline
+        )
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+        if self._reader_task:
+            self._reader_task.cancel()
+
+class BridgeServer:
+    """
+    Serves a MrHappyCore over a Unix socket
+
+    Each request runs as its own task, so a slow `think` does not hold up
+    other calls on the same connection. The client's remaining deadline is
+    enforced on the server side too.
+    """
+
+    def __init__(self, core, path: str = DEFAULT_SOCKET_PATH):
+        self.core = core
+        self.path = path
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.server = await asyncio.start_unix_server(self._handle_connection, path=self.path)
+        # The voice system on the host runs as a different user than the container
+        os.chmod(self.path, 0o666)
+        logger.info(f"🌉 Mr. Happy bridge listening on {self.path}")
+
+    async def stop(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self._handle_request(line, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            method = request.get("method")
+            params = request.get("params", {})
+
+            if method == "think":
+                call = self.core.think(params["text"])
+            elif method == "execute_action":
+                call = self.core.execute_action(params["action"], params.get("parameters", {}))
+            else:
+                raise BridgeError(f"Unknown method: {method}")
+
+            result = await asyncio.wait_for(call, request.get("timeout"))
+            response = {"id": request_id, "result": result}
+        except asyncio.TimeoutError:
+            response = {"id": request_id, "error": "Deadline exceeded"}
+        except Exception as e:
+            response = {"id": request_id, "error": str(e)}
+
+        async with write_lock:
+            writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            await writer.drain()
+
+def create_bridge(mode: Optional[str] = None, socket_path: Optional[str] = None):
+    """
+    Create a bridge to Mr. Happy
+
+    "auto" (and "unix") connect over the socket, lazily: if the core is
+    not up yet, calls fail with BridgeError until it is. Only "inprocess"
+    loads a MrHappyCore into this process.
+
+    Args:
+        mode: "unix", "inprocess", "off" or "auto" (default: MR_HAPPY_BRIDGE env)
+        socket_path: Unix socket path (default: MR_HAPPY_SOCKET env)
+
+    Returns:
+        A bridge, or None if disabled or the in-process core cannot load
+    """
+    mode = mode or os.getenv('MR_HAPPY_BRIDGE', 'auto')
+    socket_path = socket_path or os.getenv('MR_HAPPY_SOCKET', DEFAULT_SOCKET_PATH)
+
+    if mode == "off":
+        return None
+
+    if mode != "inprocess":
+        if not os.path.exists(socket_path):
+            logger.info(f"⏳ {socket_path} not there yet; connecting on first use")
+        logger.info(f"🌉 Bridging to Mr. Happy over {socket_path}")
+        return UnixSocketBridge(socket_path)
+
+    try:
+        core_class = load_core_class()
+        logger.info("🌉 Bridging to in-process Mr. Happy")
+        return InProcessBridge(core_class())
+    except Exception as e:
+        logger.warning(f"⚠️ Mr. Happy core not available: {e}")
+        return None
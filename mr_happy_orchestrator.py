@@ -6,26 +6,244 @@ Auto-connects and manages all Satyug Universe components
 
 import os
 import sys
+import time
 import asyncio
-import subprocess
+import signal
 import logging
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from collections import Counter, deque
+from typing import Any, Callable, Dict, List, Optional, Set
 from datetime import datetime
 import json
 
+import aiohttp
+
+from docker_engine import DockerEngine, SERVICE_LABEL
+from orchestrator_api import OrchestratorAPI
+from orchestrator_state import ComponentRecord, StateStore
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger('MrHappyOrchestrator')
 
+@dataclass
+class HealthResult:
+    """Outcome of one health check"""
+    component: str
+    healthy: bool
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "component": self.component,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency_ms, 1),
+            "checked_at": datetime.fromtimestamp(self.checked_at).isoformat(),
+            "error": self.error
+        }
+
+class ProcessError(Exception):
+    """A managed command failed or timed out"""
+    
+    def __init__(self, message: str, result: Optional['ProcessResult'] = None):
+        super().__init__(message)
+        self.result = result
+
+@dataclass
+class ProcessResult:
+    """Finished command"""
+    args: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+    duration: float
+    
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+@dataclass
+class _ComposeBatch:
+    services: List[str]
+    future: asyncio.Future
+
+class ProcessRunner:
+    """
+    Async process control for the orchestrator
+    
+    - commands run with asyncio.create_subprocess_exec, so the event loop
+      keeps serving the monitor and API while they run
+    - every command has a timeout (the process is killed on expiry)
+    - stdout/stderr are captured
+    - at most `max_concurrent` commands run at once
+    - docker-compose requests for the same action and directory arriving
+      within `batch_window` seconds are merged into one invocation
+    """
+    
+    def __init__(self, max_concurrent: int = 4, default_timeout: float = 120,
+                 batch_window: float = 0.05, compose_command: Optional[List[str]] = None):
+        self.max_concurrent = max_concurrent
+        self.default_timeout = default_timeout
+        self.batch_window = batch_window
+        self.compose_command = compose_command or os.getenv('COMPOSE_COMMAND', 'docker-compose').split()
+        self.invocations = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._batches: Dict[tuple, _ComposeBatch] = {}
+        self._flushes: set = set()
+    
+    def _limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
+    async def run(self, args: List[str], cwd: Optional[str] = None,
+                  timeout: Optional[float] = None, check: bool = True) -> ProcessResult:
+        """
+        Run a command to completion
+        
+        Args:
+            args: Program and arguments
+            cwd: Working directory
+            timeout: Seconds before the process is killed (default_timeout if None)
+            check: Raise ProcessError on a non-zero exit
+            
+        Returns:
+            ProcessResult with captured output
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        
+        async with self._limit():
+            started = time.monotonic()
+            self.invocations += 1
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise ProcessError(f"{' '.join(args)} timed out after {timeout}s")
+            except asyncio.CancelledError:
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                raise
+        
+        result = ProcessResult(
+            args=list(args),
+            returncode=process.returncode,
+            stdout=stdout.decode('utf-8', errors='replace'),
+            stderr=stderr.decode('utf-8', errors='replace'),
+            duration=time.monotonic() - started
+        )
+        if check and not result.ok:
+            detail = result.stderr.strip().splitlines()[-1:] or [f"exit code {result.returncode}"]
+            raise ProcessError(f"{' '.join(args)} failed: {detail[0]}", result)
+        return result
+    
+    async def compose(self, action: str, services: List[str], cwd: str,
+                      timeout: Optional[float] = None) -> ProcessResult:
+        """
+        Run a docker-compose action for some services
+        
+        Concurrent calls with the same action and directory share one
+        `docker-compose <action> svc1 svc2 ...` invocation. If a merged
+        call fails, this caller's services are retried on their own so
+        one broken service doesn't fail the others.
+        
+        Raises:
+            ProcessError if the action failed for these services
+        """
+        key = (action, cwd)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = _ComposeBatch([], asyncio.get_running_loop().create_future())
+            self._batches[key] = batch
+            task = asyncio.create_task(self._flush(key, batch, timeout))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+        batch.services.extend(service for service in services if service not in batch.services)
+        
+        result = await asyncio.shield(batch.future)
+        if result.ok:
+            return result
+        if len(batch.services) > len(services):
+            return await self.run(self._compose_args(action, services), cwd, timeout)
+        raise ProcessError(f"docker-compose {action} {' '.join(services)} failed: "
+                           f"{result.stderr.strip()[-200:] or result.returncode}", result)
+    
+    def _compose_args(self, action: str, services: List[str]) -> List[str]:
+        flags = ["-d"] if action == "up" else []
+        return [*self.compose_command, action, *flags, *services]
+    
+    async def _flush(self, key: tuple, batch: _ComposeBatch, timeout: Optional[float]):
+        action, cwd = key
+        try:
+            await asyncio.sleep(self.batch_window)
+            self._batches.pop(key, None)
+            result = await self.run(self._compose_args(action, batch.services), cwd, timeout, check=False)
+            if len(batch.services) > 1:
+                logger.info(f"🐳 docker-compose {action}: {len(batch.services)} services in one call")
+            batch.future.set_result(result)
+        except asyncio.CancelledError:
+            # Callers wait on the (shielded) future, not on this task
+            self._batches.pop(key, None)
+            batch.future.cancel()
+            raise
+        except Exception as e:
+            batch.future.set_exception(e)
+    
+    async def close(self):
+        """Cancel compose invocations still in flight (their processes are killed)"""
+        for task in list(self._flushes):
+            task.cancel()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
 class SystemComponent:
     """Base class for system components"""
+    
+    # Seconds to wait for the component to pass its readiness probe
+    startup_timeout = 120
+    # HTTP endpoint answering 200 when healthy (None: override health_check)
+    health_url: Optional[str] = None
+    # Deadline for a single health check
+    health_timeout = 3.0
+    
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
+        # Called with (component, previous, status) on every status change
+        self.on_status_change: Optional[Callable[['SystemComponent', str, str], None]] = None
         self.status = "stopped"
         self.process = None
+        # Shared with the other components by the orchestrator
+        self.runner = ProcessRunner()
+    
+    @property
+    def status(self) -> str:
+        return self._status
+    
+    @status.setter
+    def status(self, value: str):
+        previous = getattr(self, '_status', None)
+        self._status = value
+        if value != previous:
+            self.status_since = time.time()
+            if previous is not None and self.on_status_change:
+                self.on_status_change(self, previous, value)
     
     async def start(self):
         """Start the component"""
@@ -35,9 +253,86 @@ class SystemComponent:
         """Stop the component"""
         raise NotImplementedError
     
-    async def health_check(self) -> bool:
-        """Check if component is healthy"""
-        raise NotImplementedError
+    async def health_check(self, session: Optional[aiohttp.ClientSession] = None) -> bool:
+        """
+        Check if component is healthy
+        
+        Args:
+            session: Shared HTTP session (a temporary one is used if None)
+        """
+        if not self.health_url:
+            raise NotImplementedError
+        try:
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await asyncio.wait_for(self.probe(own_session), self.health_timeout)
+            return await asyncio.wait_for(self.probe(session), self.health_timeout)
+        except Exception:
+            return False
+    
+    async def probe(self, session: aiohttp.ClientSession) -> bool:
+        """Health check that raises with the reason instead of returning False"""
+        if not self.health_url:
+            return await self.health_check(session)
+        async with session.get(self.health_url) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status}")
+            return True
+    
+    async def wait_exit(self) -> Optional[int]:
+        """
+        Wait for the component's own process to exit
+        
+        Returns:
+            Exit code, or None if the component has no process to watch
+        """
+        return None
+    
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid if self.process else None
+    
+    async def reconcile(self, record: Optional[ComponentRecord],
+                        containers: Optional[Dict[str, Dict[str, str]]],
+                        session: aiohttp.ClientSession) -> bool:
+        """
+        Find out whether the component is already running (at boot)
+        
+        Args:
+            record: State saved by the previous orchestrator, if any
+            containers: Satyug containers by label ({"id", "state"}), or
+                None if Docker could not be asked
+            session: Shared HTTP session
+        
+        Returns:
+            Whether the component is running and has been adopted
+        """
+        try:
+            return bool(await self.health_check(session))
+        except Exception:
+            return False
+    
+    async def ready(self, session: Optional[aiohttp.ClientSession] = None) -> bool:
+        """Readiness probe used to gate dependents at startup"""
+        return await self.health_check(session)
+    
+    async def wait_ready(self, timeout: Optional[float] = None,
+                         session: Optional[aiohttp.ClientSession] = None) -> bool:
+        """
+        Poll the readiness probe until it passes
+        
+        Polls quickly at first and backs off, so fast services are picked
+        up within ~100 ms and slow ones are not hammered.
+        """
+        deadline = time.monotonic() + (timeout or self.startup_timeout)
+        delay = 0.1
+        while True:
+            if await self.ready(session):
+                return True
+            if time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
 
 class MumbleServer(SystemComponent):
     """Mumble Voice Server"""
@@ -46,23 +341,21 @@ class MumbleServer(SystemComponent):
         self.port = 12847
         self.config_path = "/etc/mumble-server.ini"
     
+    async def _is_active(self) -> bool:
+        result = await self.runner.run(["systemctl", "is-active", "mumble-server"], check=False, timeout=10)
+        return result.stdout.strip() == "active"
+    
     async def start(self):
         logger.info(f"🎤 Starting {self.name}...")
         try:
             # Check if already running
-            result = subprocess.run(
-                ["systemctl", "is-active", "mumble-server"],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.stdout.strip() == "active":
+            if await self._is_active():
                 logger.info(f"✅ {self.name} already running")
                 self.status = "running"
                 return True
             
             # Start the service
-            subprocess.run(["sudo", "systemctl", "start", "mumble-server"], check=True)
+            await self.runner.run(["sudo", "systemctl", "start", "mumble-server"])
             self.status = "running"
             logger.info(f"✅ {self.name} started on port {self.port}")
             return True
@@ -73,7 +366,7 @@ class MumbleServer(SystemComponent):
     
     async def stop(self):
         try:
-            subprocess.run(["sudo", "systemctl", "stop", "mumble-server"], check=True)
+            await self.runner.run(["sudo", "systemctl", "stop", "mumble-server"])
             self.status = "stopped"
             logger.info(f"🛑 {self.name} stopped")
             return True
@@ -81,32 +374,64 @@ class MumbleServer(SystemComponent):
             logger.error(f"❌ Failed to stop {self.name}: {e}")
             return False
     
-    async def health_check(self) -> bool:
+    async def health_check(self, session: Optional[aiohttp.ClientSession] = None) -> bool:
         try:
-            result = subprocess.run(
-                ["systemctl", "is-active", "mumble-server"],
-                capture_output=True,
-                text=True
-            )
-            return result.stdout.strip() == "active"
-        except:
+            return await self._is_active()
+        except Exception:
             return False
 
-class HomeAssistant(SystemComponent):
-    """Home Assistant Smart Home System"""
-    def __init__(self):
-        super().__init__("Home Assistant", "Smart home automation")
-        self.port = 8123
+class ComposeComponent(SystemComponent):
+    """
+    Component run as docker-compose services
+    
+    Driven through the docker-compose CLI, or through the Docker Engine
+    API when the orchestrator sets `engine` (containers are then found by
+    their `satyug.service` labels).
+    """
+    
+    icon = "🐳"
+    compose_dir = "/home/ubuntu"
+    services: List[str] = []
+    # satyug.service labels of the containers, when they differ from the
+    # compose service names
+    labels: List[str] = []
+    engine: Optional[DockerEngine] = None
+    
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        # satyug.service label -> container id, as last seen
+        self.container_ids: Dict[str, str] = {}
+    
+    @property
+    def service_labels(self) -> List[str]:
+        return self.labels or self.services
+    
+    async def reconcile(self, record: Optional[ComponentRecord],
+                        containers: Optional[Dict[str, Dict[str, str]]],
+                        session: aiohttp.ClientSession) -> bool:
+        if containers is None:
+            return await super().reconcile(record, containers, session)
+        found = {label: containers[label] for label in self.service_labels if label in containers}
+        self.container_ids = {label: container["id"] for label, container in found.items()}
+        if record:
+            recreated = [label for label, cid in self.container_ids.items()
+                         if record.container_ids.get(label) not in (None, cid)]
+            if recreated:
+                logger.info(f"🔁 {self.name}: containers recreated since last run: {', '.join(recreated)}")
+        return len(found) == len(self.service_labels) and all(
+            container["state"] == "running" for container in found.values()
+        )
     
     async def start(self):
-        logger.info(f"🏠 Starting {self.name}...")
+        logger.info(f"{self.icon} Starting {self.name}...")
         try:
-            # Start via Docker Compose
-            subprocess.run(
-                ["docker-compose", "up", "-d", "homeassistant"],
-                cwd="/home/ubuntu",
-                check=True
-            )
+            if self.engine:
+                missing = await self.engine.start_services(self.service_labels)
+                if missing:
+                    # Never created; compose has to create them
+                    await self.runner.compose("up", self.services, self.compose_dir)
+            else:
+                await self.runner.compose("up", self.services, self.compose_dir)
             self.status = "running"
             logger.info(f"✅ {self.name} started on port {self.port}")
             return True
@@ -117,267 +442,692 @@ class HomeAssistant(SystemComponent):
     
     async def stop(self):
         try:
-            subprocess.run(
-                ["docker-compose", "stop", "homeassistant"],
-                cwd="/home/ubuntu",
-                check=True
-            )
+            if self.engine:
+                await self.engine.stop_services(self.service_labels)
+            else:
+                await self.runner.compose("stop", self.services, self.compose_dir)
             self.status = "stopped"
             return True
         except Exception as e:
             logger.error(f"❌ Failed to stop {self.name}: {e}")
             return False
+
+class HomeAssistant(ComposeComponent):
+    """Home Assistant Smart Home System"""
+    icon = "🏠"
+    services = ["homeassistant"]
     
-    async def health_check(self) -> bool:
-        try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"http://localhost:{self.port}/api/", timeout=5) as resp:
-                    return resp.status == 200
-        except:
-            return False
+    def __init__(self):
+        super().__init__("Home Assistant", "Smart home automation")
+        self.port = 8123
+        self.health_url = f"http://localhost:{self.port}/api/"
 
-class OdooERP(SystemComponent):
+class OdooERP(ComposeComponent):
     """Odoo Enterprise Resource Planning"""
+    icon = "📊"
+    services = ["odoo", "odoo-db"]
+    labels = ["odoo", "odoo-database"]
+    
     def __init__(self):
         super().__init__("Odoo ERP", "Business management system")
         self.port = 8069
-    
-    async def start(self):
-        logger.info(f"📊 Starting {self.name}...")
-        try:
-            subprocess.run(
-                ["docker-compose", "up", "-d", "odoo", "odoo-db"],
-                cwd="/home/ubuntu",
-                check=True
-            )
-            self.status = "running"
-            logger.info(f"✅ {self.name} started on port {self.port}")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to start {self.name}: {e}")
-            self.status = "error"
-            return False
-    
-    async def stop(self):
-        try:
-            subprocess.run(
-                ["docker-compose", "stop", "odoo", "odoo-db"],
-                cwd="/home/ubuntu",
-                check=True
-            )
-            self.status = "stopped"
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to stop {self.name}: {e}")
-            return False
-    
-    async def health_check(self) -> bool:
-        try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"http://localhost:{self.port}/web/database/selector", timeout=5) as resp:
-                    return resp.status == 200
-        except:
-            return False
+        self.health_url = f"http://localhost:{self.port}/web/database/selector"
 
-class Nextcloud(SystemComponent):
+class Nextcloud(ComposeComponent):
     """Nextcloud File Storage"""
+    icon = "☁️"
+    services = ["nextcloud", "nextcloud-db"]
+    labels = ["nextcloud", "nextcloud-database"]
+    
     def __init__(self):
         super().__init__("Nextcloud", "File storage and collaboration")
         self.port = 8080
+        self.health_url = f"http://localhost:{self.port}/status.php"
+
+class MrHappyCore(ComposeComponent):
+    """Mr. Happy AI Core"""
+    icon = "🤖"
+    services = ["mr-happy"]
     
-    async def start(self):
-        logger.info(f"☁️ Starting {self.name}...")
-        try:
-            subprocess.run(
-                ["docker-compose", "up", "-d", "nextcloud", "nextcloud-db"],
-                cwd="/home/ubuntu",
-                check=True
-            )
-            self.status = "running"
-            logger.info(f"✅ {self.name} started on port {self.port}")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to start {self.name}: {e}")
-            self.status = "error"
-            return False
+    def __init__(self):
+        super().__init__("Mr. Happy AI", "Central AI brain")
+        self.port = 8000
+        self.health_url = f"http://localhost:{self.port}/health"
+
+class LogBuffer:
+    """
+    Recent output of a child process
     
-    async def stop(self):
+    Keeps the last `max_lines` lines in memory for tailing and, when a
+    path is given, appends every line to a log file rotated at
+    `max_bytes` (keeping `backups` old files).
+    """
+    
+    def __init__(self, max_lines: int = 1000, path: Optional[str] = None,
+                 max_bytes: int = 5 * 1024 * 1024, backups: int = 3):
+        self.lines: deque = deque(maxlen=max_lines)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.total = 0
+        self._file = None
+    
+    def append(self, stream: str, text: str):
+        entry = (time.time(), stream, text)
+        self.lines.append(entry)
+        self.total += 1
+        if self.path:
+            self._write(entry)
+    
+    def _write(self, entry: tuple):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        stamp, stream, text = entry
+        self._file.write(f"{datetime.fromtimestamp(stamp).isoformat()} [{stream}] {text}\n")
+        if self._file.tell() >= self.max_bytes:
+            self.rotate()
+    
+    def rotate(self):
+        """Move the current file to .1 (shifting older ones) and start a new one"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if os.path.exists(self.path):
+            os.replace(self.path, f"{self.path}.1")
+    
+    def flush(self):
+        if self._file:
+            self._file.flush()
+    
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+    
+    def tail(self, lines: int = 50, stream: Optional[str] = None) -> List[str]:
+        """Last lines, oldest first"""
+        selected = [entry for entry in self.lines if stream is None or entry[1] == stream]
+        return [f"[{s}] {text}" for _, s, text in selected[-lines:]]
+
+def _process_start_time(pid: int) -> Optional[int]:
+    """Start time of a process in clock ticks after boot (/proc/<pid>/stat field 22)"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # The command name (field 2) may contain spaces and parentheses
+    fields = stat[stat.rindex(b")") + 2:].split()
+    return int(fields[19])
+
+class AdoptedProcess:
+    """
+    Child process left running by a previous orchestrator
+    
+    Stands in for asyncio.subprocess.Process as far as ProcessComponent
+    needs it. The process is not our child, so its exit status cannot be
+    collected: returncode is -1 once it is gone.
+    """
+    
+    poll_interval = 1.0
+    
+    def __init__(self, pid: int):
+        self.pid = pid
+        self._returncode: Optional[int] = None
+    
+    def _alive(self) -> bool:
         try:
-            subprocess.run(
-                ["docker-compose", "stop", "nextcloud", "nextcloud-db"],
-                cwd="/home/ubuntu",
-                check=True
-            )
-            self.status = "stopped"
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to stop {self.name}: {e}")
+            os.kill(self.pid, 0)
+        except ProcessLookupError:
             return False
+        except PermissionError:
+            pass
+        return True
     
-    async def health_check(self) -> bool:
+    @property
+    def returncode(self) -> Optional[int]:
+        if self._returncode is None and not self._alive():
+            self._returncode = -1
+        return self._returncode
+    
+    def _signal(self, signum: int):
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"http://localhost:{self.port}/status.php", timeout=5) as resp:
-                    return resp.status == 200
-        except:
-            return False
+            os.kill(self.pid, signum)
+        except ProcessLookupError:
+            pass
+    
+    def terminate(self):
+        self._signal(signal.SIGTERM)
+    
+    def kill(self):
+        self._signal(signal.SIGKILL)
+    
+    async def wait(self) -> int:
+        if self.returncode is not None:
+            return self._returncode
+        if hasattr(os, 'pidfd_open'):
+            # Linux: the pidfd becomes readable when the process exits
+            try:
+                fd = os.pidfd_open(self.pid)
+            except ProcessLookupError:
+                return self.returncode
+            loop = asyncio.get_running_loop()
+            exited = loop.create_future()
+            loop.add_reader(fd, lambda: exited.done() or exited.set_result(None))
+            try:
+                await exited
+            finally:
+                loop.remove_reader(fd)
+                os.close(fd)
+        else:
+            while self.returncode is None:
+                await asyncio.sleep(self.poll_interval)
+        self._returncode = -1
+        return self._returncode
 
-class MrHappyCore(SystemComponent):
-    """Mr. Happy AI Core"""
-    def __init__(self):
-        super().__init__("Mr. Happy AI", "Central AI brain")
-        self.port = 8000
+class ProcessComponent(SystemComponent):
+    """
+    Component run as a child process of the orchestrator
+    
+    stdout and stderr are read continuously by two pump tasks, so a
+    chatty child can never block on a full pipe. Output goes to a
+    LogBuffer (ring buffer plus optional rotating file under
+    ORCHESTRATOR_LOG_DIR).
+    
+    Children run in their own session, so they outlive an orchestrator
+    restart and are adopted at the next boot: only the PID recorded in the
+    state store, and only while it runs our command with the recorded start
+    time (not a reused PID, not a copy started by hand). Output of an
+    adopted child is no longer captured.
+    """
+    
+    icon = "⚙️"
+    command: List[str] = []
+    stop_timeout = 10.0
+    
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        log_dir = os.getenv('ORCHESTRATOR_LOG_DIR')
+        slug = self.__class__.__name__.lower()
+        self.logs = LogBuffer(path=os.path.join(log_dir, f"{slug}.log") if log_dir else None)
+        self._pumps: List[asyncio.Task] = []
+        self.pid_start_time: Optional[int] = None
     
     async def start(self):
-        logger.info(f"🤖 Starting {self.name}...")
+        if self.process is not None and self.process.returncode is None:
+            # Already up (possibly adopted); a second copy would orphan this one
+            logger.info(f"{self.icon} {self.name} already running (pid {self.process.pid})")
+            self.status = "running"
+            return True
+        logger.info(f"{self.icon} Starting {self.name}...")
         try:
-            subprocess.run(
-                ["docker-compose", "up", "-d", "mr-happy"],
-                cwd="/home/ubuntu",
-                check=True
+            self.process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                # Not killed along with the orchestrator (warm restart)
+                start_new_session=True
             )
+            self.pid_start_time = _process_start_time(self.process.pid)
+            self._pumps = [
+                asyncio.create_task(self._pump(self.process.stdout, "stdout")),
+                asyncio.create_task(self._pump(self.process.stderr, "stderr"))
+            ]
             self.status = "running"
-            logger.info(f"✅ {self.name} started on port {self.port}")
+            logger.info(f"✅ {self.name} started (pid {self.process.pid})")
             return True
         except Exception as e:
             logger.error(f"❌ Failed to start {self.name}: {e}")
             self.status = "error"
             return False
     
+    async def _pump(self, reader: asyncio.StreamReader, stream: str):
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Line longer than the reader limit; take what is buffered
+                line = await reader.read(64 * 1024)
+            if not line:
+                break
+            self.logs.append(stream, line.decode('utf-8', errors='replace').rstrip())
+        self.logs.flush()
+    
     async def stop(self):
-        try:
-            subprocess.run(
-                ["docker-compose", "stop", "mr-happy"],
-                cwd="/home/ubuntu",
-                check=True
-            )
+        if self.process is None:
             self.status = "stopped"
             return True
-        except Exception as e:
-            logger.error(f"❌ Failed to stop {self.name}: {e}")
+        if self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), self.stop_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ {self.name} ignored SIGTERM, killing")
+                self.process.kill()
+                await self.process.wait()
+        # Drain whatever output is left
+        await asyncio.gather(*self._pumps, return_exceptions=True)
+        self.logs.flush()
+        self.status = "stopped"
+        return True
+    
+    async def health_check(self, session: Optional[aiohttp.ClientSession] = None) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def wait_exit(self) -> Optional[int]:
+        if self.process is None:
+            return None
+        return await self.process.wait()
+    
+    async def reconcile(self, record: Optional[ComponentRecord],
+                        containers: Optional[Dict[str, Dict[str, str]]],
+                        session: aiohttp.ClientSession) -> bool:
+        if self.process is not None and self.process.returncode is None:
+            return True
+        if not (record and record.pid and self._is_recorded_process(record)):
             return False
+        self.process = AdoptedProcess(record.pid)
+        self.pid_start_time = record.pid_start_time
+        self._pumps = []
+        logger.info(f"♻️ {self.name}: adopted running pid {record.pid}")
+        return True
     
-    async def health_check(self) -> bool:
+    def _is_recorded_process(self, record: ComponentRecord) -> bool:
+        """Whether the recorded PID is still the process we started"""
+        if not self._runs_command(record.pid):
+            return False
+        # Records saved before start times were kept can only be matched by command
+        return record.pid_start_time is None or _process_start_time(record.pid) == record.pid_start_time
+    
+    def _runs_command(self, pid: int) -> bool:
+        """Whether `pid` is still our command (and not a reused PID)"""
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"http://localhost:{self.port}/health", timeout=5) as resp:
-                    return resp.status == 200
-        except:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().split(b"\0")[:-1]
+        except OSError:
             return False
+        return [arg.decode('utf-8', errors='replace') for arg in cmdline] == self.command
+    
+    def tail(self, lines: int = 50, stream: Optional[str] = None) -> List[str]:
+        """Recent output of the process"""
+        return self.logs.tail(lines, stream)
 
-class VoiceGeolocationSystem(SystemComponent):
+class VoiceGeolocationSystem(ProcessComponent):
     """Voice and Geolocation System"""
+    icon = "🎤📍"
+    command = ["python3", "/home/ubuntu/voice_geolocation_system.py"]
+    
     def __init__(self):
         super().__init__("Voice & Geolocation", "Voice control and location services")
         self.port = 8001
-    
-    async def start(self):
-        logger.info(f"🎤📍 Starting {self.name}...")
-        try:
-            self.process = subprocess.Popen(
-                ["python3", "/home/ubuntu/voice_geolocation_system.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            self.status = "running"
-            logger.info(f"✅ {self.name} started")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to start {self.name}: {e}")
-            self.status = "error"
-            return False
-    
-    async def stop(self):
-        if self.process:
-            self.process.terminate()
-            self.process.wait()
-            self.status = "stopped"
-            return True
-        return False
-    
-    async def health_check(self) -> bool:
-        return self.process is not None and self.process.poll() is None
 
-class LavalinkServer(SystemComponent):
+class LavalinkServer(ComposeComponent):
     """Lavalink Audio Streaming Server"""
+    icon = "🎵"
+    services = ["lavalink"]
+    compose_dir = "/home/ubuntu/axzora-super-app"
+    
     def __init__(self):
         super().__init__("Lavalink", "Audio streaming and music playback")
         self.port = 2333
+        self.health_url = f"http://localhost:{self.port}/version"
+
+class GoogleAssistantBridge(ProcessComponent):
+    """Google Assistant Integration"""
+    icon = "🗣️"
+    command = ["node", "/home/ubuntu/axzora-super-app/backend/google-assistant-server.js"]
     
-    async def start(self):
-        logger.info(f"🎵 Starting {self.name}...")
-        try:
-            subprocess.run(
-                ["docker-compose", "up", "-d", "lavalink"],
-                cwd="/home/ubuntu/axzora-super-app",
-                check=True
+    def __init__(self):
+        super().__init__("Google Assistant", "Voice assistant integration")
+        self.port = 3001
+
+class HealthMonitor:
+    """
+    Concurrent component health checks
+    
+    - every component is checked at once over one pooled HTTP session
+    - each check has its own deadline (component.health_timeout)
+    - results are cached for `ttl` seconds, so repeated status queries
+      are answered without touching the services
+    - concurrent requests for the same component share one check
+    - check latencies are kept as a histogram per component for metrics
+    """
+    
+    # Histogram bucket upper bounds in seconds
+    latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+    
+    def __init__(self, components: Dict[str, SystemComponent], ttl: float = 5.0):
+        self.components = components
+        self.ttl = ttl
+        self.results: Dict[str, HealthResult] = {}
+        # Per component: [count per bucket..., +Inf count], sum of seconds
+        self.latency_counts: Dict[str, List[int]] = {}
+        self.latency_sums: Dict[str, float] = {}
+        # Called with the new result when a component turns healthy/unhealthy
+        self.on_change: Optional[Callable[[HealthResult], None]] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def session(self) -> aiohttp.ClientSession:
+        """Shared HTTP session (created on first use, per event loop)"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # Sessions are bound to the loop that created them
+            self._session_loop = loop
+            self._inflight.clear()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=30)
             )
-            self.status = "running"
-            logger.info(f"✅ {self.name} started on port {self.port}")
-            return True
-        except Exception as e:
-            logger.error(f"❌ Failed to start {self.name}: {e}")
-            self.status = "error"
-            return False
+        return self._session
     
-    async def stop(self):
+    async def close(self):
+        if self._session and not self._session.closed and self._session_loop is asyncio.get_running_loop():
+            await self._session.close()
+    
+    def fresh(self, name: str) -> Optional[HealthResult]:
+        """Cached result if it is younger than the TTL"""
+        result = self.results.get(name)
+        if result and time.time() - result.checked_at < self.ttl:
+            return result
+        return None
+    
+    async def check(self, name: str, use_cache: bool = True) -> HealthResult:
+        """Check one component"""
+        if use_cache:
+            cached = self.fresh(name)
+            if cached:
+                return cached
+        
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._run_check(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+    
+    async def _run_check(self, name: str) -> HealthResult:
+        component = self.components[name]
+        session = await self.session()
+        started = time.monotonic()
+        error = None
         try:
-            subprocess.run(
-                ["docker-compose", "stop", "lavalink"],
-                cwd="/home/ubuntu/axzora-super-app",
-                check=True
-            )
-            self.status = "stopped"
-            return True
+            healthy = await asyncio.wait_for(component.probe(session), component.health_timeout)
+        except asyncio.TimeoutError:
+            healthy, error = False, f"timed out after {component.health_timeout}s"
         except Exception as e:
-            logger.error(f"❌ Failed to stop {self.name}: {e}")
-            return False
+            healthy, error = False, str(e) or type(e).__name__
+        if not healthy and error is None:
+            error = "check failed"
+        
+        result = HealthResult(
+            component=name,
+            healthy=bool(healthy),
+            latency_ms=(time.monotonic() - started) * 1000,
+            checked_at=time.time(),
+            error=error
+        )
+        previous = self.results.get(name)
+        self.results[name] = result
+        self._observe(name, result.latency_ms / 1000)
+        if self.on_change and (previous is None or previous.healthy != result.healthy):
+            self.on_change(result)
+        return result
     
-    async def health_check(self) -> bool:
-        try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"http://localhost:{self.port}/version", timeout=5) as resp:
-                    return resp.status == 200
-        except:
-            return False
+    def _observe(self, name: str, seconds: float):
+        counts = self.latency_counts.setdefault(name, [0] * (len(self.latency_buckets) + 1))
+        for index, bound in enumerate(self.latency_buckets):
+            if seconds <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.latency_sums[name] = self.latency_sums.get(name, 0.0) + seconds
+    
+    async def check_all(self, use_cache: bool = True) -> Dict[str, HealthResult]:
+        """Check every component concurrently"""
+        results = await asyncio.gather(*(self.check(name, use_cache) for name in self.components))
+        return {result.component: result for result in results}
 
-class GoogleAssistantBridge(SystemComponent):
-    """Google Assistant Integration"""
-    def __init__(self):
-        super().__init__("Google Assistant", "Voice assistant integration")
-        self.port = 3001
+@dataclass
+class SupervisionState:
+    """Restart bookkeeping for one component"""
+    failures: int = 0
+    backoff: float = 0.0
+    next_attempt: float = 0.0
+    breaker_until: float = 0.0
+    last_restart: float = 0.0
+    restart_count: int = 0
+    restarts: deque = None
     
-    async def start(self):
-        logger.info(f"🗣️ Starting {self.name}...")
+    def __post_init__(self):
+        if self.restarts is None:
+            self.restarts = deque()
+
+class Supervisor:
+    """
+    Event-driven component supervision
+    
+    Failures are noticed as they happen (Docker container events, child
+    process exits) with a periodic health sweep as a fallback for hangs.
+    A suspect component is re-checked quickly; only `failure_threshold`
+    consecutive failed checks trigger a restart. Restarts back off
+    exponentially per component, and a component restarted
+    `breaker_threshold` times within `breaker_window` seconds is left
+    alone for `breaker_cooldown` seconds (circuit open). A restart covers
+    the failed component and everything depending on it, started again
+    concurrently in dependency order.
+    """
+    
+    def __init__(self, orchestrator: 'MrHappyOrchestrator', check_interval: float = 15,
+                 confirm_interval: float = 1.0, failure_threshold: int = 3,
+                 base_backoff: float = 2.0, max_backoff: float = 300,
+                 breaker_threshold: int = 5, breaker_window: float = 600,
+                 breaker_cooldown: float = 900, stable_after: float = 120):
+        self.orchestrator = orchestrator
+        self.check_interval = check_interval
+        self.confirm_interval = confirm_interval
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_window = breaker_window
+        self.breaker_cooldown = breaker_cooldown
+        self.stable_after = stable_after
+        
+        self.states: Dict[str, SupervisionState] = {
+            name: SupervisionState(backoff=base_backoff) for name in orchestrator.components
+        }
+        # Components being restarted on purpose, counted per holder (the
+        # supervisor and API restarts can overlap)
+        self.restarting: Counter = Counter()
+        self._evaluating: Set[str] = set()
+        self._signals: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+    
+    def signal(self, name: str):
+        """Ask for a prompt check of a component (e.g. its container died)"""
+        if self._signals is not None:
+            self._signals.put_nowait(name)
+    
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    def hold(self, names: List[str]):
+        """Treat components as restarting on purpose until released"""
+        self.restarting.update(names)
+    
+    def release(self, names: List[str]):
+        """Undo one hold() of these components"""
+        self.restarting.subtract(names)
+        for name in names:
+            if self.restarting[name] <= 0:
+                del self.restarting[name]
+    
+    def _signal_later(self, name: str, delay: float):
+        async def later():
+            await asyncio.sleep(delay)
+            self.signal(name)
+        self._spawn(later())
+    
+    async def run(self):
+        """Supervise until cancelled"""
+        self._signals = asyncio.Queue()
+        logger.info(f"👁️ Supervising {len(self.states)} components (sweep every {self.check_interval}s)")
+        
+        self._spawn(self._sweep())
+        for name in self.orchestrator.components:
+            self._spawn(self._watch_process(name))
+        if self.orchestrator.engine:
+            self._spawn(self.orchestrator.watch_containers())
+        
         try:
-            self.process = subprocess.Popen(
-                ["node", "/home/ubuntu/axzora-super-app/backend/google-assistant-server.js"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            self.status = "running"
-            logger.info(f"✅ {self.name} started on port {self.port}")
-            return True
+            while True:
+                name = await self._signals.get()
+                if name in self._evaluating or name in self.restarting:
+                    continue
+                self._evaluating.add(name)
+                self._spawn(self._evaluate(name))
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+    
+    async def _sweep(self):
+        while True:
+            for name in self.orchestrator.components:
+                self.signal(name)
+            await asyncio.sleep(self.check_interval)
+    
+    async def _watch_process(self, name: str):
+        """Signal as soon as a child process exits"""
+        component = self.orchestrator.components[name]
+        while True:
+            if component.process is None:
+                await asyncio.sleep(self.check_interval)
+                continue
+            process = component.process
+            code = await component.wait_exit()
+            if component.process is process and component.status == "running":
+                logger.warning(f"💥 {component.name} exited with code {code}")
+                component.status = "exited"
+                self.signal(name)
+            # Wait for a new process before watching again
+            while component.process is process:
+                await asyncio.sleep(self.confirm_interval)
+    
+    def _supervised(self, name: str) -> bool:
+        # Components stopped on purpose are left alone
+        return self.orchestrator.components[name].status != "stopped"
+    
+    async def _evaluate(self, name: str):
+        try:
+            if not self._supervised(name):
+                return
+            state = self.states[name]
+            result = await self.orchestrator.health.check(name, use_cache=False)
+            now = time.monotonic()
+            
+            if result.healthy:
+                state.failures = 0
+                if state.last_restart and now - state.last_restart > self.stable_after:
+                    state.backoff = self.base_backoff
+                return
+            
+            state.failures += 1
+            if state.failures < self.failure_threshold:
+                self._signal_later(name, self.confirm_interval)
+                return
+            
+            if now < state.breaker_until:
+                return
+            if now < state.next_attempt:
+                self._signal_later(name, state.next_attempt - now)
+                return
+            
+            self.hold([name])
+            self._spawn(self.restart(name))
+        finally:
+            self._evaluating.discard(name)
+    
+    async def restart(self, name: str):
+        """
+        Restart a failed component and its dependents
+        
+        Releases the hold _evaluate() put on `name`, however it ends.
+        """
+        state = self.states[name]
+        try:
+            await self._restart(name, state)
         except Exception as e:
-            logger.error(f"❌ Failed to start {self.name}: {e}")
-            self.status = "error"
-            return False
+            state.next_attempt = time.monotonic() + state.backoff
+            state.backoff = min(state.backoff * 2, self.max_backoff)
+            logger.error(f"❌ Restart of {name} failed: {e}; retrying in {state.next_attempt - time.monotonic():.0f}s")
+            self._signal_later(name, state.next_attempt - time.monotonic())
+        finally:
+            self.release([name])
     
-    async def stop(self):
-        if self.process:
-            self.process.terminate()
-            self.process.wait()
-            self.status = "stopped"
-            return True
-        return False
+    async def _restart(self, name: str, state: SupervisionState):
+        now = time.monotonic()
+        
+        # Circuit breaker: too many restarts in the window
+        while state.restarts and now - state.restarts[0] > self.breaker_window:
+            state.restarts.popleft()
+        if len(state.restarts) >= self.breaker_threshold:
+            state.breaker_until = now + self.breaker_cooldown
+            state.restarts.clear()
+            logger.error(f"🚫 {name} restarted {self.breaker_threshold} times in {self.breaker_window:.0f}s; "
+                         f"giving up for {self.breaker_cooldown:.0f}s")
+            # Look again once the circuit closes
+            self._signal_later(name, self.breaker_cooldown)
+            return
+        
+        dependents = self.orchestrator.dependents(name)
+        targets = [n for n in self.orchestrator.startup_order
+                   if n == name or (n in dependents and self._supervised(n))]
+        
+        self.hold(targets)
+        try:
+            logger.warning(f"🔄 Restarting {', '.join(targets)} (backoff {state.backoff:.0f}s)")
+            await self.orchestrator.stop_components(targets)
+            results = await self.orchestrator.start_components(targets)
+        finally:
+            self.release(targets)
+        
+        state.failures = 0
+        state.restarts.append(time.monotonic())
+        state.last_restart = time.monotonic()
+        state.restart_count += 1
+        state.next_attempt = state.last_restart + state.backoff
+        state.backoff = min(state.backoff * 2, self.max_backoff)
+        
+        if not results.get(name):
+            # Still down: try again once the backoff has passed
+            self._signal_later(name, state.next_attempt - time.monotonic())
+        
+        recovered = [n for n, ok in results.items() if ok]
+        logger.info(f"✅ Recovered: {', '.join(recovered) or 'none'}")
     
-    async def health_check(self) -> bool:
-        return self.process is not None and self.process.poll() is None
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Supervision state per component"""
+        now = time.monotonic()
+        return {
+            name: {
+                "restarts": state.restart_count,
+                "consecutive_failures": state.failures,
+                "backoff_s": state.backoff,
+                "circuit_open": now < state.breaker_until
+            }
+            for name, state in self.states.items()
+        }
 
 class MrHappyOrchestrator:
     """
@@ -397,38 +1147,202 @@ class MrHappyOrchestrator:
             "google_assistant": GoogleAssistantBridge()
         }
         
-        self.startup_order = [
-            "mumble",
-            "homeassistant",
-            "odoo",
-            "nextcloud",
-            "lavalink",
-            "mr_happy",
-            "voice_geo",
-            "google_assistant"
-        ]
+        # Components that must be ready before a component starts
+        self.dependencies: Dict[str, List[str]] = {
+            "mumble": [],
+            "homeassistant": [],
+            "odoo": [],
+            "nextcloud": [],
+            "lavalink": [],
+            "mr_happy": ["homeassistant", "odoo", "nextcloud", "lavalink"],
+            "voice_geo": ["mr_happy"],
+            "google_assistant": []
+        }
+        
+        # One process runner so compose calls are batched and limited together
+        self.runner = ProcessRunner()
+        for component in self.components.values():
+            component.runner = self.runner
+        
+        # Docker Engine API instead of the compose CLI when the socket is there
+        self.engine: Optional[DockerEngine] = None
+        backend = os.getenv('ORCHESTRATOR_BACKEND', 'auto')
+        if backend == "engine" or (backend == "auto" and DockerEngine.available()):
+            self.engine = DockerEngine()
+            logger.info(f"🐳 Using Docker Engine API at {self.engine.socket_path}")
+        
+        # satyug.service label -> component
+        self.service_components: Dict[str, str] = {}
+        for name, component in self.components.items():
+            if isinstance(component, ComposeComponent):
+                component.engine = self.engine
+                for label in component.service_labels:
+                    self.service_components[label] = name
+        
+        self.startup_order = self.topological_order()
+        self.startup_durations: Dict[str, float] = {}
+        self.health = HealthMonitor(self.components)
+        self.supervisor: Optional[Supervisor] = None
+        
+        # Survives orchestrator restarts (see reconcile)
+        self.state = StateStore()
+        
+        # State-change events for API clients
+        self.subscribers: Set[asyncio.Queue] = set()
+        for name, component in self.components.items():
+            component.on_status_change = (
+                lambda component, previous, status, name=name: self._status_changed(name, previous, status)
+            )
+        self.health.on_change = lambda result: self._publish({
+            "type": "health", "component": result.component,
+            "healthy": result.healthy, "error": result.error
+        })
         
         logger.info("🎉 Mr. Happy Orchestrator initialized")
     
+    def topological_order(self) -> List[str]:
+        """Components ordered so every dependency comes first"""
+        order = []
+        state: Dict[str, str] = {}
+        
+        def visit(name: str, path: List[str]):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = "visiting"
+            for dependency in self.dependencies.get(name, []):
+                if dependency not in self.components:
+                    raise ValueError(f"{name} depends on unknown component {dependency}")
+                visit(dependency, path + [name])
+            state[name] = "done"
+            order.append(name)
+        
+        for name in self.components:
+            visit(name, [])
+        return order
+    
+    def dependents(self, name: str) -> Set[str]:
+        """Components that need `name`, directly or transitively"""
+        found: Set[str] = set()
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            for other, dependencies in self.dependencies.items():
+                if current in dependencies and other not in found:
+                    found.add(other)
+                    stack.append(other)
+        return found
+    
+    async def _start_when_ready(self, name: str, ready: Dict[str, asyncio.Future]) -> bool:
+        component = self.components[name]
+        
+        results = await asyncio.gather(*(ready[dependency] for dependency in self.dependencies[name]))
+        if not all(results):
+            failed = [d for d, ok in zip(self.dependencies[name], results) if not ok]
+            logger.error(f"⏭️ Not starting {component.name}: waiting on failed {', '.join(failed)}")
+            component.status = "blocked"
+            return False
+        
+        started = time.monotonic()
+        if await component.start() is False:
+            return False
+        if not await component.wait_ready(session=await self.health.session()):
+            logger.error(f"❌ {component.name} not ready after {component.startup_timeout}s")
+            component.status = "error"
+            return False
+        
+        self.startup_durations[name] = time.monotonic() - started
+        logger.info(f"🟢 {component.name} ready in {self.startup_durations[name]:.1f}s")
+        return True
+    
+    async def start_components(self, names: List[str]) -> Dict[str, bool]:
+        """
+        Start components concurrently, respecting dependencies
+        
+        Each component starts as soon as the dependencies it needs (among
+        `names`; others are assumed up) pass their readiness probes.
+        
+        Returns:
+            Whether each component came up
+        """
+        loop = asyncio.get_running_loop()
+        ready: Dict[str, asyncio.Future] = {}
+        for name in self.components:
+            ready[name] = loop.create_future()
+            if name not in names:
+                ready[name].set_result(True)
+        
+        async def run(name: str):
+            try:
+                result = await self._start_when_ready(name, ready)
+            except Exception as e:
+                logger.error(f"❌ Failed to start {name}: {e}")
+                result = False
+            ready[name].set_result(result)
+        
+        await asyncio.gather(*(run(name) for name in self.startup_order if name in names))
+        return {name: ready[name].result() for name in names}
+    
+    async def restart_components(self, names: List[str]) -> Dict[str, bool]:
+        """Restart components (dependents first down, dependencies first up)"""
+        # Keep the supervisor from treating the planned outage as a failure
+        supervisor = self.supervisor
+        if supervisor:
+            supervisor.hold(names)
+        try:
+            await self.stop_components(names)
+            return await self.start_components(names)
+        finally:
+            if supervisor:
+                supervisor.release(names)
+    
     async def start_all(self):
-        """Start all components in order"""
+        """Start all components not already running, independent ones in parallel"""
         logger.info("🚀 Starting Satyug Universe...")
+        started = time.monotonic()
         
-        for component_name in self.startup_order:
-            component = self.components[component_name]
-            await component.start()
-            await asyncio.sleep(2)  # Wait between starts
+        adopted = await self.reconcile()
+        pending = [name for name in self.components if name not in adopted]
+        results = await self.start_components(pending) if pending else {}
+        results.update({name: True for name in adopted})
         
-        logger.info("✅ All components started!")
+        elapsed = time.monotonic() - started
+        if all(results.values()):
+            logger.info(f"✅ All components started in {elapsed:.1f}s!")
+        else:
+            failed = [name for name, ok in results.items() if not ok]
+            logger.warning(f"⚠️ Started in {elapsed:.1f}s with failures: {', '.join(failed)}")
         await self.print_status()
     
+    async def stop_components(self, names: List[str]):
+        """
+        Stop components concurrently in reverse dependency order
+        
+        A component is stopped only after everything among `names` that
+        depends on it has stopped.
+        """
+        loop = asyncio.get_running_loop()
+        stopped = {name: loop.create_future() for name in names}
+        
+        async def run(name: str):
+            dependents = [other for other in names if name in self.dependencies[other]]
+            await asyncio.gather(*(stopped[other] for other in dependents))
+            try:
+                await self.components[name].stop()
+            except Exception as e:
+                logger.error(f"❌ Failed to stop {name}: {e}")
+            stopped[name].set_result(True)
+        
+        await asyncio.gather(*(run(name) for name in reversed(self.startup_order) if name in names))
+    
     async def stop_all(self):
-        """Stop all components"""
+        """Stop all components, including ones left running by an earlier orchestrator"""
         logger.info("🛑 Stopping all components...")
         
-        for component_name in reversed(self.startup_order):
-            component = self.components[component_name]
-            await component.stop()
+        # Children outlive the orchestrator; adopt them so they can be stopped
+        await self.reconcile()
+        await self.stop_components(list(self.components))
         
         logger.info("✅ All components stopped!")
     
@@ -438,21 +1352,202 @@ class MrHappyOrchestrator:
         await asyncio.sleep(5)
         await self.start_all()
     
-    async def health_check_all(self) -> Dict[str, bool]:
-        """Check health of all components"""
+    async def health_check_all(self, use_cache: bool = False) -> Dict[str, bool]:
+        """Check health of all components (concurrently)"""
+        report = await self.health.check_all(use_cache)
         results = {}
         
-        for name, component in self.components.items():
-            is_healthy = await component.health_check()
-            results[name] = is_healthy
+        for name, result in report.items():
+            component = self.components[name]
+            results[name] = result.healthy
             
-            if is_healthy:
-                logger.info(f"✅ {component.name}: Healthy")
+            if result.healthy:
+                logger.info(f"✅ {component.name}: Healthy ({result.latency_ms:.0f}ms)")
             else:
-                logger.warning(f"⚠️ {component.name}: Unhealthy")
+                reason = f": {result.error}" if result.error else ""
+                logger.warning(f"⚠️ {component.name}: Unhealthy ({result.latency_ms:.0f}ms){reason}")
         
         return results
     
+    async def health_report(self, use_cache: bool = True) -> Dict[str, Dict[str, Any]]:
+        """Health of all components with per-check latency (cached for a few seconds)"""
+        report = await self.health.check_all(use_cache)
+        return {name: result.to_dict() for name, result in report.items()}
+    
+    async def container_states(self) -> Dict[str, Dict[str, str]]:
+        """Container state per compose component, in one Engine API call"""
+        if not self.engine:
+            return {}
+        states = await self.engine.service_states(list(self.service_components))
+        report: Dict[str, Dict[str, str]] = {}
+        for label, state in states.items():
+            report.setdefault(self.service_components[label], {})[label] = state
+        return report
+    
+    async def watch_containers(self):
+        """Follow Docker events and keep component status current (no polling)"""
+        backoff = 1
+        while True:
+            try:
+                async for event in self.engine.events():
+                    backoff = 1
+                    self._on_container_event(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Docker events stream error: {e}")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+    
+    def _on_container_event(self, event: Dict[str, Any]):
+        name = self.service_components.get(event.get("service"))
+        if not name:
+            return
+        component = self.components[name]
+        action = event["action"]
+        
+        if action == "start":
+            component.container_ids[event["service"]] = event["id"]
+            self._persist(name)
+            component.status = "running"
+        elif action == "die":
+            component.status = "exited"
+            logger.warning(f"💥 {component.name}: {event['service']} exited (code {event.get('exit_code')})")
+        elif action == "stop":
+            component.status = "stopped"
+        elif action == "health_status: unhealthy":
+            component.status = "unhealthy"
+        elif action == "health_status: healthy":
+            component.status = "running"
+        else:
+            return
+        
+        # Cached health no longer reflects the container
+        self.health.results.pop(name, None)
+        if self.supervisor and component.status in ("exited", "unhealthy"):
+            self.supervisor.signal(name)
+    
+    async def _list_containers(self) -> Optional[Dict[str, Dict[str, str]]]:
+        """Satyug containers by label ({"id", "state"}) in one call"""
+        try:
+            if self.engine:
+                return {
+                    c["Labels"][SERVICE_LABEL]: {"id": c["Id"], "state": c.get("State", "unknown")}
+                    for c in await self.engine.containers()
+                }
+            result = await self.runner.run([
+                "docker", "ps", "--all", "--no-trunc",
+                "--filter", f"label={SERVICE_LABEL}",
+                "--format", f'{{{{.ID}}}}\t{{{{.State}}}}\t{{{{.Label "{SERVICE_LABEL}"}}}}'
+            ], timeout=15)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not list containers: {e}")
+            return None
+        containers = {}
+        for line in result.stdout.splitlines():
+            container_id, state, label = (line.split("\t") + ["", ""])[:3]
+            if label:
+                containers[label] = {"id": container_id, "state": state}
+        return containers
+    
+    async def reconcile(self) -> List[str]:
+        """
+        Adopt components that are already running (warm restart)
+        
+        Uses the state saved by the previous orchestrator: child processes
+        are re-attached by PID, compose components are matched against one
+        container listing, anything else is health checked. Components
+        that were up but are gone become "exited", so a supervisor
+        restarts them. Nothing is started or stopped.
+        
+        Returns:
+            Components found running
+        """
+        started = time.monotonic()
+        records = self.state.load()
+        containers = await self._list_containers()
+        session = await self.health.session()
+        
+        names = list(self.components)
+        results = await asyncio.gather(
+            *(self.components[name].reconcile(records.get(name), containers, session) for name in names),
+            return_exceptions=True
+        )
+        
+        adopted = []
+        for name, running in zip(names, results):
+            component = self.components[name]
+            record = records.get(name)
+            if isinstance(running, Exception):
+                logger.warning(f"⚠️ Could not reconcile {component.name}: {running}")
+                running = False
+            if running:
+                component.status = "running"
+                adopted.append(name)
+            elif component.status == "running" or (record and record.status != "stopped"):
+                # Meant to be up but gone; the supervisor restarts it
+                component.status = "exited"
+            self._persist(name)
+        
+        logger.info(f"♻️ Reconciled in {(time.monotonic() - started) * 1000:.0f}ms; "
+                    f"already running: {', '.join(adopted) or 'none'}")
+        return adopted
+    
+    def _persist(self, name: str):
+        component = self.components[name]
+        self.state.save(ComponentRecord(
+            name=name,
+            status=component.status,
+            pid=component.pid,
+            container_ids=dict(getattr(component, 'container_ids', {})),
+            pid_start_time=getattr(component, 'pid_start_time', None)
+        ))
+    
+    def _status_changed(self, name: str, previous: str, status: str):
+        self._persist(name)
+        self._publish({"type": "status", "component": name, "previous": previous, "status": status})
+    
+    def subscribe(self) -> asyncio.Queue:
+        """Queue receiving every state-change event until unsubscribed"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+        self.subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+    
+    def _publish(self, event: Dict[str, Any]):
+        event["time"] = datetime.now().isoformat()
+        for queue in list(self.subscribers):
+            if queue.full():
+                # Slow client: drop its oldest event rather than buffer without bound
+                queue.get_nowait()
+            queue.put_nowait(event)
+    
+    def status_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every component, from memory only"""
+        supervision = self.supervisor.report() if self.supervisor else {}
+        snapshot = {}
+        for name, component in self.components.items():
+            health = self.health.results.get(name)
+            snapshot[name] = {
+                "name": component.name,
+                "status": component.status,
+                "since": datetime.fromtimestamp(component.status_since).isoformat(),
+                "depends_on": self.dependencies[name],
+                "startup_s": self.startup_durations.get(name),
+                "health": health.to_dict() if health else None,
+                "supervision": supervision.get(name)
+            }
+        return snapshot
+    
+    def tail(self, name: str, lines: int = 50, stream: Optional[str] = None) -> List[str]:
+        """Recent output of a component run as a child process"""
+        component = self.components[name]
+        if not isinstance(component, ProcessComponent):
+            return []
+        return component.tail(lines, stream)
+    
     async def print_status(self):
         """Print status of all components"""
         logger.info("\n" + "="*60)
@@ -465,24 +1560,46 @@ class MrHappyOrchestrator:
         
         logger.info("="*60 + "\n")
     
-    async def monitor(self, interval: int = 60):
-        """Monitor all components continuously"""
+    async def monitor(self, interval: int = 15):
+        """
+        Supervise all components continuously
+        
+        Args:
+            interval: Seconds between full health sweeps (process exits and
+                container events are handled immediately)
+        """
         logger.info(f"👁️ Starting monitoring (interval: {interval}s)")
         
-        while True:
-            await asyncio.sleep(interval)
-            health = await self.health_check_all()
-            
-            # Restart unhealthy components
-            for name, is_healthy in health.items():
-                if not is_healthy:
-                    logger.warning(f"⚠️ {name} is unhealthy, restarting...")
-                    component = self.components[name]
-                    await component.stop()
-                    await asyncio.sleep(2)
-                    await component.start()
-    
-    def run_interactive(self):
+        self.supervisor = Supervisor(self, check_interval=interval)
+        try:
+            await self.supervisor.run()
+        finally:
+            self.supervisor = None
+    
+    async def run_daemon(self, interval: int = 15):
+        """
+        Run as a long-lived service
+        
+        Starts everything, then supervises while serving the control API
+        until cancelled (SIGTERM/SIGINT).
+        """
+        api = OrchestratorAPI(self)
+        await api.start()
+        
+        loop = asyncio.get_running_loop()
+        daemon = asyncio.current_task()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, daemon.cancel)
+        
+        try:
+            await self.start_all()
+            await self.monitor(interval)
+        except asyncio.CancelledError:
+            logger.info("👋 Shutting down...")
+        finally:
+            await api.stop()
+    
+    async def run_interactive(self):
         """Run interactive menu"""
         while True:
             print("\n" + "="*60)
@@ -497,52 +1614,79 @@ class MrHappyOrchestrator:
             print("7. Exit")
             print("="*60)
             
-            choice = input("\nEnter your choice (1-7): ").strip()
+            # Read input off the loop so child output keeps being pumped
+            choice = (await asyncio.to_thread(input, "\nEnter your choice (1-7): ")).strip()
             
             if choice == "1":
-                asyncio.run(self.start_all())
+                await self.start_all()
             elif choice == "2":
-                asyncio.run(self.stop_all())
+                await self.stop_all()
             elif choice == "3":
-                asyncio.run(self.restart_all())
+                await self.restart_all()
             elif choice == "4":
-                asyncio.run(self.health_check_all())
+                await self.health_check_all()
             elif choice == "5":
-                asyncio.run(self.print_status())
+                await self.print_status()
             elif choice == "6":
-                interval = input("Enter monitoring interval in seconds (default: 60): ").strip()
-                interval = int(interval) if interval.isdigit() else 60
-                asyncio.run(self.monitor(interval))
+                interval = (await asyncio.to_thread(input, "Enter monitoring interval in seconds (default: 15): ")).strip()
+                interval = int(interval) if interval.isdigit() else 15
+                print("Press Ctrl+C to return to the menu")
+                await self.reconcile()
+                await self._until_interrupted(self.monitor(interval))
             elif choice == "7":
                 logger.info("👋 Goodbye!")
                 break
             else:
                 print("❌ Invalid choice!")
+    
+    async def _until_interrupted(self, coroutine):
+        """Run until done or Ctrl+C"""
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(coroutine)
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            loop.remove_signal_handler(signal.SIGINT)
 
 async def main():
     """Main entry point"""
     orchestrator = MrHappyOrchestrator()
     
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
-        
-        if command == "start":
-            await orchestrator.start_all()
-        elif command == "stop":
-            await orchestrator.stop_all()
-        elif command == "restart":
-            await orchestrator.restart_all()
-        elif command == "status":
-            await orchestrator.print_status()
-        elif command == "health":
-            await orchestrator.health_check_all()
-        elif command == "monitor":
-            await orchestrator.monitor()
+    try:
+        if len(sys.argv) > 1:
+            command = sys.argv[1]
+            
+            if command == "start":
+                await orchestrator.start_all()
+            elif command == "stop":
+                await orchestrator.stop_all()
+            elif command == "restart":
+                await orchestrator.restart_all()
+            elif command == "status":
+                await orchestrator.reconcile()
+                await orchestrator.print_status()
+            elif command == "health":
+                await orchestrator.health_check_all()
+            elif command == "monitor":
+                # Pick up what is already running; nothing is supervised otherwise
+                await orchestrator.reconcile()
+                await orchestrator.monitor()
+            elif command == "daemon":
+                await orchestrator.run_daemon()
+            else:
+                print(f"Unknown command: {command}")
+                print("Usage: python mr_happy_orchestrator.py [start|stop|restart|status|health|monitor|daemon]")
         else:
-            print(f"Unknown command: {command}")
-            print("Usage: python mr_happy_orchestrator.py [start|stop|restart|status|health|monitor]")
-    else:
-        orchestrator.run_interactive()
+            await orchestrator.run_interactive()
+    finally:
+        await orchestrator.runner.close()
+        await orchestrator.health.close()
+        if orchestrator.engine:
+            await orchestrator.engine.close()
+        orchestrator.state.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Orchestrator Control API for Satyug Universe
+HTTP (and optionally Unix socket) control, status, event stream and
+Prometheus metrics for a long-running MrHappyOrchestrator
+"""
+
+import os
+import json
+import asyncio
+from typing import Dict, List, Optional
+import logging
+
+from aiohttp import web
+
+logger = logging.getLogger('OrchestratorAPI')
+
+DEFAULT_PORT = 8795
+
+class OrchestratorAPI:
+    """
+    Control plane for the orchestrator daemon
+
+    Endpoints:
+    - GET  /status                  component state from memory (no probing)
+    - GET  /health                  health checks (cached for a few seconds)
+    - GET  /events                  state changes as Server-Sent Events
+    - GET  /metrics                 Prometheus text format
+    - GET  /components/{name}/logs  recent output of a child process
+    - POST /start, /stop, /restart  all components
+    - POST /components/{name}/{start|stop|restart}
+
+    Actions run in the background and answer 202 at once (the outcome
+    arrives on /events); add `?wait=1` to get the result in the response.
+    Set ORCHESTRATOR_API_TOKEN to require `Authorization: Bearer <token>`.
+    """
+
+    def __init__(self, orchestrator, host: Optional[str] = None, port: Optional[int] = None,
+                 socket_path: Optional[str] = None, token: Optional[str] = None):
+        """
+        Args:
+            orchestrator: MrHappyOrchestrator to control
+            host: Interface to bind (default: ORCHESTRATOR_API_BIND env or 127.0.0.1)
+            port: TCP port (default: ORCHESTRATOR_API_PORT env or 8795; 0 disables TCP)
+            socket_path: Unix socket to serve on as well (default: ORCHESTRATOR_API_SOCKET env)
+            token: Bearer token required on every request (default: ORCHESTRATOR_API_TOKEN env)
+        """
+        self.orchestrator = orchestrator
+        self.host = host or os.getenv('ORCHESTRATOR_API_BIND', '127.0.0.1')
+        self.port = port if port is not None else int(os.getenv('ORCHESTRATOR_API_PORT', DEFAULT_PORT))
+        self.socket_path = socket_path or os.getenv('ORCHESTRATOR_API_SOCKET')
+        self.token = token or os.getenv('ORCHESTRATOR_API_TOKEN')
+
+        self.app = web.Application(middlewares=[self._authenticate])
+        self.app.router.add_get('/status', self._handle_status)
+        self.app.router.add_get('/health', self._handle_health)
+        self.app.router.add_get('/events', self._handle_events)
+        self.app.router.add_get('/metrics', self._handle_metrics)
+        self.app.router.add_get('/components/{name}/logs', self._handle_logs)
+        self.app.router.add_post('/{action:start|stop|restart}', self._handle_action)
+        self.app.router.add_post('/components/{name}/{action:start|stop|restart}', self._handle_action)
+
+        self.runner: Optional[web.AppRunner] = None
+        self._actions: set = set()
+
+    async def start(self):
+        """Start serving"""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        if self.port:
+            await web.TCPSite(self.runner, self.host, self.port).start()
+            logger.info(f"🎛️ Orchestrator API on http://{self.host}:{self.port}")
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            await web.UnixSite(self.runner, self.socket_path).start()
+            logger.info(f"🎛️ Orchestrator API on unix:{self.socket_path}")
+
+    async def stop(self):
+        """Stop serving; running actions are left to finish"""
+        if self.runner:
+            await self.runner.cleanup()
+
+    @web.middleware
+    async def _authenticate(self, request: web.Request, handler):
+        if self.token and request.headers.get('Authorization') != f"Bearer {self.token}":
+            raise web.HTTPUnauthorized()
+        return await handler(request)
+
+    def _components(self, request: web.Request) -> List[str]:
+        name = request.match_info.get('name')
+        if name is None:
+            return list(self.orchestrator.components)
+        if name not in self.orchestrator.components:
+            raise web.HTTPNotFound(text=f"Unknown component: {name}")
+        return [name]
+
+    async def _handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.orchestrator.status_snapshot())
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        use_cache = request.query.get('fresh') not in ('1', 'true')
+        return web.json_response(await self.orchestrator.health_report(use_cache))
+
+    async def _handle_logs(self, request: web.Request) -> web.Response:
+        name = self._components(request)[0]
+        try:
+            lines = int(request.query.get('lines', 50))
+        except ValueError:
+            raise web.HTTPBadRequest(text="lines must be an integer")
+        return web.json_response(self.orchestrator.tail(name, lines, request.query.get('stream')))
+
+    async def _handle_action(self, request: web.Request) -> web.Response:
+        names = self._components(request)
+        action = request.match_info['action']
+        if action == "start":
+            coroutine = self.orchestrator.start_components(names)
+        elif action == "stop":
+            coroutine = self.orchestrator.stop_components(names)
+        else:
+            coroutine = self.orchestrator.restart_components(names)
+
+        task = asyncio.create_task(coroutine)
+        self._actions.add(task)
+        task.add_done_callback(self._actions.discard)
+
+        if request.query.get('wait') not in ('1', 'true'):
+            return web.json_response({"action": action, "components": names}, status=202)
+        results = await asyncio.shield(task)
+        return web.json_response({"action": action, "components": names, "results": results})
+
+    async def _handle_events(self, request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache"
+        })
+        await response.prepare(request)
+
+        queue = self.orchestrator.subscribe()
+        try:
+            # Current state first, so clients need no separate /status call
+            await response.write(self._sse("snapshot", self.orchestrator.status_snapshot()))
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), 15)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+                    continue
+                await response.write(self._sse(event["type"], event))
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self.orchestrator.unsubscribe(queue)
+        return response
+
+    @staticmethod
+    def _sse(event: str, data) -> bytes:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8')
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=render_metrics(self.orchestrator),
+                            content_type="text/plain", charset="utf-8",
+                            headers={"X-Content-Type-Options": "nosniff"})
+
+def _labels(**labels: str) -> str:
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+def render_metrics(orchestrator) -> str:
+    """Orchestrator state in the Prometheus text exposition format"""
+    lines: List[str] = []
+
+    def metric(name: str, kind: str, help_text: str, samples: Dict[str, float]):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples.items():
+            lines.append(f"{name}{labels} {value}")
+
+    components = orchestrator.components
+    metric("satyug_component_up", "gauge", "1 if the component is running",
+           {_labels(component=name): int(c.status == "running") for name, c in components.items()})
+    metric("satyug_component_startup_seconds", "gauge", "Time from start to ready on the last start",
+           {_labels(component=name): round(seconds, 3)
+            for name, seconds in orchestrator.startup_durations.items()})
+
+    if orchestrator.supervisor:
+        report = orchestrator.supervisor.report()
+        metric("satyug_component_restarts_total", "counter", "Restarts by the supervisor",
+               {_labels(component=name): state["restarts"] for name, state in report.items()})
+        metric("satyug_component_circuit_open", "gauge", "1 if restarts are suspended by the circuit breaker",
+               {_labels(component=name): int(state["circuit_open"]) for name, state in report.items()})
+
+    health = orchestrator.health
+    metric("satyug_component_healthy", "gauge", "Result of the last health check",
+           {_labels(component=name): int(result.healthy) for name, result in health.results.items()})
+
+    lines.append("# HELP satyug_health_check_duration_seconds Health check latency")
+    lines.append("# TYPE satyug_health_check_duration_seconds histogram")
+    for name, counts in health.latency_counts.items():
+        cumulative = 0
+        for bound, count in zip(health.latency_buckets, counts):
+            cumulative += count
+            lines.append(f"satyug_health_check_duration_seconds_bucket{_labels(component=name, le=str(bound))} {cumulative}")
+        total = cumulative + counts[-1]
+        lines.append(f"satyug_health_check_duration_seconds_bucket{_labels(component=name, le='+Inf')} {total}")
+        lines.append(f"satyug_health_check_duration_seconds_sum{_labels(component=name)} {health.latency_sums[name]:.6f}")
+        lines.append(f"satyug_health_check_duration_seconds_count{_labels(component=name)} {total}")
+
+    return "\n".join(lines) + "\n"
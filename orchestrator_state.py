@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Persistent Orchestrator State for Satyug Universe
+Remembers component status, PIDs and container ids across orchestrator
+restarts so a new orchestrator can adopt what is already running
+"""
+
+import os
+import json
+import time
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger('OrchestratorState')
+
+DEFAULT_STATE_PATH = "~/.satyug/orchestrator.db"
+
+@dataclass
+class ComponentRecord:
+    """Last known state of one component"""
+    name: str
+    status: str = "stopped"
+    pid: Optional[int] = None
+    container_ids: Dict[str, str] = field(default_factory=dict)
+    updated_at: float = 0.0
+    # Start time of `pid` (clock ticks after boot), to tell a reused PID apart
+    pid_start_time: Optional[int] = None
+
+class StateStore:
+    """
+    SQLite-backed component state
+
+    One row per component, written whenever its status changes. The
+    database runs in WAL mode with relaxed fsync, so a write costs well
+    under a millisecond; losing the last change to a power cut only means
+    one extra check at the next boot. If the database cannot be opened
+    the store logs once and does nothing.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: Database file (default: ORCHESTRATOR_STATE_DB env or ~/.satyug/orchestrator.db)
+        """
+        self.path = os.path.expanduser(path or os.getenv('ORCHESTRATOR_STATE_DB', DEFAULT_STATE_PATH))
+        self._db: Optional[sqlite3.Connection] = None
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS components (
+                    name TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    pid INTEGER,
+                    container_ids TEXT NOT NULL DEFAULT '{}',
+                    updated_at REAL NOT NULL,
+                    pid_start_time INTEGER
+                )
+            """)
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(components)")}
+            if "pid_start_time" not in columns:
+                self._db.execute("ALTER TABLE components ADD COLUMN pid_start_time INTEGER")
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"⚠️ State store disabled ({self.path}): {e}")
+            self._db = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def load(self) -> Dict[str, ComponentRecord]:
+        """Every saved component"""
+        if not self._db:
+            return {}
+        rows = self._db.execute(
+            "SELECT name, status, pid, container_ids, updated_at, pid_start_time FROM components"
+        )
+        return {
+            name: ComponentRecord(name, status, pid, json.loads(container_ids), updated_at, pid_start_time)
+            for name, status, pid, container_ids, updated_at, pid_start_time in rows
+        }
+
+    def save(self, record: ComponentRecord):
+        """Insert or replace one component"""
+        if not self._db:
+            return
+        record.updated_at = time.time()
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO components "
+                "(name, status, pid, container_ids, updated_at, pid_start_time) VALUES (?, ?, ?, ?, ?, ?)",
+                (record.name, record.status, record.pid, json.dumps(record.container_ids),
+                 record.updated_at, record.pid_start_time)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"❌ Failed to save state of {record.name}: {e}")
+
+    def close(self):
+        if self._db:
+            self._db.close()
+            self._db = None
@@ -4,27 +4,13 @@ Simple HTTP Server for Axzora Super App Frontend
 Serves the frontend files with proper CORS headers for local development
 """
 
-import http.server
-import socketserver
 import webbrowser
 import threading
 import time
 import os
 import sys
 
-class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def end_headers(self):
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', '*')
-        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
-
-    def do_OPTIONS(self):
-        self.send_response(200)
-        self.end_headers()
+from static_server import create_server, find_port
 
 def open_browser(port):
     """Open the default web browser after a short delay"""
@@ -35,20 +21,16 @@ def open_browser(port):
     webbrowser.open(url)
 
 def main():
-    PORT = 8000
+    # Production mode: browsers cache and revalidate instead of re-downloading
+    production = "--production" in sys.argv
     
     # Try to find an available port
-    for port in range(8000, 8010):
-        try:
-            with socketserver.TCPServer(("0.0.0.0", port), CORSHTTPRequestHandler) as httpd:
-                PORT = port
-                break
-        except OSError:
-            continue
+    PORT = find_port(8000, 8010)
     
     print("🚀 Starting Axzora Super App Local Server...")
     print(f"📁 Serving from: {os.getcwd()}")
     print(f"🌍 Server running at: http://localhost:{PORT}")
+    print(f"⚡ Mode: {'production (cached, precompressed)' if production else 'development (no caching)'}")
     print(f"📱 Access from mobile: http://{get_local_ip()}:{PORT}")
     print("\n" + "="*60)
     print("🎉 AXZORA SUPER APP - LOCAL DEVELOPMENT SERVER")
@@ -79,7 +61,7 @@ def main():
     
     try:
         # Start the server (bind to all interfaces for public access)
-        with socketserver.TCPServer(("0.0.0.0", PORT), CORSHTTPRequestHandler) as httpd:
+        with create_server(PORT, production=production) as httpd:
             print(f"\n✅ Server is now running and accessible!")
             httpd.serve_forever()
     except KeyboardInterrupt:
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Static File Server for Axzora Super App Frontend
+Threaded keep-alive HTTP server with cache validation and zero-copy file
+responses, used by server.py and simple-server.py (here and in frontend/)
+
+Compare it with the old single-threaded server:
+
+    python static_server.py --load-test [seconds] [clients]
+
+Report the transfer size saved by precompression:
+
+    python static_server.py --compression-report
+"""
+
+import io
+import os
+import re
+import sys
+import gzip
+import time
+import socket
+import threading
+import http.client
+import http.server
+import socketserver
+import multiprocessing
+from functools import partial
+from email.utils import parsedate_to_datetime
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Asset names carrying a content hash, e.g. main-app.3f9a1c2e.js
+HASHED_ASSET = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# ============================================
+# Precompressed assets
+# ============================================
+
+@dataclass
+class CompressedAsset:
+    """Compressed variants of one file, valid for one version of it"""
+    mtime_ns: int
+    size: int
+    # Content-Encoding -> body
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+class AssetCache:
+    """
+    In-memory gzip and brotli copies of the frontend's text assets
+
+    Everything is compressed once, at maximum level, by a background
+    thread that then polls for changes and recompresses only the files
+    that changed. Requests never compress: they get a cached variant when
+    it matches the file on disk, and the file itself otherwise. Brotli is
+    used when the `brotli` package is installed.
+    """
+
+    extensions = {'.html', '.js', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.webmanifest'}
+    skip_dirs = {'.git', 'node_modules', '__pycache__'}
+    min_size = 1024
+    max_size = 8 * 1024 * 1024
+
+    def __init__(self, directory: Optional[str] = None, interval: float = 1.0,
+                 gzip_level: int = 9, brotli_quality: int = 11):
+        self.directory = os.path.realpath(directory or os.getcwd())
+        self.interval = interval
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.assets: Dict[str, CompressedAsset] = {}
+        self.ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Compress everything and keep watching, in a background thread"""
+        self._thread = threading.Thread(target=self._watch, name="asset-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def compress(self, data: bytes) -> Dict[str, bytes]:
+        variants = {"gzip": gzip.compress(data, self.gzip_level, mtime=0)}
+        if BROTLI_AVAILABLE:
+            variants["br"] = brotli.compress(data, quality=self.brotli_quality)
+        # Keep only variants that are actually smaller
+        return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+    def _candidates(self) -> Dict[str, os.stat_result]:
+        found = {}
+        for root, dirs, files in os.walk(self.directory):
+            dirs[:] = [d for d in dirs if d not in self.skip_dirs and not d.startswith('.')]
+            for name in files:
+                if os.path.splitext(name)[1].lower() not in self.extensions:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if self.min_size <= st.st_size <= self.max_size:
+                    found[path] = st
+        return found
+
+    def scan(self) -> int:
+        """
+        Bring the cache in line with the directory
+
+        Returns:
+            Number of files (re)compressed
+        """
+        candidates = self._candidates()
+        changed = 0
+        for path, st in candidates.items():
+            asset = self.assets.get(path)
+            if asset and asset.mtime_ns == st.st_mtime_ns and asset.size == st.st_size:
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            # Stamp with the stat taken before reading; a write racing the
+            # read shows up as a mismatch and is picked up next scan
+            self.assets[path] = CompressedAsset(st.st_mtime_ns, st.st_size, self.compress(data))
+            changed += 1
+        for path in set(self.assets) - set(candidates):
+            del self.assets[path]
+        return changed
+
+    def _watch(self):
+        started = time.monotonic()
+        count = self.scan()
+        self.ready.set()
+        print(f"Precompressed {count} assets in {time.monotonic() - started:.1f}s "
+              f"(gzip{', brotli' if BROTLI_AVAILABLE else ''})")
+        while not self._stopped.wait(self.interval):
+            try:
+                changed = self.scan()
+            except Exception as e:
+                print(f"Asset scan failed: {e}")
+                continue
+            if changed:
+                print(f"Recompressed {changed} changed assets")
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[CompressedAsset]:
+        """Cached variants of `path`, if they match its current stat"""
+        asset = self.assets.get(path)
+        if asset and asset.mtime_ns == st.st_mtime_ns and asset.size == st.st_size:
+            return asset
+        return None
+
+    def totals(self) -> Dict[str, int]:
+        """Bytes over all cached files: on disk, and sent per coding"""
+        totals = {"files": len(self.assets), "identity": 0, "gzip": 0, "br": 0}
+        for asset in list(self.assets.values()):
+            totals["identity"] += asset.size
+            for encoding in ("gzip", "br"):
+                totals[encoding] += len(asset.variants.get(encoding, b"")) or asset.size
+        return totals
+
+def negotiate(accept_encoding: Optional[str], available) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header
+
+    Prefers br over gzip; codings with q=0 are refused.
+    """
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    for coding in ("br", "gzip"):
+        if coding in available and accepted.get(coding, accepted.get('*', 0.0)) > 0:
+            return coding
+    return None
+
+class CORSHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """
+    Static files with CORS headers
+
+    Development mode (default) keeps telling browsers not to cache
+    anything. Production mode sends ETag and Last-Modified and answers
+    conditional requests with 304; hashed file names and `?v=` versioned
+    URLs are cached for a year as immutable, everything else is
+    revalidated on each load.
+
+    Connections are kept alive (HTTP/1.1) and file bodies go out with
+    sendfile, straight from the page cache to the socket.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Close idle keep-alive connections (one thread each) after this long
+    timeout = 60
+    # Headers and the sendfile body are separate writes; without this,
+    # Nagle plus delayed ACKs stalls every keep-alive response
+    disable_nagle_algorithm = True
+    production = False
+    # Set by create_server in production mode
+    assets: Optional[AssetCache] = None
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        if not self.production:
+            self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+            self.send_header('Pragma', 'no-cache')
+            self.send_header('Expires', '0')
+        super().end_headers()
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def cache_control(self) -> str:
+        url = urlsplit(self.path)
+        if HASHED_ASSET.search(url.path) or re.search(r"(^|&)v=", url.query):
+            return IMMUTABLE
+        return "no-cache"
+
+    def not_modified(self, etag: str, mtime: float) -> bool:
+        """Whether the client's cached copy is current"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f"W/{etag}" in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+        return False
+
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if not self.production or os.path.isdir(path) or urlsplit(self.path).path.endswith('/'):
+            return super().send_head()
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(http.HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            st = os.fstat(f.fileno())
+            etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+            asset = self.assets.lookup(os.path.realpath(path), st) if self.assets else None
+            encoding = negotiate(self.headers.get('Accept-Encoding'), asset.variants) if asset else None
+            if encoding:
+                # Each representation needs its own validator
+                etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}-{encoding}"'
+
+            if self.not_modified(etag, st.st_mtime):
+                f.close()
+                self.send_response(http.HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", self.cache_control())
+                if asset:
+                    self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return None
+
+            self.send_response(http.HTTPStatus.OK)
+            self.send_header("Content-Type", self.guess_type(path))
+            if encoding:
+                body = asset.variants[encoding]
+                f.close()
+                f = io.BytesIO(body)
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+            else:
+                self.send_header("Content-Length", str(st.st_size))
+            if asset:
+                self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Last-Modified", self.date_time_string(st.st_mtime))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", self.cache_control())
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def copyfile(self, source, outputfile):
+        # Zero-copy for real files; socket.sendfile falls back to plain
+        # sends for in-memory bodies such as directory listings
+        self.connection.sendfile(source)
+
+def create_server(port: int, directory: Optional[str] = None, production: bool = False,
+                  host: str = "0.0.0.0") -> http.server.ThreadingHTTPServer:
+    """
+    Threaded server for the frontend
+
+    Args:
+        port: Port to listen on
+        directory: Directory to serve (default: current directory)
+        production: Enable cache validation, long-lived caching and
+            precompressed (gzip/brotli) responses
+        host: Interface to bind
+    """
+    assets = None
+    if production:
+        assets = AssetCache(directory)
+        assets.start()
+    handler = type("Handler", (CORSHTTPRequestHandler,), {"production": production, "assets": assets})
+    server = http.server.ThreadingHTTPServer((host, port), partial(handler, directory=directory))
+    server.assets = assets
+    return server
+
+def find_port(start: int = 8000, end: int = 8010, host: str = "0.0.0.0") -> int:
+    """First port in [start, end) that can be bound (start if none)"""
+    for port in range(start, end):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as probe:
+            probe.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                probe.bind((host, port))
+                return port
+            except OSError:
+                continue
+    return start
+
+# ============================================
+# Load test
+# ============================================
+
+class _QuietLegacyHandler(http.server.SimpleHTTPRequestHandler):
+    """The old server.py handler (HTTP/1.0, no caching), without request logs"""
+
+    def end_headers(self):
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-cache, no-store, must-revalidate')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def _serve(kind: str, port: int, directory: str):
+    if kind == "legacy":
+        server = socketserver.TCPServer(("127.0.0.1", port), partial(_QuietLegacyHandler, directory=directory))
+    else:
+        server = create_server(port, directory, production=True, host="127.0.0.1")
+        server.RequestHandlerClass.func.log_message = lambda *args: None
+    server.serve_forever()
+
+def _client(port: int, paths: list, deadline: float, revalidate: bool, counts, index: int):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    etags = {}
+    done = 0
+    while time.monotonic() < deadline:
+        path = paths[done % len(paths)]
+        headers = {"If-None-Match": etags[path]} if revalidate and path in etags else {}
+        try:
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            continue
+        if response.getheader("ETag"):
+            etags[path] = response.getheader("ETag")
+        if response.will_close:
+            conn.close()
+        done += 1
+    counts[index] = done
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+def _measure(kind: str, directory: str, paths: list, duration: float, clients: int,
+             revalidate: bool = False) -> float:
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(kind, port, directory), daemon=True)
+    server.start()
+    try:
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+        # Clients in their own processes so they are not the bottleneck
+        counts = multiprocessing.Array('i', clients)
+        deadline = time.monotonic() + duration
+        workers = [
+            multiprocessing.Process(target=_client, args=(port, paths, deadline, revalidate, counts, i))
+            for i in range(clients)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return sum(counts) / duration
+    finally:
+        server.terminate()
+        server.join()
+
+def load_test(directory: Optional[str] = None, duration: float = 5, clients: int = 16):
+    """Requests/sec of the old and the new server on the app's own files"""
+    directory = directory or os.getcwd()
+    paths = ["/" + name for name in ("index.html", "styles.css", "config.js", "js/main-app.js",
+                                     "js/blockchain-interface.js")
+             if os.path.isfile(os.path.join(directory, name))] or ["/"]
+
+    print(f"Load test: {clients} clients x {duration:.0f}s over {len(paths)} files in {directory}")
+    legacy = _measure("legacy", directory, paths, duration, clients)
+    print(f"  single-threaded TCPServer, HTTP/1.0:   {legacy:8.0f} req/s")
+    threaded = _measure("threaded", directory, paths, duration, clients)
+    print(f"  threaded, keep-alive, sendfile:        {threaded:8.0f} req/s ({threaded / legacy:.1f}x)")
+    cached = _measure("threaded", directory, paths, duration, clients, revalidate=True)
+    print(f"  threaded, ETag revalidation (304s):    {cached:8.0f} req/s ({cached / legacy:.1f}x)")
+
+def compression_report(directory: Optional[str] = None):
+    """Transfer size of the app with and without precompression"""
+    cache = AssetCache(directory)
+    started = time.monotonic()
+    cache.scan()
+    elapsed = time.monotonic() - started
+    totals = cache.totals()
+
+    def line(label: str, size: int):
+        print(f"  {label:<10} {size / 1024:8.0f} KB ({size / max(totals['identity'], 1):.0%})")
+
+    print(f"{totals['files']} assets in {cache.directory}, compressed in {elapsed:.1f}s")
+    line("identity", totals["identity"])
+    line("gzip", totals["gzip"])
+    if BROTLI_AVAILABLE:
+        line("brotli", totals["br"])
+    else:
+        print("  brotli     not available (pip install Brotli)")
+
+    # What the first load of the app actually fetches from this server
+    index = os.path.join(cache.directory, "index.html")
+    if os.path.isfile(index):
+        with open(index, encoding='utf-8', errors='replace') as f:
+            refs = re.findall(r'(?:src|href)="(?!https?:|//|#|data:)([^"?#]+)', f.read())
+        first_load = {index} | {os.path.join(cache.directory, ref) for ref in refs}
+        first_load = [path for path in first_load if os.path.isfile(path)]
+        identity = sum(os.path.getsize(path) for path in first_load)
+        best = sum(min([len(v) for v in cache.assets[path].variants.values()] or [os.path.getsize(path)])
+                   if path in cache.assets else os.path.getsize(path) for path in first_load)
+        print(f"First load ({len(first_load)} files): {identity / 1024:.0f} KB -> {best / 1024:.0f} KB")
+
+if __name__ == "__main__":
+    if "--compression-report" in sys.argv:
+        compression_report()
+    elif "--load-test" in sys.argv:
+        args = sys.argv[sys.argv.index("--load-test") + 1:]
+        load_test(duration=float(args[0]) if args else 5, clients=int(args[1]) if len(args) > 1 else 16)
+    else:
+        print("Usage: python static_server.py --load-test [seconds] [clients] | --compression-report")
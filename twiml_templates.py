@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Precompiled TwiML Templates for Satyug Universe
+Renders the voice webhook responses from cached byte strings
+
+Check the output against the Twilio builders and compare render speed:
+
+    python twiml_templates.py --load-test [iterations]
+"""
+
+import sys
+import timeit
+from typing import Callable, Dict, Optional
+from xml.sax.saxutils import escape
+import logging
+
+from twilio.twiml.voice_response import VoiceResponse, Gather
+
+logger = logging.getLogger('TwiMLTemplates')
+
+# Placeholder spliced into templates at compile time and swapped for
+# the (escaped) dynamic text at render time
+_SLOT = "__TWIML_SLOT__"
+# Same escaping as ElementTree, which the Twilio builders serialize with
+_ATTRIBUTE_ENTITIES = {'"': "&quot;", "\r": "&#13;", "\n": "&#10;", "\t": "&#09;"}
+
+GREETING_TEXT = "नमस्ते, मैं मिस्टर हैप्पी हूं। आप क्या करना चाहते हैं?"
+REPROMPT_TEXT = "और कुछ?"
+
+class TwiMLTemplate:
+    """
+    A TwiML document compiled once into static byte strings
+
+    The document is built with the regular Twilio builders so the output
+    is identical to what `str(VoiceResponse())` produces, then split
+    around a single text slot. Empty text serializes differently
+    (`<Say ... />`), so that document is compiled separately.
+    """
+
+    def __init__(self, build: Callable[[str], VoiceResponse], attribute: bool = False):
+        """
+        Args:
+            build: Builds the document with the given text in the slot
+            attribute: The slot is an attribute value (not element text)
+        """
+        self.attribute = attribute
+        self.empty = str(build("")).encode('utf-8')
+        xml = str(build(_SLOT))
+        if _SLOT in xml:
+            head, tail = xml.split(_SLOT, 1)
+            self.head = head.encode('utf-8')
+            self.tail = tail.encode('utf-8')
+            self.has_slot = True
+        else:
+            self.head = xml.encode('utf-8')
+            self.tail = b""
+            self.has_slot = False
+
+    def render(self, text: Optional[str] = None) -> bytes:
+        """
+        Render the template
+
+        Args:
+            text: Dynamic text for the slot (escaped before splicing)
+
+        Returns:
+            UTF-8 encoded TwiML document
+        """
+        if not self.has_slot:
+            return self.head
+        if not text:
+            return self.empty
+        value = escape(text, _ATTRIBUTE_ENTITIES if self.attribute else {})
+        return b"".join((self.head, value.encode('utf-8'), self.tail))
+
+class TwiMLTemplates:
+    """
+    Cache of the TwiML documents used by the voice webhooks
+
+    Templates:
+    - greeting: static welcome prompt gathering speech
+    - reply: dynamic response text followed by the "और कुछ?" re-prompt
+    - say: dynamic text only (outbound calls)
+    - stream: bidirectional Media Stream to a WebSocket URL
+    """
+
+    def __init__(self, action: str = '/voice/process', language: str = 'hi-IN',
+                 voice: str = 'woman', timeout: int = 5):
+        self.action = action
+        self.language = language
+        self.voice = voice
+        self.timeout = timeout
+
+        self.templates: Dict[str, TwiMLTemplate] = {
+            "greeting": TwiMLTemplate(lambda text: self._build_greeting()),
+            "reply": TwiMLTemplate(self._build_reply),
+            "say": TwiMLTemplate(self._build_say),
+            "stream": TwiMLTemplate(self._build_stream, attribute=True)
+        }
+
+        logger.info(f"📄 TwiML templates compiled: {list(self.templates.keys())}")
+
+    def _gather(self, **extra) -> Gather:
+        return Gather(
+            input='speech',
+            action=self.action,
+            language=self.language,
+            timeout=self.timeout,
+            **extra
+        )
+
+    def _build_greeting(self) -> VoiceResponse:
+        response = VoiceResponse()
+        gather = self._gather(speech_timeout='auto')
+        gather.say(GREETING_TEXT, language=self.language, voice=self.voice)
+        response.append(gather)
+        return response
+
+    def _build_reply(self, text: str) -> VoiceResponse:
+        response = VoiceResponse()
+        response.say(text, language=self.language, voice=self.voice)
+        gather = self._gather()
+        gather.say(REPROMPT_TEXT, language=self.language, voice=self.voice)
+        response.append(gather)
+        return response
+
+    def _build_say(self, text: str) -> VoiceResponse:
+        response = VoiceResponse()
+        response.say(text, language=self.language, voice=self.voice)
+        return response
+
+    def _build_stream(self, url: str) -> VoiceResponse:
+        response = VoiceResponse()
+        connect = response.connect()
+        connect.stream(url=url)
+        return response
+
+    def greeting(self) -> bytes:
+        """Welcome prompt for incoming calls"""
+        return self.templates["greeting"].render()
+
+    def reply(self, text: str) -> bytes:
+        """Spoken response followed by the re-prompt"""
+        return self.templates["reply"].render(text)
+
+    def say(self, text: str) -> bytes:
+        """Spoken message only"""
+        return self.templates["say"].render(text)
+
+    def stream(self, url: str) -> bytes:
+        """Connect the call to a Media Stream WebSocket"""
+        return self.templates["stream"].render(url)
+
+# Inputs that exercise escaping and the empty-text form
+CHECK_INPUTS = [
+    "",
+    "नमस्ते! आपका ऑर्डर #42 तैयार है।",
+    'Tom & Jerry <script> "quoted" \'single\'',
+    "line one\nline two\r\n\ttabbed",
+    "wss://example.com/voice/stream?call=CA1&token=a\"b\nc"
+]
+
+def check(templates: TwiMLTemplates) -> int:
+    """
+    Compare every template with the Twilio builders on CHECK_INPUTS
+
+    Returns:
+        Number of mismatches (printed)
+    """
+    builders = {
+        "reply": templates._build_reply,
+        "say": templates._build_say,
+        "stream": templates._build_stream
+    }
+    mismatches = 0
+    if templates.greeting() != str(templates._build_greeting()).encode('utf-8'):
+        print("MISMATCH greeting")
+        mismatches += 1
+    for name, build in builders.items():
+        for text in CHECK_INPUTS:
+            expected = str(build(text)).encode('utf-8')
+            rendered = templates.templates[name].render(text)
+            if rendered != expected:
+                print(f"MISMATCH {name} {text!r}:\n  expected {expected!r}\n  rendered {rendered!r}")
+                mismatches += 1
+    return mismatches
+
+def load_test(iterations: int = 20000) -> int:
+    """
+    Check the output, then time templates against building per request
+
+    Returns:
+        Number of mismatches
+    """
+    templates = TwiMLTemplates()
+    mismatches = check(templates)
+    total = 1 + 3 * len(CHECK_INPUTS)
+    print(f"Output check: {total - mismatches}/{total} identical to str(VoiceResponse())")
+
+    text = CHECK_INPUTS[1]
+    for name, build in (("reply", templates._build_reply), ("say", templates._build_say)):
+        built = timeit.timeit(lambda: str(build(text)).encode('utf-8'), number=iterations)
+        cached = timeit.timeit(lambda: templates.templates[name].render(text), number=iterations)
+        print(f"  {name:<6} builders {built / iterations * 1e6:7.1f} us  "
+              f"template {cached / iterations * 1e6:6.1f} us  ({built / cached:.0f}x)")
+    return mismatches
+
+if __name__ == "__main__":
+    if "--load-test" in sys.argv:
+        args = sys.argv[sys.argv.index("--load-test") + 1:]
+        sys.exit(1 if load_test(int(args[0]) if args else 20000) else 0)
+    print("Usage: python twiml_templates.py --load-test [iterations]")
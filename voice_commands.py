@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Multilingual Voice Command Engine for Satyug Universe
+Matches Hindi (Devanagari) and English (Latin) commands in a single pass
+"""
+
+import unicodedata
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger('VoiceCommands')
+
+@dataclass
+class Intent:
+    """A command intent and the phrases that trigger it"""
+    name: str
+    keywords: List[str]
+    slots: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+
+@dataclass
+class CommandMatch:
+    """Result of matching a command"""
+    intent: str
+    slots: Dict[str, str]
+    score: int
+    keywords: List[str]
+
+    def to_dict(self) -> Dict:
+        return {
+            "intent": self.intent,
+            "slots": self.slots,
+            "score": self.score,
+            "keywords": self.keywords
+        }
+
+# Intent table, in priority order (earlier intents win ties)
+DEFAULT_INTENTS = [
+    Intent(
+        name="location",
+        keywords=["मेरा लोकेशन", "लोकेशन", "मैं कहां हूं", "location", "where am i"]
+    ),
+    Intent(
+        name="light",
+        keywords=["लाइट", "बत्ती", "light", "lights", "lamp"],
+        slots={
+            "state": {
+                "on": ["चालू", "जला", "जलाओ", "on", "switch on", "turn on"],
+                "off": ["बंद", "बुझा", "बुझाओ", "off", "switch off", "turn off"]
+            },
+            "room": {
+                "bedroom": ["बेडरूम", "bedroom"],
+                "kitchen": ["किचन", "रसोई", "kitchen"],
+                "living_room": ["लिविंग रूम", "हॉल", "living room", "hall"]
+            }
+        }
+    ),
+    Intent(
+        name="weather",
+        keywords=["मौसम", "weather", "temperature", "तापमान"]
+    ),
+]
+
+def _normalize(text: str) -> str:
+    """Normalize text for matching (NFC + casefold)"""
+    return unicodedata.normalize('NFC', text).casefold()
+
+def _is_word_char(ch: str) -> bool:
+    # Devanagari vowel signs and viramas are combining marks, so they
+    # count as part of the word they are attached to
+    return ch.isalnum() or unicodedata.category(ch).startswith('M')
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton over Unicode code points
+
+    Finds every occurrence of every pattern in one left-to-right pass,
+    independent of the number of patterns.
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[Tuple[int, object]]] = [[]]
+        self._compiled = False
+
+    def add(self, pattern: str, value: object):
+        """Add a pattern with an associated value"""
+        state = 0
+        for ch in pattern:
+            next_state = self.goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][ch] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(pattern), value))
+        self._compiled = False
+
+    def compile(self):
+        """Build failure links (breadth-first)"""
+        queue = deque(self.goto[0].values())
+        for state in queue:
+            self.fail[state] = 0
+
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+        self._compiled = True
+
+    def iter_matches(self, text: str):
+        """
+        Yield (start, end, value) for every pattern occurrence
+
+        Args:
+            text: Text to scan (already normalized)
+        """
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for length, value in output[state]:
+                yield index + 1 - length, index + 1, value
+
+class CommandEngine:
+    """
+    Data-driven command matcher
+
+    All intent keywords and slot values are compiled into one automaton at
+    startup. Matches must fall on word boundaries, so short English
+    keywords like "on" do not fire inside "location".
+    """
+
+    def __init__(self, intents: Optional[List[Intent]] = None):
+        self.intents = intents if intents is not None else DEFAULT_INTENTS
+        self.priority = {intent.name: index for index, intent in enumerate(self.intents)}
+        self.automaton = AhoCorasick()
+
+        phrases = 0
+        for intent in self.intents:
+            for keyword in intent.keywords:
+                self.automaton.add(_normalize(keyword), ("intent", intent.name, None, keyword))
+                phrases += 1
+            for slot, values in intent.slots.items():
+                for value, keywords in values.items():
+                    for keyword in keywords:
+                        self.automaton.add(_normalize(keyword), ("slot", intent.name, (slot, value), keyword))
+                        phrases += 1
+
+        self.automaton.compile()
+        logger.info(f"🧭 Command engine compiled: {len(self.intents)} intents, {phrases} phrases")
+
+    def match(self, text: str) -> Optional[CommandMatch]:
+        """
+        Match a command
+
+        Args:
+            text: Voice command text
+
+        Returns:
+            CommandMatch with the best intent and its slots, or None
+        """
+        text = _normalize(text)
+        length = len(text)
+
+        scores: Dict[str, int] = {}
+        keywords: Dict[str, List[str]] = {}
+        slots: Dict[str, Dict[str, Tuple[int, str]]] = {}
+
+        for start, end, (kind, intent, slot, keyword) in self.automaton.iter_matches(text):
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if end < length and _is_word_char(text[end]):
+                continue
+
+            if kind == "intent":
+                scores[intent] = scores.get(intent, 0) + 1
+                keywords.setdefault(intent, []).append(keyword)
+            else:
+                name, value = slot
+                # Longest phrase wins ("turn off" over "off")
+                current = slots.setdefault(intent, {}).get(name)
+                if current is None or end - start > current[0]:
+                    slots[intent][name] = (end - start, value)
+
+        if not scores:
+            return None
+
+        best = min(scores, key=lambda name: (-scores[name], self.priority[name]))
+        return CommandMatch(
+            intent=best,
+            slots={name: value for name, (_, value) in slots.get(best, {}).items()},
+            score=scores[best],
+            keywords=keywords[best]
+        )
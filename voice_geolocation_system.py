@@ -7,6 +7,7 @@ Enables voice control and location-aware services
 import os
 import asyncio
 import json
+from collections import deque
 from typing import Dict, Optional, Tuple, List
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -14,7 +15,11 @@ import logging
 
 # Twilio
 from twilio.rest import Client as TwilioClient
-from twilio.twiml.voice_response import VoiceResponse, Gather
+from twiml_templates import TwiMLTemplates
+from voice_commands import CommandEngine
+from mr_happy_bridge import create_bridge, webhook_deadline, load_core_class, InProcessBridge
+from media_stream import MediaStreamSession
+from location_provider import AdaptiveLocationProvider
 
 # Geolocation
 from geopy.geocoders import Nominatim
@@ -22,12 +27,14 @@ from geopy.distance import geodesic
 import geocoder
 
 # FastAPI for webhooks
-from fastapi import FastAPI, Request, Response
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, Request, Response, WebSocket
 import uvicorn
 
 logger = logging.getLogger('VoiceGeoSystem')
 
+# Continuous tracking adds a fix every few seconds; keep only the recent ones
+LOCATION_HISTORY_LIMIT = 1000
+
 @dataclass
 class GeolocationData:
     """Geolocation information"""
@@ -104,8 +111,24 @@ class VoiceGeolocationSystem:
         # Geolocation
         self.geolocator = Nominatim(user_agent="satyug_universe")
         self.current_location = None
-        self.location_history = []
+        self.location_history = deque(maxlen=LOCATION_HISTORY_LIMIT)
         self.geofences = []
+        self.location_provider = AdaptiveLocationProvider()
+        self.location_task = None
+        
+        # Precompiled TwiML for the voice webhooks
+        self.twiml = TwiMLTemplates()
+        
+        # Compiled multilingual command matcher
+        self.commands = CommandEngine()
+        
+        # Mr. Happy AI Core (in-process or over its Unix socket)
+        self.mr_happy = create_bridge()
+        
+        # Twilio Media Streams (streaming STT/TTS with barge-in)
+        self.media_streams = os.getenv('VOICE_MEDIA_STREAMS', '').lower() in ('1', 'true', 'yes')
+        self.public_host = os.getenv('PUBLIC_HOST')
+        self.speech_engine = None
         
         # FastAPI app for webhooks
         self.app = FastAPI(title="Voice & Geolocation System")
@@ -122,22 +145,26 @@ class VoiceGeolocationSystem:
             form_data = await request.form()
             logger.info(f"📞 Incoming call from: {form_data.get('From')}")
             
-            response = VoiceResponse()
-            gather = Gather(
-                input='speech',
-                action='/voice/process',
-                language='hi-IN',  # Hindi
-                timeout=5,
-                speech_timeout='auto'
-            )
-            gather.say(
-                "नमस्ते, मैं मिस्टर हैप्पी हूं। आप क्या करना चाहते हैं?",
-                language='hi-IN',
-                voice='woman'
-            )
-            response.append(gather)
+            # Stream the call audio both ways instead of <Gather> turns
+            if self.media_streams:
+                host = self.public_host or request.headers.get('host')
+                url = f"wss://{host}/voice/stream"
+                return Response(content=self.twiml.stream(url), media_type='text/xml')
             
-            return PlainTextResponse(str(response), media_type='text/xml')
+            return Response(content=self.twiml.greeting(), media_type='text/xml')
+        
+        @self.app.websocket("/voice/stream")
+        async def voice_stream(websocket: WebSocket):
+            """Bidirectional Twilio Media Stream"""
+            await websocket.accept()
+            
+            speech = self.get_speech_engine()
+            if speech is None:
+                await websocket.close()
+                return
+            
+            session = MediaStreamSession(websocket, speech, self.process_command)
+            await session.run()
         
         @self.app.post("/voice/process")
         async def process_voice_command(request: Request):
@@ -147,24 +174,11 @@ class VoiceGeolocationSystem:
             
             logger.info(f"🗣️ Voice command: {speech_result}")
             
-            # Process command with Mr. Happy
-            # (Integration with mr-happy-core.py)
-            response_text = await self.process_command(speech_result)
-            
-            response = VoiceResponse()
-            response.say(response_text, language='hi-IN', voice='woman')
-            
-            # Ask if they want to do anything else
-            gather = Gather(
-                input='speech',
-                action='/voice/process',
-                language='hi-IN',
-                timeout=5
-            )
-            gather.say("और कुछ?", language='hi-IN', voice='woman')
-            response.append(gather)
+            # Process command with Mr. Happy within Twilio's webhook budget
+            deadline = webhook_deadline()
+            response_text = await self.process_command(speech_result, deadline)
             
-            return PlainTextResponse(str(response), media_type='text/xml')
+            return Response(content=self.twiml.reply(response_text), media_type='text/xml')
         
         @self.app.post("/location/update")
         async def update_location(request: Request):
@@ -238,40 +252,102 @@ class VoiceGeolocationSystem:
                 "geofences": len(self.geofences)
             }
     
-    async def process_command(self, command: str) -> str:
+    async def process_command(self, command: str, deadline: Optional[float] = None) -> str:
         """
         Process voice command
         
         Args:
             command: Voice command text
+            deadline: Absolute time.monotonic() deadline for Mr. Happy calls
             
         Returns:
             Response text
         """
-        command_lower = command.lower()
+        match = self.commands.match(command)
+        intent = match.intent if match else None
         
         # Location commands
-        if "मेरा लोकेशन" in command_lower or "location" in command_lower:
+        if intent == "location":
             if self.current_location:
                 return f"आप {self.current_location.city}, {self.current_location.country} में हैं"
             return "मुझे आपका लोकेशन नहीं मिल रहा है"
         
         # Home control commands
-        elif "लाइट" in command_lower or "light" in command_lower:
-            if "चालू" in command_lower or "on" in command_lower:
+        elif intent == "light":
+            state = match.slots.get("state")
+            if state in ("on", "off"):
+                await self.control_light(state, match.slots.get("room"), deadline)
+            if state == "on":
                 return "लाइट चालू कर रहा हूं"
-            elif "बंद" in command_lower or "off" in command_lower:
+            elif state == "off":
                 return "लाइट बंद कर रहा हूं"
         
         # Weather commands
-        elif "मौसम" in command_lower or "weather" in command_lower:
+        elif intent == "weather":
             if self.current_location:
                 return f"{self.current_location.city} में मौसम अच्छा है"
             return "मौसम की जानकारी के लिए लोकेशन चाहिए"
         
+        # Anything else goes to Mr. Happy
+        elif command and self.mr_happy:
+            try:
+                return await self.mr_happy.think(command, deadline)
+            except asyncio.TimeoutError:
+                logger.warning("⏱️ Mr. Happy missed the webhook deadline")
+            except Exception as e:
+                logger.error(f"❌ Mr. Happy bridge error: {e}")
+        
         # Default response
         return "मैं आपकी मदद करने की कोशिश कर रहा हूं"
     
+    def get_speech_engine(self):
+        """
+        Get the SpeechClient used for streaming STT/TTS
+        
+        Audio cannot cross the bridge socket, so when Mr. Happy runs in
+        another process only its Deepgram/Cartesia clients are set up here.
+        """
+        if self.speech_engine is None:
+            if isinstance(self.mr_happy, InProcessBridge):
+                self.speech_engine = self.mr_happy.core.speech
+            else:
+                try:
+                    self.speech_engine = load_core_class("SpeechClient")()
+                except Exception as e:
+                    logger.error(f"❌ Speech engine not available: {e}")
+        return self.speech_engine
+    
+    async def control_light(self, state: str, room: Optional[str] = None,
+                            deadline: Optional[float] = None) -> bool:
+        """
+        Switch lights through Mr. Happy's Home Assistant integration
+        
+        Args:
+            state: "on" or "off"
+            room: Optional room slot from the command
+            deadline: Absolute time.monotonic() deadline
+            
+        Returns:
+            Success status
+        """
+        if not self.mr_happy:
+            return False
+        
+        params = {
+            "domain": "light",
+            "service": f"turn_{state}",
+            "data": {"entity_id": f"light.{room}"} if room else {}
+        }
+        
+        try:
+            result = await self.mr_happy.execute_action("home_assistant", params, deadline)
+            return bool(result and result.get("success"))
+        except asyncio.TimeoutError:
+            logger.warning("⏱️ Light control missed the webhook deadline")
+        except Exception as e:
+            logger.error(f"❌ Light control error: {e}")
+        return False
+    
     async def make_call(self, to_number: str, message: str) -> VoiceCall:
         """
         Make an outbound voice call
@@ -284,13 +360,12 @@ class VoiceGeolocationSystem:
             VoiceCall object
         """
         try:
-            # Create TwiML for the call
-            twiml = VoiceResponse()
-            twiml.say(message, language='hi-IN', voice='woman')
+            # Render TwiML for the call
+            twiml = self.twiml.say(message).decode('utf-8')
             
             # Make the call
             call = self.twilio_client.calls.create(
-                twiml=str(twiml),
+                twiml=twiml,
                 to=to_number,
                 from_=self.from_number
             )
@@ -342,7 +417,9 @@ class VoiceGeolocationSystem:
             location: GeolocationData object to update
         """
         try:
-            location_obj = self.geolocator.reverse(
+            # Nominatim is blocking; keep it off the event loop
+            location_obj = await asyncio.to_thread(
+                self.geolocator.reverse,
                 (location.latitude, location.longitude),
                 language='en'
             )
@@ -358,39 +435,27 @@ class VoiceGeolocationSystem:
         except Exception as e:
             logger.error(f"❌ Geocoding error: {e}")
     
-    async def get_location_from_termux(self) -> Optional[GeolocationData]:
+    async def get_location_from_termux(self, accuracy: float = 50, timeout: float = 10,
+                                       low_power: bool = False) -> Optional[GeolocationData]:
         """
         Get location from Termux API (for Android)
         
+        Args:
+            accuracy: Required accuracy in meters (picks gps/network/passive)
+            timeout: Overall time budget in seconds
+            low_power: Never wake the GPS
+            
         Returns:
             GeolocationData or None
         """
         try:
-            import subprocess
-            
-            # Use Termux API to get location
-            result = subprocess.run(
-                ['termux-location', '-p', 'gps'],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
+            data = await self.location_provider.locate(accuracy, timeout, low_power)
             
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                
-                location = GeolocationData(
-                    latitude=data['latitude'],
-                    longitude=data['longitude'],
-                    accuracy=data.get('accuracy', 0),
-                    altitude=data.get('altitude'),
-                    speed=data.get('speed'),
-                    heading=data.get('bearing')
-                )
-                
+            if data:
+                location = self._location_from_fix(data)
                 await self.reverse_geocode(location)
                 
-                logger.info(f"📱 Termux location: {location.coordinates}")
+                logger.info(f"📱 Termux location ({data.get('provider')}): {location.coordinates}")
                 return location
                 
         except Exception as e:
@@ -398,6 +463,62 @@ class VoiceGeolocationSystem:
         
         return None
     
+    @staticmethod
+    def _location_from_fix(data: Dict) -> GeolocationData:
+        return GeolocationData(
+            latitude=data['latitude'],
+            longitude=data['longitude'],
+            accuracy=data.get('accuracy', 0),
+            altitude=data.get('altitude'),
+            speed=data.get('speed'),
+            heading=data.get('bearing')
+        )
+    
+    def start_location_updates(self, accuracy: float = 50, low_power: bool = False,
+                               geocode_distance: float = 100):
+        """
+        Start continuous Termux location updates in the background
+        
+        Args:
+            accuracy: Required accuracy in meters (picks the provider)
+            low_power: Use passive updates only
+            geocode_distance: Meters moved before reverse geocoding again
+        """
+        if self.location_task and not self.location_task.done():
+            return
+        self.location_task = asyncio.create_task(
+            self._follow_location(accuracy, low_power, geocode_distance)
+        )
+    
+    def stop_location_updates(self):
+        """Stop continuous location updates"""
+        if self.location_task:
+            self.location_task.cancel()
+            self.location_task = None
+    
+    async def _follow_location(self, accuracy: float, low_power: bool, geocode_distance: float):
+        geocoded = None
+        try:
+            async for data in self.location_provider.updates(accuracy, low_power):
+                location = self._location_from_fix(data)
+                
+                # Reverse geocoding is a network call; only repeat it after moving
+                if geocoded is None or location.distance_to(geocoded) * 1000 >= geocode_distance:
+                    await self.reverse_geocode(location)
+                    geocoded = location
+                else:
+                    location.address = geocoded.address
+                    location.city = geocoded.city
+                    location.country = geocoded.country
+                
+                self.current_location = location
+                self.location_history.append(location)
+                await self.check_geofences(location)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Location updates error: {e}")
+    
     async def check_geofences(self, location: GeolocationData) -> List[Dict]:
         """
         Check if location triggers any geofences